@@ -6,16 +6,30 @@ import json
 import base64
 import hmac
 import hashlib
+import io
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
-from flask import Flask, Response, current_app, jsonify, request, send_from_directory
+from flask import Flask, Response, current_app, g, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
 
 from backend.config import build_tts_manager
+from backend.health import build_health_monitor
+from backend.jobs import JobRunner, build_job_runner
+from backend.utils.admission import AdmissionRejected, build_admission_controller
+from backend.utils.concurrency import BULK, PRIORITIES, chunk_schedulers, classify_priority
 from backend.utils.audio import validate_and_normalize_mp3
+from backend.utils.audio_cache import AudioCache, build_audio_cache, make_cache_key
+from backend.utils.mp3 import is_truncated
 from backend.utils.logger import setup_logging
+from backend.utils.rate_limit import api_key_id, build_rate_limiter, default_rate_limit, parse_api_keys
+from backend.utils.metrics import CONTENT_TYPE, RATE_LIMITED, REGISTRY, REQUEST_SECONDS, VALIDATION_SECONDS, CallbackMetric
+from backend.warm_state import build_warm_state
 
 
 load_dotenv()
@@ -25,6 +39,18 @@ logger = setup_logging("nami-tts")
 PORT = int(os.getenv("PORT") or 5001)
 DEBUG = (os.getenv("DEBUG") or "False").lower() == "true"
 
+# Warm up the default provider (time sync, voice catalog) in a background
+# thread once per process, so imports and cold starts never wait on upstream.
+STARTUP_WARMUP = (os.getenv("STARTUP_WARMUP") or "true").lower() in ("true", "1", "yes", "on")
+
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS") or 500)
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY") or 4)
+
+# Priority classes: a request's "priority" field wins, then the API key, then
+# its length. Batches and jobs are bulk unless they ask for "interactive".
+PRIORITY_BULK_MIN_CHARS = int(os.getenv("PRIORITY_BULK_MIN_CHARS") or 1000)
+PRIORITY_BULK_KEYS = [k.strip() for k in (os.getenv("PRIORITY_BULK_KEYS") or "").split(",") if k.strip()]
+
 SERVICE_API_KEY = os.getenv("SERVICE_API_KEY") or os.getenv("TTS_API_KEY") or "sk-nanoai-your-secret-key"
 
 if not os.getenv("SERVICE_API_KEY") and not os.getenv("TTS_API_KEY"):
@@ -98,18 +124,169 @@ def save_ui_config_to_disk(config: Dict[str, Any]) -> None:
 
 
 _tts_manager = build_tts_manager()
+_audio_cache = build_audio_cache()
+_health_monitor = build_health_monitor(lambda: _tts_manager)
+_admission = build_admission_controller()
+
+# Additional API keys (SERVICE_API_KEYS), each with an optional own rate limit;
+# every key gets a character-weighted token bucket when limits are configured.
+_DEFAULT_RATE_LIMIT = default_rate_limit()
+_EXTRA_API_KEYS = parse_api_keys(os.getenv("SERVICE_API_KEYS") or "", _DEFAULT_RATE_LIMIT)
+_rate_limiter = build_rate_limiter(_EXTRA_API_KEYS, _DEFAULT_RATE_LIMIT)
+# Settings POST /v1/config can change for the keys above (RATE_LIMIT_BACKEND stays as started).
+API_KEY_SETTINGS = {"SERVICE_API_KEYS", "RATE_LIMIT_CHARS_PER_SECOND", "RATE_LIMIT_BURST_CHARS"}
+_warm_up_pid: Optional[int] = None
+
+# Restore clock offset, voice catalog, models caches and health learned by an
+# earlier process, so the first request needs no extra upstream probes.
+_warm_state = build_warm_state(lambda: _tts_manager, _health_monitor)
+if _warm_state:
+    _warm_state.restore()
 
 
 def _get_tts_manager():
     return _tts_manager
 
 
+def _get_audio_cache():
+    return _audio_cache
+
+
+_job_runner: Optional[JobRunner] = None
+_job_runner_lock = threading.Lock()
+
+
+def _synthesize_job_chunk(text: str, model_id: str, provider_name: Optional[str], options: Dict[str, Any]):
+    manager = _get_tts_manager()
+    cache_key = make_cache_key(provider_name or manager.default_provider, model_id, text, **options)
+    result = _synthesize(manager, text, model_id, provider_name, options, cache_key)
+    return result.provider, result.audio
+
+
+def _get_job_runner() -> JobRunner:
+    global _job_runner
+    with _job_runner_lock:
+        if _job_runner is None:
+            _job_runner = build_job_runner(_synthesize_job_chunk)
+        _job_runner.ensure_started()
+        return _job_runner
+
+
 def _rebuild_tts_manager() -> None:
+    """Swap in a manager built from the current environment.
+
+    Providers whose settings are unchanged keep their warm instances; requests
+    already holding the old manager finish on it.
+    """
+
     global _tts_manager
-    _tts_manager = build_tts_manager()
+    _tts_manager = build_tts_manager(previous=_tts_manager)
+    _start_warm_up(force=True)
+
+
+def _reload_api_keys() -> None:
+    """Re-read SERVICE_API_KEYS and the rate limits; existing buckets keep their tokens."""
+
+    global _DEFAULT_RATE_LIMIT, _EXTRA_API_KEYS, _rate_limiter
+    _DEFAULT_RATE_LIMIT = default_rate_limit()
+    _EXTRA_API_KEYS = parse_api_keys(os.getenv("SERVICE_API_KEYS") or "", _DEFAULT_RATE_LIMIT)
+    _rate_limiter = build_rate_limiter(_EXTRA_API_KEYS, _DEFAULT_RATE_LIMIT, previous=_rate_limiter)
+
+
+def _start_warm_up(force: bool = False) -> None:
+    """Warm up the current manager in the background, once per process (forked workers start their own)."""
+
+    global _warm_up_pid
+    if not STARTUP_WARMUP or (_warm_up_pid == os.getpid() and not force):
+        return
+    _warm_up_pid = os.getpid()
+    threading.Thread(target=_warm_up, args=(_tts_manager,), name="provider-warm-up", daemon=True).start()
+
+
+def _warm_up(manager) -> None:
+    manager.warm_up()
+    if _warm_state:
+        _warm_state.save()
+
+
+def _loaded_nanoai_engine():
+    provider = _get_tts_manager().providers.loaded().get("nanoai")
+    return getattr(provider, "engine", None)
+
+
+def _nanoai_time_offset():
+    engine = _loaded_nanoai_engine()
+    if engine is None:
+        return []
+    return [({}, engine.get_time_sync_status().get("offset_seconds"))]
+
+
+def _audio_cache_lookups():
+    audio_cache = _get_audio_cache()
+    if not audio_cache:
+        return []
+    stats = audio_cache.stats()
+    return [
+        ({"result": "memory_hit"}, stats["memory_hits"]),
+        ({"result": "disk_hit"}, stats["disk_hits"]),
+        ({"result": "miss"}, stats["misses"]),
+    ]
+
+
+def _audio_cache_hit_ratio():
+    audio_cache = _get_audio_cache()
+    return [({}, audio_cache.stats()["hit_ratio"])] if audio_cache else []
+
+
+def _chunk_cache_lookups():
+    chunk_cache = getattr(_loaded_nanoai_engine(), "chunk_cache", None)
+    if not chunk_cache:
+        return []
+    stats = chunk_cache.stats()
+    return [
+        ({"result": "memory_hit"}, stats["memory_hits"]),
+        ({"result": "disk_hit"}, stats["disk_hits"]),
+        ({"result": "miss"}, stats["misses"]),
+    ]
+
+
+def _coalesced_calls():
+    stats = _get_tts_manager().coalescing_stats()
+    return [({"role": "leader"}, stats["executions"]), ({"role": "collapsed"}, stats["collapsed"])]
+
+
+def _admission_requests():
+    if not _admission:
+        return []
+    stats = _admission.stats()
+    return [
+        ({"state": state, "priority": priority}, count)
+        for state in ("in_flight", "waiting")
+        for priority, count in stats[f"{state}_by_priority"].items()
+    ]
+
+
+def _scheduler_queue_depth():
+    return [
+        ({"provider": name, "priority": priority}, lane["queued"])
+        for name, scheduler in chunk_schedulers().items()
+        for priority, lane in scheduler.stats()["lanes"].items()
+    ]
+
+
+CallbackMetric("nanoai_time_offset_seconds", "Upstream server time minus local time (NanoAI time sync).", "gauge", _nanoai_time_offset)
+CallbackMetric("tts_audio_cache_lookups_total", "Audio cache lookups by result.", "counter", _audio_cache_lookups)
+CallbackMetric("tts_audio_cache_hit_ratio", "Audio cache hits / lookups since start.", "gauge", _audio_cache_hit_ratio)
+CallbackMetric("tts_chunk_cache_lookups_total", "Long-text chunk cache lookups by result.", "counter", _chunk_cache_lookups)
+CallbackMetric("tts_coalesced_calls_total", "Synthesis calls by single-flight role.", "counter", _coalesced_calls)
+CallbackMetric("tts_admission_requests", "Synthesis requests admitted and running, or waiting for a slot, by priority class.", "gauge", _admission_requests)
+CallbackMetric("tts_scheduler_queue_depth", "Upstream calls queued in the chunk scheduler, by priority class.", "gauge", _scheduler_queue_depth)
 
 
 def _require_auth() -> Optional[Any]:
+    if g.get("api_key"):
+        return None  # already authenticated earlier in this request (admission control)
+
     auth_header = request.headers.get("Authorization") or ""
     if not auth_header.startswith("Bearer "):
         logger.warning("Authentication failed: missing or invalid Authorization header format")
@@ -137,7 +314,7 @@ def _require_auth() -> Optional[Any]:
         logger.warning(f"  SERVICE_API_KEY: {os.getenv('SERVICE_API_KEY', '未设置')}")
         logger.warning(f"  TTS_API_KEY: {os.getenv('TTS_API_KEY', '未设置')}")
     
-    if provided_key != SERVICE_API_KEY:
+    if provided_key != SERVICE_API_KEY and provided_key not in _EXTRA_API_KEYS:
         logger.warning("Authentication failed: API key mismatch")
         logger.warning(f"  Expected length: {len(SERVICE_API_KEY)}")
         logger.warning(f"  Provided length: {len(provided_key)}")
@@ -152,9 +329,44 @@ def _require_auth() -> Optional[Any]:
         return jsonify({"error": "Invalid API Key"}), 401
 
     logger.info("✅ 认证成功")
+    g.api_key = provided_key
     return None
 
 
+def _bearer_key() -> Optional[str]:
+    auth_header = request.headers.get("Authorization") or ""
+    return auth_header[7:] if auth_header.startswith("Bearer ") else None
+
+
+def _request_priority(requested: Optional[str], chars: int, *, default: Optional[str] = None) -> str:
+    return classify_priority(
+        requested if requested in PRIORITIES else default,
+        api_key=g.get("api_key") or _bearer_key(),
+        chars=chars,
+        bulk_keys=PRIORITY_BULK_KEYS,
+        bulk_min_chars=PRIORITY_BULK_MIN_CHARS,
+    )
+
+
+def _charge_rate_limit(chars: int) -> Optional[Any]:
+    """Take ``chars`` from the caller's token bucket; a 429 response when it is empty."""
+
+    if not _rate_limiter or not g.get("api_key"):
+        return None
+    decision = _rate_limiter.check(g.api_key, chars)
+    if decision is None:
+        return None
+    g.rate_limit = decision
+    if decision.allowed:
+        return None
+    RATE_LIMITED.inc()
+    logger.warning("rate limit exceeded: cost=%s remaining=%s retry_after=%ss", chars, decision.remaining, decision.retry_after)
+    resp = jsonify({"error": "Rate limit exceeded", "retry_after": decision.retry_after})
+    resp.status_code = 429
+    resp.headers["Retry-After"] = str(decision.retry_after)
+    return resp
+
+
 FRONTEND_DIR = PROJECT_ROOT / "frontend"
 
 
@@ -169,10 +381,83 @@ CORS(
         "X-Audio-Validation",
         "X-Audio-FirstFrameOffset",
         "X-TTS-Provider",
+        "X-Audio-Cache",
+        "X-RateLimit-Limit",
+        "X-RateLimit-Remaining",
+        "X-RateLimit-Reset",
+        "Retry-After",
     ],
 )
 
 
+@app.before_request
+def _start_request_timer() -> None:
+    g.request_started = time.perf_counter()
+    _start_warm_up()
+    if _warm_state:
+        _warm_state.ensure_started()
+
+
+# Endpoints that synthesize audio go through admission control; health,
+# metrics and the rest stay reachable while the node is saturated.
+ADMISSION_ENDPOINTS = {"create_speech", "create_speech_batch"}
+
+
+@app.before_request
+def _admit_request() -> Optional[Response]:
+    if not _admission or request.endpoint not in ADMISSION_ENDPOINTS or request.method == "OPTIONS":
+        return None
+    # Authenticate first, so unauthenticated requests can neither take nor wait for a slot.
+    auth_resp = _require_auth()
+    if auth_resp:
+        return auth_resp
+    data = request.get_json(force=True, silent=True) or {}
+    if request.endpoint == "create_speech_batch":
+        priority = _request_priority(data.get("priority"), 0, default=BULK)
+    else:
+        priority = _request_priority(data.get("priority"), len(str(data.get("input") or "")))
+    try:
+        _admission.acquire(priority)
+    except AdmissionRejected as e:
+        logger.warning("request rejected: %s", str(e))
+        resp = jsonify({"error": "Server overloaded, retry later", "retry_after": e.retry_after})
+        resp.status_code = 429
+        resp.headers["Retry-After"] = str(e.retry_after)
+        return resp
+    g.admitted = priority
+    return None
+
+
+@app.after_request
+def _observe_request(response: Response) -> Response:
+    decision = g.get("rate_limit")
+    if decision is not None:
+        response.headers["X-RateLimit-Limit"] = str(decision.limit)
+        response.headers["X-RateLimit-Remaining"] = str(decision.remaining)
+        response.headers["X-RateLimit-Reset"] = str(decision.reset_after)
+    admitted = g.pop("admitted", None)
+    if admitted:
+        # Hold the slot until a streamed body has been fully sent.
+        response.call_on_close(lambda: _admission.release(admitted))
+    started = g.get("request_started")
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        status = response.status_code
+        # Fires after the body (including a streamed one) has been sent.
+        response.call_on_close(
+            lambda: REQUEST_SECONDS.labels(endpoint, status).observe(time.perf_counter() - started)
+        )
+    return response
+
+
+@app.teardown_request
+def _release_unanswered(_exc: Optional[BaseException]) -> None:
+    # after_request did not run (the request failed before a response existed)
+    admitted = g.pop("admitted", None)
+    if admitted:
+        _admission.release(admitted)
+
+
 @app.route("/")
 def index():
     if FRONTEND_DIR.joinpath("index.html").exists():
@@ -185,23 +470,23 @@ def list_providers():
     manager = _get_tts_manager()
 
     providers = []
-    for name, provider in manager.providers.items():
-        health = provider.health_check()
+    loaded = manager.providers.loaded()
+    for name in manager.providers:
+        # listing must not construct (and health-check) providers nobody has used yet
+        provider = loaded.get(name)
         providers.append(
             {
                 "name": name,
                 "is_default": name == manager.default_provider,
                 "priority": manager.priority_order.index(name) if name in manager.priority_order else None,
-                "health": {
-                    "ok": health.ok,
-                    "message": health.message,
-                    "details": health.details,
-                },
+                "loaded": provider is not None,
+                "health": _health_monitor.get(name, provider).to_dict() if provider is not None else None,
+                "circuit": manager.circuit_snapshot(name),
             }
         )
 
     providers.sort(key=lambda x: (x["priority"] is None, x["priority"] or 9999, x["name"]))
-    return jsonify({"object": "list", "data": providers})
+    return jsonify({"object": "list", "data": providers, "routing_order": manager.get_provider_candidates()})
 
 
 @app.route("/v1/models", methods=["GET"])
@@ -245,33 +530,61 @@ def create_speech():
     if not model_id or not text_input:
         return jsonify({"error": "Missing required fields: 'model' and 'input'"}), 400
 
-    options: Dict[str, Any] = {
-        "timeout": data.get("timeout"),
-        "retry_count": data.get("retry_count"),
-        "speed": data.get("speed"),
-        "pitch": data.get("pitch"),
-        "language": data.get("language"),
-        "gender": data.get("gender"),
-        "format": data.get("format"),
-    }
+    limited = _charge_rate_limit(len(text_input))
+    if limited:
+        return limited
+
+    options = _speech_options(data)
+    options["priority"] = _request_priority(options["priority"], len(text_input))
+
+    stream = str(data.get("stream") or "false").lower() in ("true", "1", "yes")
 
     manager = _get_tts_manager()
 
     request_received_at = time.time()
     logger.info(
-        "speech request: provider=%s model=%s text_len=%s local_epoch=%.3f",
+        "speech request: provider=%s model=%s text_len=%s stream=%s priority=%s local_epoch=%.3f",
         provider_name,
         model_id,
         len(text_input),
+        stream,
+        options["priority"],
         request_received_at,
     )
 
+    audio_cache = _get_audio_cache()
+    cache_key = make_cache_key(provider_name or manager.default_provider, model_id, text_input, **options)
+
+    if stream:
+        cached = audio_cache.get(cache_key) if audio_cache else None
+        if cached is not None:
+            used_provider, audio_data = cached
+            return _speech_response(audio_data, used_provider, first_frame_offset=0, cache_status="hit")
+        return _create_speech_stream(manager, text_input, model_id, provider_name, options, cache_key)
+
     try:
-        used_provider, audio_data, errors = manager.generate_with_fallback(
-            text_input,
-            model_id,
-            provider_name=provider_name,
-            **options,
+        result = _synthesize(manager, text_input, model_id, provider_name, options, cache_key)
+    except InvalidAudioError as e:
+        current_app.logger.error(
+            "audio invalid: %s; len=%s; first16=%s",
+            e.message,
+            e.debug.get("original_len"),
+            e.debug.get("first16_hex"),
+        )
+        return (
+            jsonify(
+                {
+                    "error": "Invalid audio data",
+                    "details": e.message,
+                    "provider": e.provider,
+                    "debug": {
+                        "len": e.debug.get("original_len"),
+                        "first16_hex": e.debug.get("first16_hex"),
+                        "sha256": e.debug.get("sha256"),
+                    },
+                }
+            ),
+            500,
         )
     except Exception as e:
         current_app.logger.error("TTS generate failed: %s", str(e), exc_info=True)
@@ -285,32 +598,358 @@ def create_speech():
             500,
         )
 
-    is_valid, validation_msg, normalized_audio, debug = validate_and_normalize_mp3(audio_data)
-    if not is_valid:
-        current_app.logger.error(
-            "audio invalid: %s; len=%s; first16=%s",
-            validation_msg,
-            debug.get("original_len"),
-            debug.get("first16_hex"),
+    if result.errors:
+        current_app.logger.info(
+            "fallback attempts: %s",
+            [e.__dict__ for e in result.errors],
         )
-        return (
-            jsonify(
+
+    return _speech_response(
+        result.audio,
+        result.provider,
+        first_frame_offset=result.debug.get("trimmed_offset") or result.debug.get("first_sync_offset") or 0,
+        cache_status=result.cache_status,
+    )
+
+
+def _speech_options(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "timeout": data.get("timeout"),
+        "retry_count": data.get("retry_count"),
+        "speed": data.get("speed"),
+        "pitch": data.get("pitch"),
+        "volume": data.get("volume"),
+        "language": data.get("language"),
+        "gender": data.get("gender"),
+        "format": data.get("format"),
+        "priority": data.get("priority"),
+    }
+
+
+@dataclass
+class SynthesisResult:
+    provider: str
+    audio: bytes
+    errors: List[Any]
+    debug: Dict[str, Any]
+    cache_status: str
+
+
+class InvalidAudioError(Exception):
+    def __init__(self, message: str, provider: str, debug: Dict[str, Any]):
+        super().__init__(message)
+        self.message = message
+        self.provider = provider
+        self.debug = debug
+
+
+def _synthesize(
+    manager: Any,
+    text_input: str,
+    model_id: str,
+    provider_name: Optional[str],
+    options: Dict[str, Any],
+    cache_key: str,
+) -> SynthesisResult:
+    """Cache lookup, provider fallback and MP3 validation for one input."""
+
+    audio_cache = _get_audio_cache()
+    cached = audio_cache.get(cache_key) if audio_cache else None
+    if cached is not None:
+        used_provider, audio_data = cached
+        logger.info("speech cache hit: provider=%s key=%s", used_provider, cache_key[:16])
+        return SynthesisResult(used_provider, audio_data, [], {}, "hit")
+
+    used_provider, audio_data, errors = manager.generate_with_fallback(
+        text_input,
+        model_id,
+        provider_name=provider_name,
+        **options,
+    )
+
+    with VALIDATION_SECONDS.labels("response").time():
+        is_valid, validation_msg, normalized_audio, debug = validate_and_normalize_mp3(audio_data)
+    if not is_valid:
+        raise InvalidAudioError(validation_msg, used_provider, debug)
+
+    if audio_cache and _cacheable(manager, provider_name, used_provider, errors):
+        audio_cache.put(cache_key, used_provider, normalized_audio)
+
+    return SynthesisResult(used_provider, normalized_audio, errors, debug, "miss" if audio_cache else "bypass")
+
+
+def _cacheable(manager: Any, provider_name: Optional[str], used_provider: str, errors: List[Any]) -> bool:
+    """Only audio from the requested provider is cached under the request's key.
+
+    Audio served by a fallback or hedge would otherwise stay under the
+    primary provider's key for the whole TTL, even after it recovers.
+    """
+
+    return not errors and used_provider == (provider_name or manager.default_provider).lower()
+
+
+@app.route("/v1/audio/speech/batch", methods=["POST"])
+def create_speech_batch():
+    auth_resp = _require_auth()
+    if auth_resp:
+        return auth_resp
+
+    try:
+        data = request.get_json(force=True)
+    except Exception:
+        return jsonify({"error": "Invalid JSON body"}), 400
+
+    items = data.get("items")
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Missing required field: 'items' (non-empty list)"}), 400
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"Too many items: {len(items)} > {BATCH_MAX_ITEMS}"}), 400
+
+    response_format = (data.get("response_format") or "json").lower()
+    if response_format not in ("json", "zip"):
+        return jsonify({"error": "response_format must be 'json' or 'zip'"}), 400
+
+    manager = _get_tts_manager()
+    default_options = _speech_options(data)
+
+    # Identical items (same cache key) are synthesized once and shared.
+    results: List[Dict[str, Any]] = [{} for _ in items]
+    jobs: Dict[str, Dict[str, Any]] = {}
+    item_keys: List[Optional[str]] = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            item = {}
+        model_id = item.get("model") or data.get("model")
+        text_input = item.get("input")
+        provider_name = item.get("provider") or data.get("provider")
+        if not model_id or not text_input:
+            results[index] = {"index": index, "ok": False, "error": "Missing required fields: 'model' and 'input'"}
+            item_keys.append(None)
+            continue
+
+        item_options = _speech_options({**item, **(item.get("options") or {})})
+        options = {k: v if v is not None else default_options[k] for k, v in item_options.items()}
+        options["priority"] = _request_priority(options["priority"], len(text_input), default=BULK)
+        cache_key = make_cache_key(provider_name or manager.default_provider, model_id, text_input, **options)
+        jobs.setdefault(cache_key, {"args": (text_input, model_id, provider_name, options, cache_key)})
+        item_keys.append(cache_key)
+
+    limited = _charge_rate_limit(sum(len(job["args"][0]) for job in jobs.values()))
+    if limited:
+        return limited
+
+    logger.info(
+        "batch speech request: items=%s unique=%s format=%s",
+        len(items),
+        len(jobs),
+        response_format,
+    )
+
+    def run(job_key: str) -> None:
+        job = jobs[job_key]
+        try:
+            job["result"] = _synthesize(manager, *job["args"])
+        except Exception as e:
+            job["error"] = str(e)
+
+    if jobs:
+        with ThreadPoolExecutor(max_workers=min(BATCH_MAX_CONCURRENCY, len(jobs))) as executor:
+            list(executor.map(run, list(jobs.keys())))
+
+    audio_by_index: Dict[int, bytes] = {}
+    seen_keys = set()
+    for index, cache_key in enumerate(item_keys):
+        if cache_key is None:
+            continue
+        job = jobs[cache_key]
+        entry: Dict[str, Any] = {"index": index, "deduplicated": cache_key in seen_keys}
+        seen_keys.add(cache_key)
+        result: Optional[SynthesisResult] = job.get("result")
+        if result is None:
+            entry.update({"ok": False, "error": job.get("error") or "TTS generation failed"})
+        else:
+            entry.update(
                 {
-                    "error": "Invalid audio data",
-                    "details": validation_msg,
-                    "provider": used_provider,
-                    "debug": {
-                        "len": debug.get("original_len"),
-                        "first16_hex": debug.get("first16_hex"),
-                        "sha256": debug.get("sha256"),
-                    },
+                    "ok": True,
+                    "provider": result.provider,
+                    "cache": result.cache_status,
+                    "size": len(result.audio),
                 }
-            ),
-            500,
+            )
+            audio_by_index[index] = result.audio
+        results[index] = entry
+
+    succeeded = len(audio_by_index)
+    failed = len(items) - succeeded
+    summary = {
+        "total": len(items),
+        "succeeded": succeeded,
+        "failed": failed,
+        "unique": len(jobs),
+        "cache_hits": sum(1 for j in jobs.values() if j.get("result") and j["result"].cache_status == "hit"),
+    }
+    status_code = 200 if not failed else (207 if succeeded else 500)
+
+    if response_format == "zip":
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_STORED) as zf:
+            for index, audio in audio_by_index.items():
+                results[index]["file"] = f"speech_{index:04d}.mp3"
+                zf.writestr(results[index]["file"], audio)
+            manifest = {"object": "list", "data": results, "summary": summary}
+            zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+        resp = Response(buf.getvalue(), status=status_code, mimetype="application/zip")
+        resp.headers["Content-Disposition"] = 'attachment; filename="speech_batch.zip"'
+        return resp
+
+    for index, audio in audio_by_index.items():
+        results[index]["audio_base64"] = base64.b64encode(audio).decode("ascii")
+
+    return jsonify({"object": "list", "data": results, "summary": summary}), status_code
+
+
+@app.route("/v1/audio/speech/jobs", methods=["POST"])
+def create_speech_job():
+    auth_resp = _require_auth()
+    if auth_resp:
+        return auth_resp
+
+    try:
+        data = request.get_json(force=True)
+    except Exception:
+        return jsonify({"error": "Invalid JSON body"}), 400
+
+    model_id = data.get("model")
+    text_input = data.get("input")
+    if not model_id or not text_input:
+        return jsonify({"error": "Missing required fields: 'model' and 'input'"}), 400
+
+    limited = _charge_rate_limit(len(text_input))
+    if limited:
+        return limited
+
+    try:
+        job = _get_job_runner().submit(
+            {
+                "input": text_input,
+                "model": model_id,
+                "provider": data.get("provider"),
+                "options": {
+                    **_speech_options(data),
+                    "priority": _request_priority(data.get("priority"), len(text_input), default=BULK),
+                },
+            },
+            api_key_id=api_key_id(g.api_key),
         )
+    except Exception as e:
+        logger.error("创建合成任务失败: %s", str(e), exc_info=True)
+        return jsonify({"error": "Failed to create job", "details": str(e)}), 500
+
+    logger.info("speech job queued: id=%s model=%s text_len=%s", job.get("id"), model_id, len(text_input))
+    return jsonify({"object": "speech.job", **job}), 202
+
+
+@app.route("/v1/audio/speech/jobs/<job_id>", methods=["GET"])
+def get_speech_job(job_id: str):
+    auth_resp = _require_auth()
+    if auth_resp:
+        return auth_resp
+
+    # Jobs are visible only to the key that submitted them; others get 404.
+    job = _get_job_runner().store.get(job_id, api_key_id=api_key_id(g.api_key))
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    total = job.get("chunks_total") or 0
+    job["progress"] = (job.get("chunks_done") or 0) / total if total else 0.0
+    return jsonify({"object": "speech.job", **job})
 
-    audio_data = normalized_audio
 
+@app.route("/v1/audio/speech/jobs/<job_id>/content", methods=["GET"])
+def get_speech_job_content(job_id: str):
+    auth_resp = _require_auth()
+    if auth_resp:
+        return auth_resp
+
+    runner = _get_job_runner()
+    job = runner.store.get(job_id, api_key_id=api_key_id(g.api_key))
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] != "succeeded":
+        return jsonify({"error": f"Job is {job['status']}", "job": job}), 409
+
+    path = runner.store.result_path(job_id)
+    if not os.path.exists(path):
+        return jsonify({"error": "Job result expired"}), 410
+
+    with open(path, "rb") as f:
+        audio_data = f.read()
+    return _speech_response(audio_data, job.get("provider") or "", first_frame_offset=0, cache_status="job")
+
+
+def _create_speech_stream(
+    manager: Any,
+    text_input: str,
+    model_id: str,
+    provider_name: Optional[str],
+    options: Dict[str, Any],
+    cache_key: str,
+) -> Any:
+    try:
+        used_provider, chunks, errors = manager.stream_with_fallback(
+            text_input,
+            model_id,
+            provider_name=provider_name,
+            **options,
+        )
+    except Exception as e:
+        current_app.logger.error("TTS stream failed: %s", str(e), exc_info=True)
+        return jsonify({"error": "TTS generation failed", "details": str(e)}), 500
+
+    if errors:
+        current_app.logger.info("fallback attempts: %s", [e.__dict__ for e in errors])
+
+    audio_cache = _get_audio_cache() if _cacheable(manager, provider_name, used_provider, errors) else None
+
+    def generate():
+        # Keep a copy so a fully delivered stream can populate the cache.
+        buffered = []
+        for chunk in chunks:
+            if audio_cache:
+                buffered.append(chunk)
+            yield chunk
+        # Not reached when the upstream stream raised or the client went away.
+        if audio_cache:
+            _cache_streamed_audio(audio_cache, cache_key, used_provider, b"".join(buffered))
+
+    resp = Response(stream_with_context(generate()), mimetype="audio/mpeg")
+    resp.headers["Content-Disposition"] = 'inline; filename="speech.mp3"'
+    resp.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
+    resp.headers["Pragma"] = "no-cache"
+    resp.headers["Expires"] = "0"
+    resp.headers["X-Accel-Buffering"] = "no"
+
+    resp.headers["X-Audio-Validation"] = "streaming"
+    resp.headers["X-TTS-Provider"] = used_provider
+    resp.headers["X-Audio-Cache"] = "miss" if audio_cache else "bypass"
+
+    # ensure no accidental content-encoding
+    resp.headers.pop("Content-Encoding", None)
+
+    return resp
+
+
+def _cache_streamed_audio(audio_cache: AudioCache, cache_key: str, used_provider: str, audio_data: bytes) -> None:
+    """Cache a completed stream, unless it is not valid MP3 or was cut off mid-frame."""
+
+    is_valid, msg, normalized, _ = validate_and_normalize_mp3(audio_data)
+    if not is_valid or is_truncated(normalized):
+        logger.warning("streamed audio not cached: %s", msg if not is_valid else "truncated final frame")
+        return
+    audio_cache.put(cache_key, used_provider, normalized)
+
+
+def _speech_response(audio_data: bytes, used_provider: str, *, first_frame_offset: int, cache_status: str) -> Response:
     resp = Response(audio_data, mimetype="audio/mpeg")
     resp.headers["Content-Disposition"] = 'inline; filename="speech.mp3"'
     resp.headers["Content-Length"] = str(len(audio_data))
@@ -321,18 +960,13 @@ def create_speech():
 
     resp.headers["X-Audio-Size"] = str(len(audio_data))
     resp.headers["X-Audio-Validation"] = "valid"
-    resp.headers["X-Audio-FirstFrameOffset"] = str(debug.get("trimmed_offset") or debug.get("first_sync_offset") or 0)
+    resp.headers["X-Audio-FirstFrameOffset"] = str(first_frame_offset)
     resp.headers["X-TTS-Provider"] = used_provider
+    resp.headers["X-Audio-Cache"] = cache_status
 
     # ensure no accidental content-encoding
     resp.headers.pop("Content-Encoding", None)
 
-    if errors:
-        current_app.logger.info(
-            "fallback attempts: %s",
-            [e.__dict__ for e in errors],
-        )
-
     return resp
 
 
@@ -342,17 +976,26 @@ def diagnose():
 
     if request.method == "GET":
         providers = []
-        for name, provider in manager.providers.items():
-            health = provider.health_check()
-            providers.append({"name": name, "ok": health.ok, "message": health.message, "details": health.details})
-
-        nanoai = manager.providers.get("nanoai")
+        loaded = manager.providers.loaded()
+        for name in manager.providers:
+            if name not in loaded:
+                providers.append({"name": name, "loaded": False})
+                continue
+            health = _health_monitor.get(name, loaded[name])
+            providers.append({"name": name, "loaded": True, **health.to_dict()})
+
+        nanoai = loaded.get("nanoai")
         time_status = None
         last_request_time_info = None
+        upstream_pool = None
+        chunk_cache = None
         if nanoai and hasattr(nanoai, "engine"):
             try:
                 time_status = nanoai.engine.get_time_sync_status()
                 last_request_time_info = nanoai.engine.get_last_request_time_info()
+                upstream_pool = nanoai.engine.http_pool.stats()
+                upstream_pool["scheduler"] = nanoai.engine.chunk_scheduler.stats()
+                chunk_cache = nanoai.engine.chunk_cache.stats() if nanoai.engine.chunk_cache else None
             except Exception:
                 pass
 
@@ -368,6 +1011,14 @@ def diagnose():
                     "upstream_time_sync": time_status,
                     "last_upstream_request": last_request_time_info,
                 },
+                "upstream_pool": upstream_pool,
+                "audio_cache": _audio_cache.stats() if _audio_cache else None,
+                "chunk_cache": chunk_cache,
+                "warm_state": _warm_state.stats() if _warm_state else None,
+                "admission": _admission.stats() if _admission else None,
+                "rate_limit": _rate_limiter.stats() if _rate_limiter else None,
+                "coalescing": manager.coalescing_stats(),
+                "hedging": manager.hedging_stats(),
             }
         )
 
@@ -459,9 +1110,14 @@ def config_endpoint():
 
     if request.method == "GET":
         providers: Dict[str, Any] = {}
-        for name, provider in manager.providers.items():
-            health = provider.health_check()
+        loaded = manager.providers.loaded()
+        for name in manager.providers:
+            if name not in loaded:
+                providers[name] = {"loaded": False}
+                continue
+            health = _health_monitor.get(name, loaded[name])
             providers[name] = {
+                "loaded": True,
                 "health_ok": health.ok,
                 "health_message": health.message,
             }
@@ -497,6 +1153,7 @@ def config_endpoint():
         "BAIDU_SECRET_KEY",
         "ALIYUN_ACCESS_KEY_ID",
         "ALIYUN_ACCESS_KEY_SECRET",
+        *API_KEY_SETTINGS,
     }
 
     updated = []
@@ -524,7 +1181,9 @@ def config_endpoint():
         logger.info(f"  新值: ***{SERVICE_API_KEY[-4:]} (长度: {len(SERVICE_API_KEY)})")
     else:
         logger.info("SERVICE_API_KEY 无更新，保持原值")
-    
+
+    if API_KEY_SETTINGS.intersection(updated):
+        _reload_api_keys()
     _rebuild_tts_manager()
 
     return jsonify({"ok": True, "updated": updated})
@@ -537,11 +1196,14 @@ def ui_config_public():
 
     manager = _get_tts_manager()
     provider_info = {}
-    for name, provider in manager.providers.items():
-        health = provider.health_check()
+    loaded = manager.providers.loaded()
+    for name in manager.providers:
+        provider = loaded.get(name)
         provider_info[name] = {
             "name": name.capitalize(),
-            "available": health.ok,
+            "loaded": provider is not None,
+            # unknown (None) until the provider is first used
+            "available": _health_monitor.get(name, provider).ok if provider is not None else None,
         }
 
     return jsonify(
@@ -592,23 +1254,46 @@ def ui_config_secure():
     return jsonify({"ok": True})
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(REGISTRY.render(), mimetype=CONTENT_TYPE.split(";")[0], content_type=CONTENT_TYPE)
+
+
 @app.route("/health", methods=["GET"])
 def health_check():
     manager = _get_tts_manager()
 
+    # Providers are built lazily: only report those in use, and never block on
+    # one that is still warming up. Without background warm-up the default
+    # provider is checked (and built) here as before.
     provider_health: Dict[str, Any] = {}
     any_ok = False
-    for name, provider in manager.providers.items():
-        health = provider.health_check()
-        provider_health[name] = {"ok": health.ok, "message": health.message}
+    default_ready = False
+    for name in manager.providers:
+        if not manager.providers.is_loaded(name) and (STARTUP_WARMUP or name != manager.default_provider):
+            provider_health[name] = {"ok": None, "loaded": False}
+            continue
+
+        provider = manager.providers[name]
+        readiness = provider.readiness()
+        state = readiness.get("state")
+        if state == "running" or (state == "pending" and STARTUP_WARMUP):
+            provider_health[name] = {"ok": False, "message": "warming up", "readiness": readiness}
+            continue
+
+        health = _health_monitor.get(name, provider)
+        provider_health[name] = {"ok": health.ok, "message": health.message, "checked_at": health.checked_at, "readiness": provider.readiness()}
         any_ok = any_ok or health.ok
+        if name == manager.default_provider:
+            default_ready = True
 
     status_code = 200 if any_ok else 503
 
     return (
         jsonify(
             {
-                "status": "ok" if any_ok else "error",
+                "status": "ok" if any_ok else ("error" if default_ready else "starting"),
+                "ready": default_ready,
                 "timestamp": int(time.time()),
                 "providers": provider_health,
                 "default_provider": manager.default_provider,
@@ -618,6 +1303,9 @@ def health_check():
     )
 
 
+_start_warm_up()
+
+
 def main() -> None:
     logger.info("starting nami-tts on port %s", PORT)
     app.run(host="0.0.0.0", port=PORT, debug=DEBUG)
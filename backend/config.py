@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import logging
 import os
 import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from functools import partial
+from itertools import chain
+from typing import Any, Callable, Dict, ItemsView, Iterator, List, Mapping, Optional, Tuple, Union, ValuesView
 
 from backend.tts_providers.aliyun import AliyunTTSProvider
 from backend.tts_providers.azure import AzureTTSProvider
@@ -12,6 +16,17 @@ from backend.tts_providers.baidu import BaiduTTSProvider
 from backend.tts_providers.google import GoogleTTSProvider
 from backend.tts_providers.nanoai import NanoAIProvider
 from backend.tts_providers.base import TTSProvider
+from backend.utils.audio import validate_and_normalize_mp3
+from backend.utils.audio_cache import make_cache_key
+from backend.utils.circuit_breaker import OPEN, CircuitBreaker, CircuitOpenError
+from backend.utils.concurrency import RollingLatency, SingleFlight
+from backend.utils.metrics import PROVIDER_FALLBACKS, PROVIDER_REQUESTS
+from backend.utils.retry import Deadline, is_client_error
+
+
+logger = logging.getLogger("nami-tts.config")
+
+ProviderFactory = Callable[[], TTSProvider]
 
 
 def _split_csv(value: str) -> List[str]:
@@ -24,6 +39,84 @@ class ProviderAttemptError:
     error: str
 
 
+class ProviderRegistry(Mapping[str, TTSProvider]):
+    """Providers by name, each constructed from its factory on first access.
+
+    Membership, iteration and ``len`` only look at registered names, so
+    routing never builds a provider; indexing builds it once under a lock.
+    ``get``, ``items`` and ``values`` only see providers built so far.
+    """
+
+    def __init__(self, on_create: Optional[Callable[[str, TTSProvider], None]] = None) -> None:
+        self._factories: Dict[str, ProviderFactory] = {}
+        self._instances: Dict[str, TTSProvider] = {}
+        self._lock = threading.Lock()
+        self._on_create = on_create
+
+    def register(self, name: str, provider: Union[TTSProvider, ProviderFactory]) -> None:
+        with self._lock:
+            self._instances.pop(name, None)
+            if isinstance(provider, TTSProvider):
+                self._instances[name] = provider
+                self._factories[name] = lambda: provider
+            else:
+                self._factories[name] = provider
+
+    def __getitem__(self, name: str) -> TTSProvider:
+        provider = self._instances.get(name)
+        if provider is not None:
+            return provider
+        with self._lock:
+            provider = self._instances.get(name)
+            if provider is None:
+                factory = self._factories[name]
+                start = time.monotonic()
+                provider = factory()
+                if self._on_create is not None:
+                    self._on_create(name, provider)
+                self._instances[name] = provider
+                logger.info("provider %s constructed in %.3fs", name, time.monotonic() - start)
+        return provider
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._factories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._factories))
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def get(self, name: str, default: Optional[TTSProvider] = None) -> Optional[TTSProvider]:  # type: ignore[override]
+        """The provider if it is already built, else ``default``; never constructs it."""
+
+        return self._instances.get(name, default)
+
+    def items(self) -> ItemsView[str, TTSProvider]:  # type: ignore[override]
+        return self.loaded().items()
+
+    def values(self) -> ValuesView[TTSProvider]:  # type: ignore[override]
+        return self.loaded().values()
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def factory(self, name: str) -> Optional[ProviderFactory]:
+        return self._factories.get(name)
+
+    def adopt(self, name: str, provider: TTSProvider) -> None:
+        """Use an already built ``provider`` for ``name`` while keeping its registered factory."""
+
+        with self._lock:
+            if name in self._factories:
+                self._instances[name] = provider
+
+    def loaded(self) -> Dict[str, TTSProvider]:
+        """Providers constructed so far, without building the others."""
+
+        return dict(self._instances)
+
+
 class TTSManager:
     """TTS provider manager with priority + fallback."""
 
@@ -33,8 +126,16 @@ class TTSManager:
         default_provider: str = "nanoai",
         priority_order: Optional[List[str]] = None,
         models_cache_ttl_seconds: int = 2 * 60 * 60,
+        hedge_after_seconds: Optional[float] = None,
+        hedge_use_p95: bool = False,
+        hedge_max_workers: int = 16,
+        circuit_breaker_options: Optional[Dict[str, Any]] = None,
+        routing_latency_factor: float = 3.0,
+        request_deadline_seconds: float = 0.0,
     ):
-        self.providers: Dict[str, TTSProvider] = {}
+        self.providers = ProviderRegistry(on_create=self._restore_provider_state)
+        # provider warm state restored from a snapshot, applied when the provider is built
+        self._restored_provider_state: Dict[str, Dict[str, Any]] = {}
         self.default_provider = default_provider.lower().strip() or "nanoai"
         self.priority_order = priority_order or ["nanoai", "google", "azure", "baidu", "aliyun"]
         self.models_cache_ttl_seconds = models_cache_ttl_seconds
@@ -42,8 +143,177 @@ class TTSManager:
         self._models_cache: Dict[str, Tuple[float, Dict[str, str]]] = {}
         self._models_lock = threading.Lock()
 
-    def register_provider(self, name: str, provider: TTSProvider) -> None:
-        self.providers[name.lower()] = provider
+        self._inflight = SingleFlight()
+
+        # Hedging: start the next candidate when the current one is slower than
+        # hedge_after_seconds (or its own p95 when hedge_use_p95 is set).
+        self.hedge_after_seconds = hedge_after_seconds if hedge_after_seconds and hedge_after_seconds > 0 else None
+        self.hedge_use_p95 = hedge_use_p95
+        self.hedge_max_workers = max(2, hedge_max_workers)
+        self.hedges_launched = 0
+        self.hedge_wins = 0
+        self._latency: Dict[str, RollingLatency] = {}
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
+
+        # Circuit breakers (None disables them) and latency-aware ordering: a
+        # provider whose recent median latency exceeds routing_latency_factor x
+        # the fastest healthy candidate is moved behind the others.
+        self.circuit_breaker_options = circuit_breaker_options
+        self.routing_latency_factor = routing_latency_factor
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+        # Default end-to-end deadline of a synthesis request (0 = none); a
+        # per-request "timeout" option overrides it.
+        self.request_deadline_seconds = max(0.0, request_deadline_seconds)
+
+    def coalescing_stats(self) -> Dict[str, Any]:
+        return self._inflight.stats()
+
+    @property
+    def hedging_enabled(self) -> bool:
+        return self.hedge_after_seconds is not None
+
+    def _latency_window(self, name: str) -> RollingLatency:
+        window = self._latency.get(name)
+        if window is None:
+            window = self._latency.setdefault(name, RollingLatency())
+        return window
+
+    def _hedge_delay(self, name: str) -> float:
+        budget = self.hedge_after_seconds or 0.0
+        if self.hedge_use_p95:
+            window = self._latency_window(name)
+            p95 = window.percentile(0.95) if window.count() >= 20 else None
+            if p95 is not None:
+                return min(budget, p95)
+        return budget
+
+    def hedging_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.hedging_enabled,
+            "after_seconds": self.hedge_after_seconds,
+            "use_p95": self.hedge_use_p95,
+            "hedges_launched": self.hedges_launched,
+            "hedge_wins": self.hedge_wins,
+            "latency_p95_seconds": {name: w.percentile(0.95) for name, w in self._latency.items()},
+        }
+
+    def _breaker(self, name: str) -> Optional[CircuitBreaker]:
+        if self.circuit_breaker_options is None:
+            return None
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._breakers_lock:
+                breaker = self._breakers.get(name)
+                if breaker is None:
+                    breaker = CircuitBreaker(name, **self.circuit_breaker_options)
+                    self._breakers[name] = breaker
+        return breaker
+
+    def circuit_snapshot(self, name: str) -> Optional[Dict[str, Any]]:
+        breaker = self._breaker(name)
+        return breaker.snapshot() if breaker else None
+
+    def export_warm_state(self) -> Dict[str, Any]:
+        """Models caches plus the warm state of every provider built so far."""
+
+        with self._models_lock:
+            models = {
+                name: {"cached_at": cached_at, "models": models}
+                for name, (cached_at, models) in self._models_cache.items()
+            }
+        providers: Dict[str, Any] = {}
+        for name, provider in self.providers.loaded().items():
+            try:
+                state = provider.export_warm_state()
+            except Exception as e:
+                logger.warning("export warm state of provider %s failed: %s", name, str(e))
+                continue
+            if state:
+                providers[name] = state
+        return {"models": models, "providers": providers}
+
+    def restore_warm_state(self, state: Dict[str, Any]) -> None:
+        """Adopt a snapshot from :meth:`export_warm_state`; unbuilt providers get theirs on construction."""
+
+        now = time.time()
+        with self._models_lock:
+            for name, entry in (state.get("models") or {}).items():
+                cached_at = float(entry.get("cached_at") or 0)
+                if name in self.providers and now - cached_at < self.models_cache_ttl_seconds:
+                    self._models_cache.setdefault(name, (cached_at, dict(entry.get("models") or {})))
+
+        self._restored_provider_state = dict(state.get("providers") or {})
+        for name, provider in self.providers.loaded().items():
+            self._restore_provider_state(name, provider)
+
+    def _restore_provider_state(self, name: str, provider: TTSProvider) -> None:
+        state = self._restored_provider_state.pop(name, None)
+        if not state:
+            return
+        try:
+            provider.restore_warm_state(state)
+        except Exception as e:
+            logger.warning("restore warm state of provider %s failed: %s", name, str(e))
+
+    def carry_over(self, previous: "TTSManager") -> List[str]:
+        """Reuse the state of ``previous`` for every provider whose settings did not change.
+
+        Built providers (with their engines, connection pools and warm
+        caches), models caches, circuit breakers and latency windows move to
+        this manager; providers whose factory arguments differ start fresh.
+        Requests still holding ``previous`` finish on its instances. Returns
+        the names of the providers that were not carried over.
+        """
+
+        changed: List[str] = []
+        previous_loaded = previous.providers.loaded()
+        for name in self.providers:
+            if not _same_factory(previous.providers.factory(name), self.providers.factory(name)):
+                changed.append(name)
+                continue
+            if name in previous_loaded:
+                self.providers.adopt(name, previous_loaded[name])
+            with previous._models_lock:
+                cached = previous._models_cache.get(name)
+            if cached is not None:
+                with self._models_lock:
+                    self._models_cache.setdefault(name, cached)
+            if name in previous._latency:
+                self._latency.setdefault(name, previous._latency[name])
+            if self.circuit_breaker_options == previous.circuit_breaker_options and name in previous._breakers:
+                self._breakers.setdefault(name, previous._breakers[name])
+            if name in previous._restored_provider_state:
+                self._restored_provider_state.setdefault(name, previous._restored_provider_state[name])
+
+        # Keep counters monotonic and let in-flight identical requests keep collapsing.
+        self._inflight = previous._inflight
+        self.hedges_launched = previous.hedges_launched
+        self.hedge_wins = previous.hedge_wins
+        if self.hedge_max_workers == previous.hedge_max_workers:
+            self._hedge_executor = previous._hedge_executor
+        return changed
+
+    def register_provider(self, name: str, provider: Union[TTSProvider, ProviderFactory]) -> None:
+        """Register a provider instance, or a factory that builds it on first use."""
+
+        self.providers.register(name.lower(), provider)
+
+    def warm_up(self, names: Optional[List[str]] = None) -> None:
+        """Construct and warm up ``names`` (default: the default provider), logging failures."""
+
+        for name in names or [self.default_provider]:
+            if name not in self.providers:
+                continue
+            start = time.monotonic()
+            try:
+                self.providers[name].warm_up()
+            except Exception as e:
+                logger.warning("warm-up of provider %s failed: %s", name, str(e))
+                continue
+            logger.info("provider %s warmed up in %.3fs", name, time.monotonic() - start)
 
     def list_provider_names(self) -> List[str]:
         return list(self.providers.keys())
@@ -72,13 +342,40 @@ class TTSManager:
         candidates.extend(self.providers.keys())
 
         candidates = self._dedupe_keep_order([c for c in candidates if c])
-        return [c for c in candidates if c in self.providers]
+        candidates = [c for c in candidates if c in self.providers]
+        if self.circuit_breaker_options is None:
+            return candidates
+        return self._route(candidates, requested_norm)
+
+    def _route(self, candidates: List[str], requested: Optional[str]) -> List[str]:
+        """Drop providers with an open circuit and move slow ones back.
+
+        Half-open providers keep their place; their breaker admits one probe
+        at a time and other requests skip them. If every circuit is open the
+        static order is returned so requests still get a chance.
+        """
+
+        breakers = {c: self._breaker(c) for c in candidates}
+        usable = [c for c in candidates if breakers[c].state != OPEN]
+        if not usable:
+            return candidates
+
+        latency = {c: breakers[c].recent_latency() for c in usable}
+        known = [v for v in latency.values() if v is not None]
+        fastest = min(known) if known else None
+
+        def degraded(name: str) -> bool:
+            value = latency[name]
+            if not self.routing_latency_factor or fastest is None or value is None:
+                return False
+            return value > fastest * self.routing_latency_factor
+
+        return sorted(usable, key=lambda c: (c != requested, degraded(c)))
 
     def get_provider(self, name: Optional[str] = None) -> Tuple[str, TTSProvider]:
         for candidate in self.get_provider_candidates(name):
-            provider = self.providers.get(candidate)
-            if provider:
-                return candidate, provider
+            if candidate in self.providers:
+                return candidate, self.providers[candidate]
         raise KeyError("No available TTS provider")
 
     def get_models(
@@ -89,8 +386,6 @@ class TTSManager:
         last_error: Optional[Exception] = None
 
         for actual_name in self.get_provider_candidates(provider_name):
-            provider = self.providers[actual_name]
-
             if not force_refresh:
                 with self._models_lock:
                     cached = self._models_cache.get(actual_name)
@@ -100,7 +395,7 @@ class TTSManager:
                             return actual_name, models
 
             try:
-                models = provider.get_models()
+                models = self.providers[actual_name].get_models()
             except Exception as e:
                 last_error = e
                 continue
@@ -114,51 +409,264 @@ class TTSManager:
             raise last_error
         raise KeyError("No available TTS provider")
 
+    def _with_deadline(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach the request's :class:`Deadline` (``options["deadline"]``) that every layer below honours."""
+
+        if isinstance(options.get("deadline"), Deadline):
+            return options
+        return {**options, "deadline": Deadline.after(options.get("timeout") or self.request_deadline_seconds)}
+
     def generate_with_fallback(self, text: str, model: str, *, provider_name: Optional[str] = None, **options: Any) -> Tuple[str, bytes, List[ProviderAttemptError]]:
+        """Generate audio, coalescing identical concurrent requests into one upstream call."""
+
+        key = make_cache_key(provider_name or self.default_provider, model, text, **options)
+        options = self._with_deadline(options)
+        return self._inflight.do(
+            key,
+            lambda: self._generate_with_fallback(text, model, provider_name=provider_name, **options),
+        )
+
+    def _generate_with_fallback(self, text: str, model: str, *, provider_name: Optional[str] = None, **options: Any) -> Tuple[str, bytes, List[ProviderAttemptError]]:
+        options = self._with_deadline(options)
+        if self.hedging_enabled:
+            return self._generate_hedged(text, model, provider_name=provider_name, **options)
+
+        deadline: Deadline = options["deadline"]
         errors: List[ProviderAttemptError] = []
         for candidate in self.get_provider_candidates(provider_name):
-            provider = self.providers[candidate]
+            if deadline.expired():
+                errors.append(ProviderAttemptError(provider=candidate, error="request deadline exceeded"))
+                break
             try:
-                audio = provider.generate_audio(text, model, **options)
+                audio = self._timed_generate(candidate, text, model, options)
+                if errors:
+                    PROVIDER_FALLBACKS.labels(candidate).inc()
                 return candidate, audio, errors
             except Exception as e:
                 errors.append(ProviderAttemptError(provider=candidate, error=str(e)))
                 continue
         raise RuntimeError(f"All providers failed: {[e.__dict__ for e in errors]}")
 
+    def _call_provider(self, name: str, fn: Callable[[], Any]) -> Any:
+        """Run one provider call through its circuit breaker, recording the outcome."""
+
+        breaker = self._breaker(name)
+        if breaker is not None and not breaker.allow_request():
+            PROVIDER_REQUESTS.labels(name, "circuit_open").inc()
+            raise CircuitOpenError(f"circuit {breaker.state} for provider {name}")
+
+        start = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            if is_client_error(e):
+                # Invalid input or the caller's own deadline: not a provider failure.
+                PROVIDER_REQUESTS.labels(name, "client_error").inc()
+                if breaker is not None:
+                    breaker.release()
+                raise
+            PROVIDER_REQUESTS.labels(name, "error").inc()
+            if breaker is not None:
+                breaker.record(False, time.monotonic() - start)
+            raise
+        elapsed = time.monotonic() - start
+        PROVIDER_REQUESTS.labels(name, "ok").inc()
+        if breaker is not None:
+            breaker.record(True, elapsed)
+        self._latency_window(name).record(elapsed)
+        return result
+
+    def _timed_generate(self, name: str, text: str, model: str, options: Dict[str, Any]) -> bytes:
+        return self._call_provider(name, lambda: self.providers[name].generate_audio(text, model, **options))
+
+    def _hedged_attempt(self, name: str, text: str, model: str, options: Dict[str, Any]) -> bytes:
+        audio = self._timed_generate(name, text, model, options)
+        is_valid, msg, normalized, _ = validate_and_normalize_mp3(audio)
+        if not is_valid:
+            raise ValueError(msg)
+        return normalized
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        with self._hedge_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=self.hedge_max_workers,
+                    thread_name_prefix="tts-hedge",
+                )
+            return self._hedge_executor
+
+    def _generate_hedged(self, text: str, model: str, *, provider_name: Optional[str] = None, **options: Any) -> Tuple[str, bytes, List[ProviderAttemptError]]:
+        """Race candidates: start the next one whenever the newest is slower than its hedge delay.
+
+        The first valid MP3 wins; slower attempts are cancelled if still
+        queued, otherwise their result is ignored.
+        """
+
+        options = self._with_deadline(options)
+        deadline: Deadline = options["deadline"]
+        executor = self._get_hedge_executor()
+        candidates = self.get_provider_candidates(provider_name)
+        errors: List[ProviderAttemptError] = []
+        pending: Dict[Future, str] = {}
+        next_idx = 0
+
+        def launch() -> str:
+            nonlocal next_idx
+            name = candidates[next_idx]
+            next_idx += 1
+            pending[executor.submit(self._hedged_attempt, name, text, model, options)] = name
+            return name
+
+        newest = launch() if candidates else None
+        try:
+            while pending:
+                timeout = self._hedge_delay(newest) if newest and next_idx < len(candidates) else None
+                remaining = deadline.remaining()
+                if remaining is not None:
+                    timeout = max(0.0, remaining if timeout is None else min(timeout, remaining))
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done and deadline.expired():
+                    for name in pending.values():
+                        errors.append(ProviderAttemptError(provider=name, error="request deadline exceeded"))
+                    break
+                if not done:
+                    # wait() may return on the deadline clamp with every candidate already running
+                    if next_idx < len(candidates):
+                        with self._hedge_lock:
+                            self.hedges_launched += 1
+                        newest = launch()
+                    continue
+
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        audio = future.result()
+                    except Exception as e:
+                        errors.append(ProviderAttemptError(provider=name, error=str(e)))
+                        continue
+                    if name != candidates[0]:
+                        with self._hedge_lock:
+                            self.hedge_wins += 1
+                    if errors:
+                        PROVIDER_FALLBACKS.labels(name).inc()
+                    return name, audio, errors
+
+                if not pending and next_idx < len(candidates) and not deadline.expired():
+                    newest = launch()
+        finally:
+            for future in pending:
+                future.cancel()
+
+        raise RuntimeError(f"All providers failed: {[e.__dict__ for e in errors]}")
+
+    def stream_with_fallback(self, text: str, model: str, *, provider_name: Optional[str] = None, **options: Any) -> Tuple[str, Iterator[bytes], List[ProviderAttemptError]]:
+        """Like :meth:`generate_with_fallback` but returns an iterator of audio chunks.
+
+        Each candidate is primed until it yields its first chunk, so fallback
+        still applies to failures that happen before any audio is produced.
+        """
+
+        options = self._with_deadline(options)
+        deadline: Deadline = options["deadline"]
+        errors: List[ProviderAttemptError] = []
+        for candidate in self.get_provider_candidates(provider_name):
+            if deadline.expired():
+                errors.append(ProviderAttemptError(provider=candidate, error="request deadline exceeded"))
+                break
+
+            def prime() -> Tuple[bytes, Iterator[bytes]]:
+                chunks = iter(self.providers[candidate].stream_audio(text, model, **options))
+                try:
+                    return next(chunks), chunks
+                except StopIteration:
+                    raise ValueError("empty audio stream")
+
+            try:
+                first, rest = self._call_provider(candidate, prime)
+                if errors:
+                    PROVIDER_FALLBACKS.labels(candidate).inc()
+                return candidate, chain([first], rest), errors
+            except Exception as e:
+                errors.append(ProviderAttemptError(provider=candidate, error=str(e)))
+                continue
+        raise RuntimeError(f"All providers failed: {[e.__dict__ for e in errors]}")
+
+
+def _same_factory(a: Optional[ProviderFactory], b: Optional[ProviderFactory]) -> bool:
+    """Whether two provider factories build the same provider (same callable and arguments)."""
+
+    if a is None or b is None:
+        return False
+    if isinstance(a, partial) and isinstance(b, partial):
+        return a.func is b.func and a.args == b.args and a.keywords == b.keywords
+    return a == b
+
+
+def _circuit_breaker_options() -> Optional[Dict[str, Any]]:
+    if (os.getenv("CIRCUIT_BREAKER_ENABLED") or "true").lower() not in ("true", "1", "yes", "on"):
+        return None
+    return {
+        "error_threshold": float(os.getenv("CIRCUIT_ERROR_THRESHOLD") or 0.5),
+        "min_requests": int(os.getenv("CIRCUIT_MIN_REQUESTS") or 5),
+        "window_seconds": float(os.getenv("CIRCUIT_WINDOW_SECONDS") or 30),
+        "open_seconds": float(os.getenv("CIRCUIT_OPEN_SECONDS") or 15),
+        "half_open_successes": int(os.getenv("CIRCUIT_HALF_OPEN_SUCCESSES") or 3),
+    }
+
+
+def build_tts_manager(previous: Optional[TTSManager] = None) -> TTSManager:
+    """Build a manager from the environment, carrying over unchanged providers from ``previous``."""
 
-def build_tts_manager() -> TTSManager:
     default_provider = (os.getenv("DEFAULT_TTS_PROVIDER") or "nanoai").lower().strip() or "nanoai"
     priority = _split_csv(os.getenv("TTS_PROVIDER_PRIORITY") or "nanoai,google,azure,baidu,aliyun")
     ttl = int(os.getenv("MODELS_CACHE_TTL_SECONDS") or os.getenv("CACHE_DURATION") or 2 * 60 * 60)
 
-    manager = TTSManager(default_provider=default_provider, priority_order=priority, models_cache_ttl_seconds=ttl)
+    manager = TTSManager(
+        default_provider=default_provider,
+        priority_order=priority,
+        models_cache_ttl_seconds=ttl,
+        hedge_after_seconds=float(os.getenv("HEDGE_AFTER_SECONDS") or 0),
+        hedge_use_p95=(os.getenv("HEDGE_USE_P95") or "false").lower() in ("true", "1", "yes", "on"),
+        hedge_max_workers=int(os.getenv("HEDGE_MAX_WORKERS") or 16),
+        circuit_breaker_options=_circuit_breaker_options(),
+        routing_latency_factor=float(os.getenv("ROUTING_LATENCY_FACTOR") or 3),
+        request_deadline_seconds=float(os.getenv("REQUEST_DEADLINE_SECONDS") or 0),
+    )
+
+    # Providers are registered as factories and constructed on first use;
+    # settings are captured now so a later rebuild sees the same environment.
 
     # NanoAI (built-in)
-    manager.register_provider("nanoai", NanoAIProvider())
+    manager.register_provider("nanoai", NanoAIProvider)
 
     # Google (gTTS) does not require API key
-    manager.register_provider("google", GoogleTTSProvider(api_key=os.getenv("GOOGLE_API_KEY")))
+    manager.register_provider("google", partial(GoogleTTSProvider, api_key=os.getenv("GOOGLE_API_KEY")))
 
     azure_key = os.getenv("AZURE_API_KEY")
     azure_region = os.getenv("AZURE_REGION")
     azure_endpoint = os.getenv("AZURE_ENDPOINT")
     manager.register_provider(
         "azure",
-        AzureTTSProvider(api_key=azure_key, region=azure_region, endpoint=azure_endpoint),
+        partial(AzureTTSProvider, api_key=azure_key, region=azure_region, endpoint=azure_endpoint),
     )
 
     manager.register_provider(
         "baidu",
-        BaiduTTSProvider(api_key=os.getenv("BAIDU_API_KEY"), secret_key=os.getenv("BAIDU_SECRET_KEY")),
+        partial(BaiduTTSProvider, api_key=os.getenv("BAIDU_API_KEY"), secret_key=os.getenv("BAIDU_SECRET_KEY")),
     )
 
     manager.register_provider(
         "aliyun",
-        AliyunTTSProvider(
+        partial(
+            AliyunTTSProvider,
             access_key_id=os.getenv("ALIYUN_ACCESS_KEY_ID"),
             access_key_secret=os.getenv("ALIYUN_ACCESS_KEY_SECRET"),
         ),
     )
 
+    if previous is not None:
+        changed = manager.carry_over(previous)
+        logger.info("tts manager rebuilt; providers reset: %s", ", ".join(changed) or "none")
+
     return manager
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from backend.tts_providers.base import ProviderHealth, TTSProvider
+
+
+logger = logging.getLogger("nami-tts.health")
+
+
+@dataclass(frozen=True)
+class HealthSnapshot:
+    ok: bool
+    message: str
+    details: Optional[Dict[str, Any]]
+    checked_at: float
+    duration_seconds: float
+    provider: TTSProvider
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "message": self.message,
+            "details": self.details,
+            "checked_at": self.checked_at,
+            "age_seconds": round(time.time() - self.checked_at, 3),
+            "duration_seconds": round(self.duration_seconds, 4),
+        }
+
+
+class ProviderHealthMonitor:
+    """Refreshes provider health in the background and serves the last result.
+
+    Endpoints read an immutable :class:`HealthSnapshot` per provider in O(1)
+    instead of calling ``health_check()`` inline. A provider without a
+    snapshot yet (first request, or a rebuilt manager) is checked once
+    synchronously, outside the shared lock, so a hanging provider only
+    delays readers of that provider.
+    """
+
+    def __init__(self, get_manager: Callable[[], Any], *, interval_seconds: float = 30.0):
+        self.get_manager = get_manager
+        self.interval_seconds = max(1.0, interval_seconds)
+
+        self._snapshots: Dict[str, HealthSnapshot] = {}
+        # results restored from a warm-state snapshot, adopted by the first get() per provider
+        self._restored: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # per-provider locks so concurrent first reads share one synchronous check
+        self._checking: Dict[str, threading.Lock] = {}
+        self._thread_pid: Optional[int] = None
+        self._wake = threading.Event()
+
+    def _check(self, name: str, provider: TTSProvider) -> HealthSnapshot:
+        start = time.time()
+        try:
+            health = provider.health_check()
+        except Exception as e:
+            health = ProviderHealth(ok=False, message=str(e))
+        end = time.time()
+
+        snapshot = HealthSnapshot(
+            ok=health.ok,
+            message=health.message,
+            details=health.details,
+            checked_at=end,
+            duration_seconds=end - start,
+            provider=provider,
+        )
+        with self._lock:
+            self._snapshots[name] = snapshot
+        return snapshot
+
+    def refresh(self) -> None:
+        manager = self.get_manager()
+        # only providers already in use; refreshing must not construct the rest
+        for name, provider in manager.providers.loaded().items():
+            self._check(name, provider)
+
+    def get(self, name: str, provider: TTSProvider) -> HealthSnapshot:
+        self._ensure_started()
+        snapshot = self._snapshots.get(name)
+        if snapshot is not None and snapshot.provider is provider:
+            return snapshot
+
+        with self._lock:
+            restored = self._restored.pop(name, None)
+            if restored is not None:
+                snapshot = HealthSnapshot(provider=provider, **restored)
+                self._snapshots[name] = snapshot
+                return snapshot
+            checking = self._checking.setdefault(name, threading.Lock())
+
+        # health_check() does network I/O: run it without holding self._lock
+        with checking:
+            snapshot = self._snapshots.get(name)
+            if snapshot is not None and snapshot.provider is provider:
+                return snapshot
+            return self._check(name, provider)
+
+    def export(self) -> Dict[str, Dict[str, Any]]:
+        """Latest results per provider, for the warm-state snapshot."""
+
+        return {
+            name: {
+                "ok": s.ok,
+                "message": s.message,
+                "details": s.details,
+                "checked_at": s.checked_at,
+                "duration_seconds": s.duration_seconds,
+            }
+            for name, s in list(self._snapshots.items())
+        }
+
+    def restore(self, results: Dict[str, Dict[str, Any]]) -> None:
+        """Serve ``results`` (from :meth:`export`) until each provider is checked again."""
+
+        self._restored = {
+            name: {
+                "ok": bool(entry.get("ok")),
+                "message": str(entry.get("message") or ""),
+                "details": entry.get("details"),
+                "checked_at": float(entry["checked_at"]),
+                "duration_seconds": float(entry.get("duration_seconds") or 0),
+            }
+            for name, entry in results.items()
+            if name not in self._snapshots and entry.get("checked_at") is not None
+        }
+
+    def _ensure_started(self) -> None:
+        """Start the refresher thread (again in a forked child, which does not inherit it)."""
+
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            threading.Thread(target=self._loop, name="provider-health", daemon=True).start()
+
+    def _loop(self) -> None:
+        while True:
+            self._wake.wait(timeout=self.interval_seconds)
+            self._wake.clear()
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("provider health refresh failed: %s", str(e))
+
+    def trigger(self) -> None:
+        """Ask the background thread to refresh now."""
+
+        self._wake.set()
+
+
+def build_health_monitor(get_manager: Callable[[], Any]) -> ProviderHealthMonitor:
+    return ProviderHealthMonitor(
+        get_manager,
+        interval_seconds=float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS") or 30),
+    )
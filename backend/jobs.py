@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from backend.utils.metrics import MERGE_SECONDS
+from backend.utils.mp3 import concat_mp3
+from backend.utils.text import chunk_max_chars, chunk_split_mode, split_text, split_text_stable
+
+
+logger = logging.getLogger("nami-tts.jobs")
+
+# (text, model, provider_name, options) -> (used_provider, normalized mp3 bytes)
+ChunkSynthesizer = Callable[[str, str, Optional[str], Dict[str, Any]], Tuple[str, bytes]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    request TEXT NOT NULL,
+    chunks_total INTEGER NOT NULL DEFAULT 0,
+    chunks_done INTEGER NOT NULL DEFAULT 0,
+    provider TEXT,
+    error TEXT,
+    result_size INTEGER,
+    owner TEXT,
+    api_key_id TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+_PUBLIC_FIELDS = (
+    "id",
+    "status",
+    "created_at",
+    "updated_at",
+    "chunks_total",
+    "chunks_done",
+    "provider",
+    "error",
+    "result_size",
+)
+
+
+class JobStore:
+    """SQLite-backed job table plus result files under ``<cache_dir>/jobs``.
+
+    Safe to share between threads and between worker processes on the same
+    host; jobs are claimed with a conditional UPDATE and leased by heartbeat.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.root = os.path.join(cache_dir, "jobs")
+        os.makedirs(self.root, exist_ok=True)
+        self.db_path = os.path.join(self.root, "jobs.sqlite3")
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "api_key_id" not in columns:  # table created before jobs had a submitter
+                conn.execute("ALTER TABLE jobs ADD COLUMN api_key_id TEXT")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def result_path(self, job_id: str) -> str:
+        return os.path.join(self.root, f"{job_id}.mp3")
+
+    def create(self, request: Dict[str, Any], *, api_key_id: Optional[str] = None) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, created_at, updated_at, request, api_key_id) VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, now, now, json.dumps(request, ensure_ascii=False), api_key_id),
+            )
+        return self.get(job_id) or {}
+
+    def get(self, job_id: str, *, include_request: bool = False, api_key_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The job, or ``None`` if it does not exist or (with ``api_key_id``) was submitted with another key."""
+
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or (api_key_id is not None and row["api_key_id"] != api_key_id):
+            return None
+        job = {k: row[k] for k in _PUBLIC_FIELDS}
+        if include_request:
+            job["request"] = json.loads(row["request"])
+        return job
+
+    def claim(self, owner: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest queued job, or one whose lease expired."""
+
+        now = time.time()
+        token = f"{owner}:{uuid.uuid4().hex[:8]}"
+        with self._connect() as conn:
+            cur = conn.execute(
+                """
+                UPDATE jobs SET status = 'running', owner = ?, updated_at = ?
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE status = 'queued' OR (status = 'running' AND updated_at < ?)
+                    ORDER BY created_at LIMIT 1
+                ) AND (status = 'queued' OR (status = 'running' AND updated_at < ?))
+                """,
+                (token, now, now - lease_seconds, now - lease_seconds),
+            )
+            if cur.rowcount != 1:
+                return None
+            row = conn.execute("SELECT id FROM jobs WHERE owner = ?", (token,)).fetchone()
+        return self.get(row["id"], include_request=True) if row else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def purge(self, older_than_seconds: float) -> int:
+        cutoff = time.time() - older_than_seconds
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+                (cutoff,),
+            ).fetchall()
+            for row in rows:
+                try:
+                    os.remove(self.result_path(row["id"]))
+                except OSError:
+                    pass
+            conn.executemany("DELETE FROM jobs WHERE id = ?", [(row["id"],) for row in rows])
+        return len(rows)
+
+
+class JobRunner:
+    """Local worker pool that synthesizes queued jobs chunk by chunk."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        synthesize_chunk: ChunkSynthesizer,
+        *,
+        workers: int = 2,
+        chunk_concurrency: int = 3,
+        max_chars: int = 500,
+        stable_chunks: bool = False,
+        lease_seconds: float = 300,
+        ttl_seconds: float = 24 * 60 * 60,
+    ):
+        self.store = store
+        self.synthesize_chunk = synthesize_chunk
+        self.workers = max(1, workers)
+        self.chunk_concurrency = max(1, chunk_concurrency)
+        self.max_chars = max_chars
+        # content-defined boundaries let resubmitted, edited documents hit the audio cache per chunk
+        self.stable_chunks = stable_chunks
+        self.lease_seconds = lease_seconds
+        self.ttl_seconds = ttl_seconds
+
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def ensure_started(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._loop, name=f"tts-job-{i}", daemon=True)
+                self._threads.append(t)
+                t.start()
+            logger.info("job workers started: %s (owner=%s)", self.workers, self.owner)
+
+    def submit(self, request: Dict[str, Any], *, api_key_id: Optional[str] = None) -> Dict[str, Any]:
+        job = self.store.create(request, api_key_id=api_key_id)
+        self.ensure_started()
+        self._wake.set()
+        return job
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                job = self.store.claim(self.owner, self.lease_seconds)
+            except Exception as e:
+                logger.error("claim job failed: %s", str(e), exc_info=True)
+                job = None
+
+            if job is None:
+                self._maybe_purge()
+                self._wake.wait(timeout=1.0)
+                self._wake.clear()
+                continue
+
+            self._process(job)
+
+    def _maybe_purge(self) -> None:
+        now = time.time()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        try:
+            removed = self.store.purge(self.ttl_seconds)
+            if removed:
+                logger.info("purged %s expired jobs", removed)
+        except Exception as e:
+            logger.warning("purge jobs failed: %s", str(e))
+
+    def _process(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        req = job["request"]
+        max_chars = chunk_max_chars(req.get("provider"), self.max_chars) if req.get("provider") else self.max_chars
+        chunks = (split_text_stable if self.stable_chunks else split_text)(req["input"], max_chars=max_chars)
+        self.store.update(job_id, chunks_total=len(chunks), chunks_done=0)
+        logger.info("job %s started: text_len=%s chunks=%s", job_id, len(req["input"]), len(chunks))
+
+        segments: List[Optional[bytes]] = [None] * len(chunks)
+        providers = set()
+        done = 0
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job_id, stop_heartbeat), name=f"tts-job-lease-{job_id[:8]}", daemon=True
+        )
+        heartbeat.start()
+        try:
+            executor = ThreadPoolExecutor(max_workers=min(self.chunk_concurrency, len(chunks)))
+            try:
+                futures = {
+                    executor.submit(self.synthesize_chunk, chunk, req["model"], req.get("provider"), req.get("options") or {}): i
+                    for i, chunk in enumerate(chunks)
+                }
+                for future in as_completed(futures):
+                    used_provider, audio = future.result()
+                    segments[futures[future]] = audio
+                    providers.add(used_provider)
+                    done += 1
+                    self.store.update(job_id, chunks_done=done)
+            finally:
+                # on the first failure, drop queued chunks instead of waiting for them
+                executor.shutdown(wait=False, cancel_futures=True)
+
+            with MERGE_SECONDS.time():
+                merged = concat_mp3([s for s in segments if s], write_xing_header=True)
+            if not merged:
+                merged = b"".join(s for s in segments if s)
+
+            path = self.store.result_path(job_id)
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(merged)
+            os.replace(tmp, path)
+
+            self.store.update(
+                job_id,
+                status="succeeded",
+                provider=",".join(sorted(providers)),
+                result_size=len(merged),
+                error=None,
+            )
+            logger.info("job %s succeeded: %s bytes", job_id, len(merged))
+        except Exception as e:
+            logger.error("job %s failed: %s", job_id, str(e), exc_info=True)
+            self.store.update(job_id, status="failed", error=str(e))
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+    def _heartbeat(self, job_id: str, stop: threading.Event) -> None:
+        """Renew the job's lease while it runs, so a slow chunk does not let another worker claim it."""
+
+        while not stop.wait(self.lease_seconds / 3):
+            try:
+                self.store.update(job_id)
+            except Exception as e:
+                logger.warning("renew lease of job %s failed: %s", job_id, str(e))
+
+
+def build_job_runner(synthesize_chunk: ChunkSynthesizer) -> JobRunner:
+    store = JobStore(os.getenv("CACHE_DIR", "/tmp/cache"))
+    return JobRunner(
+        store,
+        synthesize_chunk,
+        workers=int(os.getenv("JOB_WORKERS") or 2),
+        chunk_concurrency=int(os.getenv("JOB_CHUNK_CONCURRENCY") or 3),
+        max_chars=chunk_max_chars(os.getenv("DEFAULT_TTS_PROVIDER") or "nanoai"),
+        stable_chunks=chunk_split_mode() == "stable",
+        lease_seconds=float(os.getenv("JOB_LEASE_SECONDS") or 300),
+        ttl_seconds=float(os.getenv("JOB_TTL_SECONDS") or 24 * 60 * 60),
+    )
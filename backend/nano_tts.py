@@ -1,25 +1,46 @@
-import urllib.request
+import urllib.error
 import urllib.parse
 import hashlib
 import json
 import os
 import logging
 import gzip
-import ssl
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Mapping
+from types import MappingProxyType
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from email.utils import parsedate_to_datetime
 import random
+import threading
 import time
-import io
-import concurrent.futures
-
-from backend.utils.audio import validate_and_normalize_mp3
-
-try:
-    from pydub import AudioSegment
-except ImportError:
-    AudioSegment = None
+from concurrent.futures import Future
+
+from backend.utils.audio import MP3StreamNormalizer, validate_and_normalize_mp3
+from backend.utils.audio_cache import build_chunk_cache, make_cache_key
+from backend.utils.concurrency import INTERACTIVE, get_chunk_scheduler
+from backend.utils.http_pool import HTTPConnectionPool
+from backend.utils.metrics import (
+    LONG_TEXT_CHUNKS,
+    MERGE_SECONDS,
+    UPSTREAM_ERRORS,
+    UPSTREAM_RETRIES,
+    UPSTREAM_SECONDS,
+    UPSTREAM_TTFB_SECONDS,
+    VALIDATION_SECONDS,
+)
+from backend.utils.mp3 import concat_mp3, extract_frames
+from backend.utils.retry import DeadlineExceeded, InvalidRequestError, UpstreamError, build_retry_policy
+from backend.utils.text import chunk_max_chars, chunk_split_mode, split_text, split_text_stable
+
+
+@dataclass(frozen=True)
+class VoiceCatalog:
+    """不可变的声音目录快照"""
+    voices: Mapping[str, Dict[str, str]]
+    version: int
+    source: str
+    fetched_at: float
+    file_mtime: Optional[float]
 
 
 class NanoAITTS:
@@ -30,32 +51,62 @@ class NanoAITTS:
         self.icon_url = 'https://bot.n.cn/favicon.ico'
         self.version = 2
         self.ua = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
-        self.voices = {}
+        self.voices = MappingProxyType({})
         self.logger = logging.getLogger('NanoAITTS')  # 添加专用日志器
         
         # 加载配置
         self.cache_dir = os.getenv('CACHE_DIR', '/tmp/cache')
+
+        # 声音目录（不可变快照，原子替换）
+        self.voices_ttl_seconds = int(os.getenv('VOICES_CACHE_TTL_SECONDS', '86400'))
+        self.voices_refresh_backoff_seconds = 60
+        self._voice_catalog: Optional[VoiceCatalog] = None
+        self._voice_lock = threading.Lock()
+        self._voice_refreshing = False
+        self._voice_refresh_attempted_at = 0.0
+        self._voice_refresh_error: Optional[str] = None
         self.http_timeout = int(os.getenv('HTTP_TIMEOUT', '30'))
         self.retry_count = int(os.getenv('RETRY_COUNT', '2'))
+        # 统一重试策略：带抖动的指数退避 + 单请求重试预算 + 截止时间
+        self.retry_policy = build_retry_policy()
+        # 长文本分片大小（NANOAI_CHUNK_MAX_CHARS / CHUNK_MAX_CHARS）
+        self.max_chars = chunk_max_chars('nanoai')
+        # 长文本片段缓存；CHUNK_SPLIT_MODE=stable 时按内容确定片段边界，编辑文档后只重新合成改动的片段
+        self.chunk_cache = build_chunk_cache()
+        self.split_mode = chunk_split_mode()
         
         # 处理代理配置，增强验证逻辑
         raw_proxy_url = os.getenv('PROXY_URL', '').strip()
         self.proxy_url = self._validate_and_clean_proxy_url(raw_proxy_url)
         self.ssl_verify = os.getenv('SSL_VERIFY', 'true').lower() in ('true', '1', 'yes', 'on')
+
+        # 复用上游 keep-alive 连接，避免每次请求都重新进行 TCP/TLS 握手
+        self.http_pool = HTTPConnectionPool(
+            proxy_url=self.proxy_url,
+            ssl_verify=self.ssl_verify,
+            maxsize=int(os.getenv('HTTP_POOL_SIZE', '10')),
+            idle_timeout=float(os.getenv('HTTP_POOL_IDLE_TIMEOUT', '60')),
+        )
         
+        # 进程级共享的上游调度器（自适应并发 + 请求间公平）
+        self.chunk_scheduler = get_chunk_scheduler('nanoai')
+
         self.logger.info(
-            f"TTS引擎配置: timeout={self.http_timeout}s, retry={self.retry_count}, proxy_enabled={bool(self.proxy_url)}, ssl_verify={self.ssl_verify}"
+            f"TTS引擎配置: timeout={self.http_timeout}s, retry={self.retry_count}, proxy_enabled={bool(self.proxy_url)}, ssl_verify={self.ssl_verify}, pool_size={self.http_pool.maxsize}"
         )
         if self.proxy_url:
             self.logger.info(f"代理配置: {self.proxy_url}")
         else:
             self.logger.info("代理配置: 未启用 (使用直连)")
 
+        # 上游地址（可指向本地模拟服务做压测，见 benchmarks/）
+        self.base_url = (os.getenv('NANOAI_BASE_URL') or 'https://bot.n.cn').strip().rstrip('/')
+
         # 时间同步/偏差诊断（用于修复Vercel容器时间漂移导致的110023）
         self.time_sync_enabled = os.getenv('TIME_SYNC_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
         self.time_drift_threshold_seconds = int(os.getenv('TIME_DRIFT_THRESHOLD_SECONDS', '30'))
         self.time_sync_interval_seconds = int(os.getenv('TIME_SYNC_INTERVAL_SECONDS', '300'))
-        self.time_sync_url = os.getenv('TIME_SYNC_URL', 'https://bot.n.cn').strip() or 'https://bot.n.cn'
+        self.time_sync_url = os.getenv('TIME_SYNC_URL', self.base_url).strip() or self.base_url
         self.time_sync_use_server_time_on_drift = (
             os.getenv('TIME_SYNC_USE_SERVER_TIME_ON_DRIFT', 'true').lower() in ('true', '1', 'yes', 'on')
         )
@@ -75,14 +126,105 @@ class NanoAITTS:
             self.time_sync_url,
             self.time_sync_use_server_time_on_drift,
         )
+        self._ensure_cache_dir()  # 确保缓存目录存在
+
+        # 时间同步与声音列表加载不在构造时阻塞执行，由 warm_up() 预热；
+        # 预热完成前到达的请求会按需同步加载
+        self._warm_up_lock = threading.Lock()
+        self._warm_up_status: Dict[str, Any] = {"state": "pending"}
+
+    def warm_up(self):
+        """预热：时间同步 + 加载声音列表（每个实例只执行一次，失败只记录日志）"""
+        with self._warm_up_lock:
+            if self._warm_up_status["state"] != "pending":
+                return
+            started_at = time.time()
+            self._warm_up_status = {"state": "running", "started_at": started_at}
+
+        error = None
         if self.time_sync_enabled:
             try:
-                self.sync_time_offset(force=True)
+                # 已从热状态快照恢复且未过期的时间偏差无需重新探测
+                self.sync_time_offset()
             except Exception as e:
-                self.logger.warning(f"启动时时间同步检查失败: {str(e)}")
+                self.logger.warning(f"预热时间同步检查失败: {str(e)}")
+        try:
+            self.load_voices()
+        except Exception as e:
+            error = str(e)
+            self.logger.warning(f"预热加载声音列表失败: {error}")
+
+        finished_at = time.time()
+        self._warm_up_status = {
+            "state": "failed" if error else "ready",
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "duration_seconds": round(finished_at - started_at, 3),
+            "error": error,
+        }
+        self.logger.info("预热完成: state=%s, 耗时 %.2f秒", self._warm_up_status["state"], finished_at - started_at)
+
+    def get_warm_up_status(self) -> Dict[str, Any]:
+        status = dict(self._warm_up_status)
+        # 预热失败或未执行，但之后的请求已成功加载声音列表，同样视为就绪
+        if status["state"] != "running" and self._voice_catalog is not None:
+            status["state"] = "ready"
+        return status
+
+    def export_warm_state(self) -> Dict[str, Any]:
+        """导出可跨进程复用的热状态：时间偏差与声音目录"""
+        state: Dict[str, Any] = {}
+        if self._time_offset_seconds is not None and self._time_offset_checked_at is not None:
+            state["time_offset"] = {
+                "offset_seconds": self._time_offset_seconds,
+                "checked_at": self._time_offset_checked_at,
+                "server_epoch_seconds": self._last_server_epoch_seconds,
+                "server_date_header": self._last_server_date_header,
+            }
+        catalog = self._voice_catalog
+        if catalog is not None:
+            state["voices"] = {
+                "voices": {tag: dict(info) for tag, info in catalog.voices.items()},
+                "fetched_at": catalog.fetched_at,
+            }
+        return state
+
+    def restore_warm_state(self, state: Dict[str, Any]) -> None:
+        """从快照恢复热状态；只恢复未过期且本进程尚未获得的部分"""
+        now = time.time()
 
-        self._ensure_cache_dir()  # 确保缓存目录存在
-        self.load_voices()
+        offset = state.get("time_offset") or {}
+        checked_at = offset.get("checked_at")
+        if (
+            self.time_sync_enabled
+            and self._time_offset_checked_at is None
+            and offset.get("offset_seconds") is not None
+            and checked_at is not None
+            and 0 <= now - checked_at < self.time_sync_interval_seconds
+        ):
+            self._time_offset_seconds = float(offset["offset_seconds"])
+            self._time_offset_checked_at = float(checked_at)
+            self._last_server_epoch_seconds = offset.get("server_epoch_seconds")
+            self._last_server_date_header = offset.get("server_date_header")
+            self.logger.info("从热状态快照恢复时间偏差: offset=%.3fs, age=%.1fs", self._time_offset_seconds, now - checked_at)
+
+        voices = state.get("voices") or {}
+        fetched_at = voices.get("fetched_at")
+        if voices.get("voices") and fetched_at is not None and now - fetched_at < self.voices_ttl_seconds:
+            with self._voice_lock:
+                if self._voice_catalog is None:
+                    self._set_voice_catalog(VoiceCatalog(
+                        voices=MappingProxyType(dict(voices["voices"])),
+                        version=1,
+                        source='snapshot',
+                        fetched_at=float(fetched_at),
+                        file_mtime=None,
+                    ))
+                    self.logger.info(f"从热状态快照恢复 {len(self.voices)} 个声音模型")
+
+    def _ensure_voices(self):
+        if self._voice_catalog is None:
+            self.load_voices()
     
     def _validate_and_clean_proxy_url(self, raw_url: str) -> Optional[str]:
         """
@@ -164,22 +306,6 @@ class NanoAITTS:
         except Exception as e:
             self.logger.error(f"创建缓存目录失败 (未预期的错误): {str(e)}", exc_info=True)
 
-    def _get_opener(self) -> urllib.request.OpenerDirector:
-        handlers = []
-
-        if self.proxy_url:
-            handlers.append(
-                urllib.request.ProxyHandler({'http': self.proxy_url, 'https': self.proxy_url})
-            )
-
-        if not self.ssl_verify:
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            handlers.append(urllib.request.HTTPSHandler(context=ssl_context))
-
-        return urllib.request.build_opener(*handlers)
-
     def _parse_http_date_to_epoch(self, date_header: str) -> Optional[float]:
         if not date_header:
             return None
@@ -222,7 +348,6 @@ class NanoAITTS:
         ):
             return status
 
-        opener = self._get_opener()
         headers = {"User-Agent": self.ua}
 
         # HEAD更轻量，但部分站点可能不支持
@@ -231,43 +356,42 @@ class NanoAITTS:
         for method in request_methods:
             start = time.time()
             try:
-                req = urllib.request.Request(self.time_sync_url, headers=headers, method=method)
-                with opener.open(req, timeout=self.http_timeout) as response:
-                    end = time.time()
-                    date_header = response.headers.get('Date') or response.headers.get('date')
-                    server_epoch = self._parse_http_date_to_epoch(date_header)
-
-                    if server_epoch is None:
-                        last_error = f"无法解析Date头: {date_header}"
-                        continue
+                response = self.http_pool.request(method, self.time_sync_url, headers=headers, timeout=self.http_timeout)
+                end = time.time()
+                date_header = response.headers.get('Date') or response.headers.get('date')
+                server_epoch = self._parse_http_date_to_epoch(date_header)
 
-                    local_midpoint = (start + end) / 2
-                    offset = server_epoch - local_midpoint
+                if server_epoch is None:
+                    last_error = f"无法解析Date头: {date_header}"
+                    continue
 
-                    self._time_offset_seconds = offset
-                    self._time_offset_checked_at = end
-                    self._last_server_epoch_seconds = server_epoch
-                    self._last_server_date_header = date_header
-                    self._last_time_sync_error = None
-                    last_error = None
+                local_midpoint = (start + end) / 2
+                offset = server_epoch - local_midpoint
 
-                    drift = abs(offset)
-                    self.logger.info(
-                        "时间同步检查: server_epoch=%.3f local_epoch=%.3f offset=%.3fs drift=%.3fs method=%s",
-                        server_epoch,
-                        local_midpoint,
+                self._time_offset_seconds = offset
+                self._time_offset_checked_at = end
+                self._last_server_epoch_seconds = server_epoch
+                self._last_server_date_header = date_header
+                self._last_time_sync_error = None
+                last_error = None
+
+                drift = abs(offset)
+                self.logger.info(
+                    "时间同步检查: server_epoch=%.3f local_epoch=%.3f offset=%.3fs drift=%.3fs method=%s",
+                    server_epoch,
+                    local_midpoint,
+                    offset,
+                    drift,
+                    method,
+                )
+                if drift > self.time_drift_threshold_seconds:
+                    self.logger.warning(
+                        "检测到设备时间偏差过大(> %ss): offset=%.3fs。将尝试使用服务器时间生成timestamp以避免110023",
+                        self.time_drift_threshold_seconds,
                         offset,
-                        drift,
-                        method,
                     )
-                    if drift > self.time_drift_threshold_seconds:
-                        self.logger.warning(
-                            "检测到设备时间偏差过大(> %ss): offset=%.3fs。将尝试使用服务器时间生成timestamp以避免110023",
-                            self.time_drift_threshold_seconds,
-                            offset,
-                        )
 
-                    break
+                break
 
             except Exception as e:
                 last_error = f"{method}请求失败: {str(e)}"
@@ -394,42 +518,21 @@ class NanoAITTS:
             'User-Agent': self.ua
         }
     
-    def http_get(self, url, headers, timeout=None, retry_count=None):
+    def http_get(self, url, headers, timeout=None, retry_count=None, deadline=None):
         """使用标准库发送 GET 请求，支持重试和代理"""
         # 使用默认配置或参数传入的配置
         timeout = timeout or self.http_timeout
-        retry_count = retry_count if retry_count is not None else self.retry_count
-        
-        # 构建请求对象
-        req = urllib.request.Request(url, headers=headers)
+        ctx = self._retry_context(retry_count, deadline)
         
-        # 配置代理
-        if self.proxy_url:
-            proxy_handler = urllib.request.ProxyHandler({'http': self.proxy_url, 'https': self.proxy_url})
-            opener = urllib.request.build_opener(proxy_handler)
-            self.logger.debug(f"使用代理: {self.proxy_url}")
-        else:
-            opener = urllib.request.build_opener()
-        
-        # 配置SSL验证
-        if not self.ssl_verify:
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            opener.add_handler(urllib.request.HTTPSHandler(context=ssl_context))
-            self.logger.debug("SSL证书验证已禁用")
-        
-        for attempt in range(retry_count + 1):
+        for attempt in range(ctx.max_retries + 1):
+            attempt_timeout = ctx.attempt_timeout(timeout)
             try:
-                with opener.open(req, timeout=timeout) as response:
-                    response_data = response.read().decode('utf-8')
-                    
-                    # 检查响应状态码
-                    if response.getcode() >= 400:
-                        raise Exception(f"HTTP错误状态码: {response.getcode()}")
-                    
-                    self.logger.debug(f"HTTP GET请求成功 (尝试 {attempt + 1}): {len(response_data)} bytes")
-                    return response_data
+                # 通过连接池发送请求（代理与SSL验证配置在连接池中统一处理）
+                response = self.http_pool.request('GET', url, headers=headers, timeout=attempt_timeout)
+                response_data = response.data.decode('utf-8')
+                
+                self.logger.debug(f"HTTP GET请求成功 (尝试 {attempt + 1}): {len(response_data)} bytes")
+                return response_data
                     
             except urllib.error.HTTPError as e:
                 error_msg = f"HTTP GET请求失败 (尝试 {attempt + 1}) - HTTP错误: {e.code} - {e.reason}"
@@ -437,24 +540,26 @@ class NanoAITTS:
                 
                 # 如果是客户端错误（4xx），不重试
                 if 400 <= e.code < 500:
-                    raise Exception(f"HTTP GET请求失败: {e.code} - {e.reason}")
+                    raise UpstreamError(f"HTTP GET请求失败: {e.code} - {e.reason}", status=e.code)
                 
                 # 服务器错误（5xx）可以重试
-                if attempt < retry_count:
-                    self.logger.info(f"将在2秒后重试...")
-                    time.sleep(2)
+                delay = ctx.backoff(attempt)
+                if delay is not None:
+                    self.logger.info(f"将在{delay:.2f}秒后重试...")
+                    time.sleep(delay)
                     continue
                 else:
                     self.logger.error(error_msg, exc_info=True)
-                    raise Exception(f"HTTP GET请求失败: {e.code} - {e.reason}")
+                    raise UpstreamError(f"HTTP GET请求失败: {e.code} - {e.reason}", status=e.code)
                     
             except urllib.error.URLError as e:
                 error_msg = f"HTTP GET请求失败 (尝试 {attempt + 1}) - URL错误: {e.reason}"
                 self.logger.warning(error_msg)
                 
-                if attempt < retry_count:
-                    self.logger.info(f"将在2秒后重试...")
-                    time.sleep(2)
+                delay = ctx.backoff(attempt)
+                if delay is not None:
+                    self.logger.info(f"将在{delay:.2f}秒后重试...")
+                    time.sleep(delay)
                     continue
                 else:
                     self.logger.error(error_msg, exc_info=True)
@@ -464,9 +569,10 @@ class NanoAITTS:
                 error_msg = f"HTTP GET请求失败 (尝试 {attempt + 1}) - 未知错误: {str(e)}"
                 self.logger.error(error_msg, exc_info=True)
                 
-                if attempt < retry_count:
-                    self.logger.info(f"将在2秒后重试...")
-                    time.sleep(2)
+                delay = ctx.backoff(attempt)
+                if delay is not None:
+                    self.logger.info(f"将在{delay:.2f}秒后重试...")
+                    time.sleep(delay)
                     continue
                 else:
                     raise Exception(f"HTTP GET请求失败: {str(e)}")
@@ -474,51 +580,34 @@ class NanoAITTS:
         # 理论上不会到达这里
         raise Exception("所有重试尝试均失败")
     
-    def http_post(self, url, data, headers, timeout=None, retry_count=None, return_headers: bool = False):
+    def http_post(self, url, data, headers, timeout=None, retry_count=None, return_headers: bool = False, deadline=None):
         """使用标准库发送 POST 请求，支持重试和代理"""
         # 使用默认配置或参数传入的配置
         timeout = timeout or self.http_timeout
-        retry_count = retry_count if retry_count is not None else self.retry_count
+        ctx = self._retry_context(retry_count, deadline)
         
         data_bytes = data.encode('utf-8')
         
-        # 构建请求对象
-        req = urllib.request.Request(url, data=data_bytes, headers=headers, method='POST')
-        
-        # 配置代理
-        if self.proxy_url:
-            proxy_handler = urllib.request.ProxyHandler({'http': self.proxy_url, 'https': self.proxy_url})
-            opener = urllib.request.build_opener(proxy_handler)
-            self.logger.debug(f"使用代理: {self.proxy_url}")
-        else:
-            opener = urllib.request.build_opener()
-        
-        # 配置SSL验证
-        if not self.ssl_verify:
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            opener.add_handler(urllib.request.HTTPSHandler(context=ssl_context))
-            self.logger.debug("SSL证书验证已禁用")
-        
-        for attempt in range(retry_count + 1):
+        for attempt in range(ctx.max_retries + 1):
+            attempt_timeout = ctx.attempt_timeout(timeout)
             try:
-                with opener.open(req, timeout=timeout) as response:
+                # 通过连接池发送请求（代理与SSL验证配置在连接池中统一处理）
+                start = time.perf_counter()
+                with self.http_pool.open('POST', url, body=data_bytes, headers=headers, timeout=attempt_timeout) as response:
+                    UPSTREAM_TTFB_SECONDS.labels('nanoai').observe(time.perf_counter() - start)
                     response_data = response.read()
                     response_headers = dict(response.headers.items())
-                    
-                    # 检查响应状态码
-                    if response.getcode() >= 400:
-                        raise Exception(f"HTTP错误状态码: {response.getcode()}")
-                    
-                    self.logger.debug(f"HTTP POST请求成功 (尝试 {attempt + 1}): {len(response_data)} bytes")
-                    if return_headers:
-                        return response_data, response_headers
-                    return response_data
+                UPSTREAM_SECONDS.labels('nanoai').observe(time.perf_counter() - start)
+                
+                self.logger.debug(f"HTTP POST请求成功 (尝试 {attempt + 1}): {len(response_data)} bytes")
+                if return_headers:
+                    return response_data, response_headers
+                return response_data
                     
             except urllib.error.HTTPError as e:
                 error_msg = f"HTTP POST请求失败 (尝试 {attempt + 1}) - HTTP错误: {e.code} - {e.reason}"
                 self.logger.warning(error_msg)
+                UPSTREAM_ERRORS.labels('nanoai', e.code).inc()
                 
                 # 如果是客户端错误（4xx），不重试
                 if 400 <= e.code < 500:
@@ -528,24 +617,28 @@ class NanoAITTS:
                         self.logger.error(f"错误响应体: {error_body[:500]}")
                     except:
                         pass
-                    raise Exception(f"HTTP POST请求失败: {e.code} - {e.reason}")
+                    raise UpstreamError(f"HTTP POST请求失败: {e.code} - {e.reason}", status=e.code)
                 
                 # 服务器错误（5xx）可以重试
-                if attempt < retry_count:
-                    self.logger.info(f"将在2秒后重试...")
-                    time.sleep(2)
+                delay = ctx.backoff(attempt)
+                if delay is not None:
+                    self.logger.info(f"将在{delay:.2f}秒后重试...")
+                    UPSTREAM_RETRIES.labels('nanoai', 'http').inc()
+                    time.sleep(delay)
                     continue
                 else:
                     self.logger.error(error_msg, exc_info=True)
-                    raise Exception(f"HTTP POST请求失败: {e.code} - {e.reason}")
+                    raise UpstreamError(f"HTTP POST请求失败: {e.code} - {e.reason}", status=e.code)
                     
             except urllib.error.URLError as e:
                 error_msg = f"HTTP POST请求失败 (尝试 {attempt + 1}) - URL错误: {e.reason}"
                 self.logger.warning(error_msg)
                 
-                if attempt < retry_count:
-                    self.logger.info(f"将在2秒后重试...")
-                    time.sleep(2)
+                delay = ctx.backoff(attempt)
+                if delay is not None:
+                    self.logger.info(f"将在{delay:.2f}秒后重试...")
+                    UPSTREAM_RETRIES.labels('nanoai', 'http').inc()
+                    time.sleep(delay)
                     continue
                 else:
                     self.logger.error(error_msg, exc_info=True)
@@ -555,9 +648,11 @@ class NanoAITTS:
                 error_msg = f"HTTP POST请求失败 (尝试 {attempt + 1}) - 未知错误: {str(e)}"
                 self.logger.error(error_msg, exc_info=True)
                 
-                if attempt < retry_count:
-                    self.logger.info(f"将在2秒后重试...")
-                    time.sleep(2)
+                delay = ctx.backoff(attempt)
+                if delay is not None:
+                    self.logger.info(f"将在{delay:.2f}秒后重试...")
+                    UPSTREAM_RETRIES.labels('nanoai', 'http').inc()
+                    time.sleep(delay)
                     continue
                 else:
                     raise Exception(f"HTTP POST请求失败: {str(e)}")
@@ -565,79 +660,188 @@ class NanoAITTS:
         # 理论上不会到达这里
         raise Exception("所有重试尝试均失败")
     
-    def load_voices(self):
-        """加载声音列表"""
+    def _retry_context(self, retry_count=None, deadline=None, calls=1):
+        """按统一重试策略创建单个请求的重试上下文（共享截止时间与重试预算）"""
+        retry_count = retry_count if retry_count is not None else self.retry_count
+        return self.retry_policy.context(retry_count, deadline, calls)
+
+    def load_voices(self, force=False):
+        """加载声音列表
+
+        声音目录为不可变快照，整体原子替换；过期后继续返回旧数据，
+        同时仅由一个后台线程刷新（stale-while-revalidate）。
+        缓存文件仅在 mtime 变化时重新解析。
+        """
         filename = os.path.join(self.cache_dir, 'robots.json')  # 使用配置的缓存目录
-        
+        catalog = self._voice_catalog
+
+        if catalog is None or force:
+            with self._voice_lock:
+                if self._voice_catalog is None or force:
+                    self._set_voice_catalog(self._load_voice_catalog(filename, prefer_file=not force))
+            return
+
+        # 其他进程/线程更新了缓存文件：仅在 mtime 变化时重新解析
+        file_mtime = self._file_mtime(filename)
+        if file_mtime is not None and file_mtime != catalog.file_mtime:
+            with self._voice_lock:
+                if file_mtime != self._voice_catalog.file_mtime:
+                    updated = self._read_voice_file(filename, file_mtime)
+                    if updated is not None:
+                        self._set_voice_catalog(updated)
+                        catalog = updated
+
+        if time.time() - catalog.fetched_at >= self.voices_ttl_seconds:
+            self._refresh_voices_in_background(filename)
+
+    def get_voice_catalog_status(self) -> Dict[str, Any]:
+        catalog = self._voice_catalog
+        if catalog is None:
+            return {"loaded": False}
+        return {
+            "loaded": True,
+            "version": catalog.version,
+            "source": catalog.source,
+            "count": len(catalog.voices),
+            "fetched_at": catalog.fetched_at,
+            "age_seconds": time.time() - catalog.fetched_at,
+            "ttl_seconds": self.voices_ttl_seconds,
+            "refreshing": self._voice_refreshing,
+            "last_refresh_error": self._voice_refresh_error,
+        }
+
+    def _set_voice_catalog(self, catalog: "VoiceCatalog"):
+        self._voice_catalog = catalog
+        self.voices = catalog.voices
+
+    def _file_mtime(self, filename) -> Optional[float]:
+        try:
+            return os.stat(filename).st_mtime
+        except OSError:
+            return None
+
+    def _catalog_from_data(self, data, source, fetched_at, file_mtime) -> "VoiceCatalog":
+        voices = {
+            item['tag']: {
+                'name': item['title'],
+                'iconUrl': item['icon']
+            }
+            for item in data['data']['list']
+        }
+        previous = self._voice_catalog
+        return VoiceCatalog(
+            voices=MappingProxyType(voices),
+            version=(previous.version + 1) if previous else 1,
+            source=source,
+            fetched_at=fetched_at,
+            file_mtime=file_mtime,
+        )
+
+    def _read_voice_file(self, filename, file_mtime) -> Optional["VoiceCatalog"]:
+        self.logger.info(f"从缓存文件加载声音列表: {filename}")
         try:
-            # 首先尝试从缓存文件加载
-            if os.path.exists(filename):
-                self.logger.info(f"从缓存文件加载声音列表: {filename}")
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"加载缓存文件失败: {str(e)}")
+            return None
+
+        # 验证缓存数据格式
+        if not self._validate_voice_data(data):
+            self.logger.warning("缓存文件数据格式不正确，将重新从网络获取")
+            return None
+
+        catalog = self._catalog_from_data(data, 'file', file_mtime, file_mtime)
+        self.logger.info(f"从缓存成功加载 {len(catalog.voices)} 个声音模型")
+        return catalog
+
+    def _fetch_voice_catalog(self, filename) -> "VoiceCatalog":
+        """从网络获取声音列表并写入缓存文件"""
+        self.logger.info("从网络获取声音列表...")
+        api_url = f'{self.base_url}/api/robot/platform'
+        
+        ctx = self._retry_context(2)  # 最多尝试3次
+        for attempt in range(ctx.max_retries + 1):
+            try:
+                self.sync_time_offset()
+                headers = self.get_headers()
+                response_text = self.http_get(api_url, headers, retry_count=0)
+                data = json.loads(response_text)
+                
+                if not self._validate_voice_data(data):
+                    raise Exception("API返回的数据格式不正确")
+
+                # 保存到缓存文件（先写临时文件再原子替换）
+                file_mtime = None
                 try:
-                    with open(filename, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    # 验证缓存数据格式
-                    if self._validate_voice_data(data):
-                        self.voices.clear()
-                        for item in data['data']['list']:
-                            self.voices[item['tag']] = {
-                                'name': item['title'],
-                                'iconUrl': item['icon']
-                            }
-                        self.logger.info(f"从缓存成功加载 {len(self.voices)} 个声音模型")
-                        return
-                    else:
-                        self.logger.warning("缓存文件数据格式不正确，将重新从网络获取")
-                        
+                    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+                    with open(tmp_filename, 'w', encoding='utf-8') as f:
+                        json.dump(data, f, ensure_ascii=False, indent=2)
+                    os.replace(tmp_filename, filename)
+                    file_mtime = self._file_mtime(filename)
+                    self.logger.info(f"声音列表已缓存到: {filename}")
                 except Exception as e:
-                    self.logger.warning(f"加载缓存文件失败: {str(e)}")
-            
-            # 从网络获取声音列表
-            self.logger.info("从网络获取声音列表...")
-            api_url = 'https://bot.n.cn/api/robot/platform'
-            
-            for attempt in range(3):  # 最多尝试3次
-                try:
-                    self.sync_time_offset()
-                    headers = self.get_headers()
-                    response_text = self.http_get(api_url, headers)
-                    data = json.loads(response_text)
+                    self.logger.warning(f"保存缓存文件失败: {str(e)}")
+                
+                catalog = self._catalog_from_data(data, 'network', time.time(), file_mtime)
+                self.logger.info(f"从网络成功加载 {len(catalog.voices)} 个声音模型")
+                return catalog
                     
-                    if self._validate_voice_data(data):
-                        # 保存到缓存文件
-                        try:
-                            with open(filename, 'w', encoding='utf-8') as f:
-                                json.dump(data, f, ensure_ascii=False, indent=2)
-                            self.logger.info(f"声音列表已缓存到: {filename}")
-                        except Exception as e:
-                            self.logger.warning(f"保存缓存文件失败: {str(e)}")
-                        
-                        # 清空旧的声音列表并更新
-                        self.voices.clear()
-                        for item in data['data']['list']:
-                            self.voices[item['tag']] = {
-                                'name': item['title'],
-                                'iconUrl': item['icon']
-                            }
-                        self.logger.info(f"从网络成功加载 {len(self.voices)} 个声音模型")
-                        return
-                    else:
-                        raise Exception("API返回的数据格式不正确")
-                        
-                except Exception as e:
-                    self.logger.warning(f"网络获取声音列表失败 (尝试 {attempt + 1}): {str(e)}")
-                    if attempt < 2:  # 不是最后一次尝试
-                        time.sleep(2)  # 等待2秒后重试
-                    else:
-                        raise
-                        
+            except Exception as e:
+                self.logger.warning(f"网络获取声音列表失败 (尝试 {attempt + 1}): {str(e)}")
+                delay = ctx.backoff(attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+        raise Exception("所有重试尝试均失败")
+
+    def _load_voice_catalog(self, filename, prefer_file=True) -> "VoiceCatalog":
+        # 首先尝试从缓存文件加载
+        file_mtime = self._file_mtime(filename)
+        if prefer_file and file_mtime is not None:
+            catalog = self._read_voice_file(filename, file_mtime)
+            if catalog is not None:
+                return catalog
+
+        try:
+            return self._fetch_voice_catalog(filename)
         except Exception as e:
             self.logger.error(f"加载声音列表失败: {str(e)}", exc_info=True)
-            self.voices.clear()
-            # 如果网络请求失败，添加默认选项
-            self.voices['DeepSeek'] = {'name': 'DeepSeek (默认)', 'iconUrl': ''}
+            self._voice_refresh_error = str(e)
+            if self._voice_catalog is not None:
+                return self._voice_catalog
+            # 如果网络请求失败，添加默认选项（立即视为过期，后续请求会触发后台刷新）
             self.logger.warning("使用默认声音模型")
+            return VoiceCatalog(
+                voices=MappingProxyType({'DeepSeek': {'name': 'DeepSeek (默认)', 'iconUrl': ''}}),
+                version=1,
+                source='default',
+                fetched_at=0.0,
+                file_mtime=None,
+            )
+
+    def _refresh_voices_in_background(self, filename):
+        now = time.time()
+        with self._voice_lock:
+            if self._voice_refreshing or now - self._voice_refresh_attempted_at < self.voices_refresh_backoff_seconds:
+                return
+            self._voice_refreshing = True
+            self._voice_refresh_attempted_at = now
+
+        def refresh():
+            try:
+                catalog = self._fetch_voice_catalog(filename)
+                with self._voice_lock:
+                    self._set_voice_catalog(catalog)
+                self._voice_refresh_error = None
+            except Exception as e:
+                self._voice_refresh_error = str(e)
+                self.logger.warning(f"后台刷新声音列表失败，继续使用旧数据: {str(e)}")
+            finally:
+                self._voice_refreshing = False
+
+        threading.Thread(target=refresh, name="nanoai-voices-refresh", daemon=True).start()
     
     def _validate_voice_data(self, data):
         """验证声音数据格式"""
@@ -653,41 +857,20 @@ class NanoAITTS:
         except Exception:
             return False
     
-    def split_text(self, text, max_chars=500):
+    def split_text(self, text, max_chars=None):
         """
-        智能分割文本，尽量在标点处分割
+        智能分割文本：按句切分，默认使片段长度均衡；CHUNK_SPLIT_MODE=stable 时使用内容确定的稳定边界
         """
-        if len(text) <= max_chars:
-            return [text]
-        
-        chunks = []
-        separators = ['。', '！', '？', '；', '\n', '.', '!', '?', ';']
-        
-        i = 0
-        while i < len(text):
-            if i + max_chars >= len(text):
-                chunks.append(text[i:])
-                break
-            
-            split_pos = -1
-            search_end = min(i + max_chars, len(text))
-            
-            for j in range(search_end - 1, i + max_chars // 2, -1):
-                if text[j] in separators:
-                    split_pos = j + 1
-                    break
-            
-            if split_pos == -1:
-                split_pos = i + max_chars
-            
-            chunks.append(text[i:split_pos])
-            i = split_pos
-        
-        return chunks
+        if self.split_mode == 'stable':
+            return split_text_stable(text, max_chars=max_chars or self.max_chars)
+        return split_text(text, max_chars=max_chars or self.max_chars)
     
     def merge_audio_files(self, audio_data_list):
         """
         合并多个音频文件数据 (bytes)
+
+        按MP3帧直接拼接（去除各片段的ID3/Xing头），不解码也不重新编码，
+        并为合并结果写入一个正确的Xing/Info头。
         """
         if not audio_data_list:
             return b""
@@ -695,53 +878,84 @@ class NanoAITTS:
         if len(audio_data_list) == 1:
             return audio_data_list[0]
         
-        if AudioSegment is None:
-            self.logger.warning("pydub 未安装，无法智能合并音频，将使用直接拼接（可能会有杂音）")
+        with MERGE_SECONDS.time():
+            merged = concat_mp3(audio_data_list, write_xing_header=True)
+        if not merged:
+            self.logger.warning("未能解析MP3帧，将使用直接拼接（可能会有杂音）")
             return b"".join(audio_data_list)
+        return merged
+    
+    def iter_long_text(self, text, voice, speed, pitch, volume, language, gender, timeout, ctx, priority=INTERACTIVE):
+        """流水线处理长文本：并发生成各片段，并按文本顺序逐个产出
+
+        每当前缀片段全部完成即可产出，无需等待最慢的片段；
+        生成器被提前关闭时会取消尚未开始的片段。
+        """
+        chunks = self.split_text(text)
+        self.logger.info(f"文本过长({len(text)}字符)，已分割为 {len(chunks)} 个片段处理")
+        LONG_TEXT_CHUNKS.labels('nanoai').observe(len(chunks))
         
+        # 命中片段缓存的片段直接复用，只有改动过的片段需要请求上游
+        futures = [None] * len(chunks)
+        misses = []
+        for i, chunk in enumerate(chunks):
+            cached = self._chunk_cache_get(chunk, voice, speed, pitch, volume, language, gender)
+            if cached is None:
+                misses.append(i)
+                continue
+            futures[i] = Future()
+            futures[i].set_result(cached)
+        if self.chunk_cache:
+            self.logger.info(f"片段缓存命中 {len(chunks) - len(misses)}/{len(chunks)}，需合成 {len(misses)} 个片段")
+        # 所有片段共享同一截止时间，重试预算按需请求上游的片段数计算
+        ctx = ctx.for_calls(len(misses))
+
+        # 片段提交到进程级共享调度器：并发上限按上游延迟/错误自适应调整，
+        # 交互类请求优先且有预留槽位，同类请求之间轮转执行，避免超长文档挤占短请求
+        submitted = self.chunk_scheduler.submit_group([
+            (self._fetch_chunk, (chunks[i], voice, speed, pitch, volume, language, gender, timeout, ctx))
+            for i in misses
+        ], priority)
+        for i, future in zip(misses, submitted):
+            futures[i] = future
         try:
-            combined = AudioSegment.empty()
-            for data in audio_data_list:
-                if not data:
-                    continue
-                segment = AudioSegment.from_mp3(io.BytesIO(data))
-                combined += segment
-            
-            output = io.BytesIO()
-            combined.export(output, format="mp3")
-            return output.getvalue()
-        except Exception as e:
-            self.logger.error(f"合并音频失败: {str(e)}，尝试直接拼接", exc_info=True)
-            return b"".join(audio_data_list)
+            for i, future in enumerate(futures):
+                try:
+                    data = future.result()
+                except Exception as e:
+                    self.logger.error(f"片段 {i+1} 处理失败: {str(e)}")
+                    raise
+                self.logger.info(f"片段 {i+1}/{len(chunks)} 处理完成")
+                yield data
+        finally:
+            for future in futures:
+                future.cancel()
     
-    def process_long_text(self, text, voice, speed, pitch, volume, language, gender, timeout, retry_count):
+    def _chunk_cache_key(self, chunk, voice, speed, pitch, volume, language, gender):
+        return make_cache_key(
+            'nanoai', voice, chunk,
+            speed=speed, pitch=pitch, volume=volume, language=language, gender=gender,
+        )
+
+    def _chunk_cache_get(self, chunk, voice, speed, pitch, volume, language, gender):
+        if not self.chunk_cache:
+            return None
+        hit = self.chunk_cache.get(self._chunk_cache_key(chunk, voice, speed, pitch, volume, language, gender))
+        return hit[1] if hit else None
+
+    def _fetch_chunk(self, chunk, voice, speed, pitch, volume, language, gender, timeout, ctx):
+        """合成单个长文本片段，并写入片段缓存"""
+        audio = self._fetch_audio(chunk, voice, speed, pitch, volume, language, gender, timeout, ctx)
+        if self.chunk_cache:
+            self.chunk_cache.put(self._chunk_cache_key(chunk, voice, speed, pitch, volume, language, gender), 'nanoai', audio)
+        return audio
+
+    def process_long_text(self, text, voice, speed, pitch, volume, language, gender, timeout, ctx, priority=INTERACTIVE):
         """处理长文本：分割、生成、合并"""
-        chunks = self.split_text(text, max_chars=500)
-        self.logger.info(f"文本过长({len(text)}字符)，已分割为 {len(chunks)} 个片段处理")
-        
-        max_workers = 3
-        audio_segments = [None] * len(chunks)
-        
         try:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_index = {
-                    executor.submit(
-                        self.get_audio,
-                        chunk, voice, speed, pitch, volume, language, gender, timeout, retry_count
-                    ): i
-                    for i, chunk in enumerate(chunks)
-                }
-                
-                for future in concurrent.futures.as_completed(future_to_index):
-                    i = future_to_index[future]
-                    try:
-                        data = future.result()
-                        audio_segments[i] = data
-                        self.logger.info(f"片段 {i+1}/{len(chunks)} 处理完成")
-                    except Exception as e:
-                        self.logger.error(f"片段 {i+1} 处理失败: {str(e)}")
-                        raise
-                
+            audio_segments = list(
+                self.iter_long_text(text, voice, speed, pitch, volume, language, gender, timeout, ctx, priority)
+            )
             self.logger.info(f"所有片段处理完成，正在合并...")
             return self.merge_audio_files(audio_segments)
         
@@ -749,22 +963,8 @@ class NanoAITTS:
             self.logger.error(f"处理长文本失败: {str(e)}", exc_info=True)
             raise
     
-    def get_audio(self, text, voice='DeepSeek', speed=1.0, pitch=1.0, volume=1.0, language=None, gender=None, timeout=60, retry_count=2):
-        """获取音频"""
-        if not text or not text.strip():
-            raise ValueError("文本不能为空")
-
-        if voice not in self.voices:
-            raise ValueError(f"不支持的声音模型: {voice}")
-
-        # 检查是否需要分割文本
-        max_chars = 500
-        if len(text) > max_chars:
-            return self.process_long_text(text, voice, speed, pitch, volume, language, gender, timeout, retry_count)
-
-        url = f'https://bot.n.cn/api/tts/v1?roleid={voice}'
-
-        # 构建 form_data
+    def _build_tts_form_data(self, text, speed, pitch, volume, language, gender):
+        """构建 TTS 接口的 form_data"""
         params = [
             f'text={urllib.parse.quote(text)}',
             'audio_type=mp3',
@@ -783,9 +983,186 @@ class NanoAITTS:
         if gender:
             params.append(f'gender={gender}')
 
-        form_data = '&' + '&'.join(params)
+        return '&' + '&'.join(params)
+
+    def _describe_api_error(self, json_response):
+        """根据上游JSON错误响应返回 (错误代码, 错误诊断)"""
+        if not isinstance(json_response, dict):
+            return 'unknown', f"API错误响应: {json_response}"
+
+        error_code = str(json_response.get('code', 'unknown'))
+        error_message = json_response.get('message', json_response.get('msg', 'unknown'))
+
+        # 根据错误代码提供更具体的错误信息
+        if error_code == '110023':
+            error_detail = "设备时间异常（timestamp与服务器时间偏差过大，签名校验失败）"
+        elif error_code in ['40001', '40002']:
+            error_detail = "请求参数错误，请检查文本内容和模型名称"
+        elif error_code in ['50001', '50002']:
+            error_detail = "服务器内部错误，请稍后重试"
+        else:
+            error_detail = f"API错误代码: {error_code}, 错误信息: {error_message}"
+
+        return error_code, error_detail
+
+    def stream_audio(self, text, voice='DeepSeek', speed=1.0, pitch=1.0, volume=1.0, language=None, gender=None, timeout=60, retry_count=2, chunk_size=8192, deadline=None, priority=INTERACTIVE):
+        """流式获取音频：上游 format=stream 的 MP3 数据到达即转发
+
+        只对开头的数据做一次校验和同步帧裁剪；开始输出后不再重试。
+        timeout 为单次上游请求的超时，deadline 为整个请求的截止时间。
+        """
+        if not text or not text.strip():
+            raise InvalidRequestError("文本不能为空")
+
+        self._ensure_voices()
+        if voice not in self.voices:
+            raise InvalidRequestError(f"不支持的声音模型: {voice}")
+
+        # 长文本按片段流水线输出，首个片段完成即可开始播放；
+        # 去除各片段的ID3/Xing头，使输出为连续的MP3帧流
+        ctx = self._retry_context(retry_count, deadline)
+        if len(text) > self.max_chars:
+            for segment in self.iter_long_text(text, voice, speed, pitch, volume, language, gender, timeout, ctx, priority):
+                frames = extract_frames(segment)
+                yield bytes(frames.payload) if frames.frame_count else segment
+            return
+
+        url = f'{self.base_url}/api/tts/v1?roleid={voice}'
+        form_data = self._build_tts_form_data(text, speed, pitch, volume, language, gender).encode('utf-8')
+
+        for attempt in range(ctx.max_retries + 1):
+            attempt_timeout = ctx.attempt_timeout(timeout)
+            self.sync_time_offset()
+
+            headers = self.get_headers()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+            self.logger.info(
+                "开始流式生成音频 - 模型: %s, 文本长度: %s (尝试 %s/%s), timestamp=%s",
+                voice,
+                len(text),
+                attempt + 1,
+                ctx.max_retries + 1,
+                headers.get('timestamp'),
+            )
+
+            start_time = time.time()
+            stream = None
+            try:
+                stream = self.http_pool.open('POST', url, body=form_data, headers=headers, timeout=attempt_timeout)
+                normalizer = MP3StreamNormalizer()
+
+                first_chunk = stream.read(chunk_size)
+                UPSTREAM_TTFB_SECONDS.labels('nanoai').observe(time.time() - start_time)
+                if first_chunk.lstrip().startswith((b'{', b'[')):
+                    body = first_chunk + stream.read()
+                    try:
+                        json_response = json.loads(body.decode('utf-8', errors='replace'))
+                    except json.JSONDecodeError:
+                        json_response = None
+
+                    if json_response is not None:
+                        error_code, error_detail = self._describe_api_error(json_response)
+                        self.logger.error(f"API返回错误响应: {json_response}")
+                        UPSTREAM_ERRORS.labels('nanoai', error_code).inc()
+                        delay = ctx.backoff(attempt) if error_code == '110023' else None
+                        if delay is not None:
+                            self.logger.info(f"检测到110023设备时间异常，将在{delay:.2f}秒后重试，并强制刷新时间偏差...")
+                            UPSTREAM_RETRIES.labels('nanoai', '110023').inc()
+                            stream.close()
+                            time.sleep(delay)
+                            self.sync_time_offset(force=True)
+                            continue
+                        raise UpstreamError(f"上游API错误: {error_detail}", code=error_code)
+
+                    first_chunk = body
+
+                # 缓冲开头数据直到找到第一帧，之后的数据直接透传
+                output = normalizer.feed(first_chunk)
+                while not output:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        output = normalizer.finish()
+                        break
+                    output = normalizer.feed(chunk)
+
+            except Exception as e:
+                if stream is not None:
+                    stream.close()
+                self.logger.error(f"流式获取音频失败 (尝试 {attempt + 1}): {str(e)}")
+                delay = ctx.backoff(attempt)
+                if delay is None:
+                    # 因客户端截止时间用尽而失败时不计为上游故障
+                    if ctx.deadline.expired() and not isinstance(e, DeadlineExceeded):
+                        raise DeadlineExceeded(f"request deadline exceeded: {e}") from e
+                    raise
+                UPSTREAM_RETRIES.labels('nanoai', 'error').inc()
+                self.logger.info(f"将在{delay:.2f}秒后重试...")
+                time.sleep(delay)
+                continue
+
+            first_byte_time = time.time()
+            self.logger.info(
+                "流式音频首包就绪 - 首包耗时: %.2f秒; 校验: %s; 裁剪偏移: %s",
+                first_byte_time - start_time,
+                normalizer.message,
+                normalizer.debug.get('trimmed_offset'),
+            )
 
-        for attempt in range(retry_count + 1):
+            total = len(output)
+            try:
+                yield output
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    output = normalizer.feed(chunk)
+                    if output:
+                        total += len(output)
+                        yield output
+                tail = normalizer.finish()
+                if tail:
+                    total += len(tail)
+                    yield tail
+            finally:
+                stream.close()
+                UPSTREAM_SECONDS.labels('nanoai').observe(time.time() - start_time)
+
+            self.logger.info("流式音频生成完成 - 数据大小: %s 字节; 总耗时: %.2f秒", total, time.time() - start_time)
+            return
+
+        raise Exception("所有重试尝试均失败")
+
+    def get_audio(self, text, voice='DeepSeek', speed=1.0, pitch=1.0, volume=1.0, language=None, gender=None, timeout=60, retry_count=2, deadline=None, priority=INTERACTIVE):
+        """获取音频（timeout 为单次上游请求的超时，deadline 为整个请求的截止时间，priority 为调度优先级）"""
+        if not text or not text.strip():
+            raise InvalidRequestError("文本不能为空")
+
+        self._ensure_voices()
+        if voice not in self.voices:
+            raise InvalidRequestError(f"不支持的声音模型: {voice}")
+
+        # 检查是否需要分割文本
+        ctx = self._retry_context(retry_count, deadline)
+        if len(text) > self.max_chars:
+            return self.process_long_text(text, voice, speed, pitch, volume, language, gender, timeout, ctx, priority)
+
+        # 短文本同样经过全局调度器，与长文本片段共享上游并发配额
+        return self.chunk_scheduler.run(
+            self._fetch_audio, text, voice, speed, pitch, volume, language, gender, timeout, ctx, priority=priority
+        )
+
+    def _fetch_audio(self, text, voice, speed, pitch, volume, language, gender, timeout, ctx):
+        """请求上游合成单个片段（不再分割），按请求的重试上下文重试与校验"""
+        if not text or not text.strip():
+            raise InvalidRequestError("文本不能为空")
+
+        url = f'{self.base_url}/api/tts/v1?roleid={voice}'
+        form_data = self._build_tts_form_data(text, speed, pitch, volume, language, gender)
+
+        for attempt in range(ctx.max_retries + 1):
+            # 截止时间已过（例如在调度队列中等待过久）则不再请求上游
+            attempt_timeout = ctx.attempt_timeout(timeout)
             try:
                 # 在每次请求前做一次时间偏差检查（缓存间隔内不会重复网络请求）
                 self.sync_time_offset()
@@ -801,7 +1178,7 @@ class NanoAITTS:
                     voice,
                     len(text),
                     attempt + 1,
-                    retry_count + 1,
+                    ctx.max_retries + 1,
                     request_timestamp,
                     time_status.get('offset_seconds'),
                 )
@@ -811,7 +1188,7 @@ class NanoAITTS:
                     url,
                     form_data,
                     headers,
-                    timeout=timeout,
+                    timeout=attempt_timeout,
                     retry_count=0,
                     return_headers=True,
                 )
@@ -860,22 +1237,11 @@ class NanoAITTS:
                 if is_json_response:
                     try:
                         json_response = json.loads(audio_data.decode('utf-8', errors='replace'))
-                        error_code_raw = json_response.get('code', 'unknown')
-                        error_code = str(error_code_raw)
-                        error_message = json_response.get('message', json_response.get('msg', 'unknown'))
-
-                        # 根据错误代码提供更具体的错误信息
-                        if error_code == '110023':
-                            error_detail = "设备时间异常（timestamp与服务器时间偏差过大，签名校验失败）"
-                        elif error_code in ['40001', '40002']:
-                            error_detail = "请求参数错误，请检查文本内容和模型名称"
-                        elif error_code in ['50001', '50002']:
-                            error_detail = "服务器内部错误，请稍后重试"
-                        else:
-                            error_detail = f"API错误代码: {error_code}, 错误信息: {error_message}"
+                        error_code, error_detail = self._describe_api_error(json_response)
 
                         self.logger.error(f"API返回错误响应: {json_response}")
                         self.logger.error(f"错误诊断: {error_detail}")
+                        UPSTREAM_ERRORS.labels('nanoai', error_code).inc()
 
                         if error_code == '110023':
                             self.logger.error(
@@ -884,21 +1250,24 @@ class NanoAITTS:
                                 self._last_request_time_info,
                             )
 
-                            if attempt < retry_count:
+                            delay = ctx.backoff(attempt)
+                            if delay is not None:
                                 self.logger.info(
-                                    "检测到110023设备时间异常，将在2秒后重试，并强制刷新时间偏差..."
+                                    f"检测到110023设备时间异常，将在{delay:.2f}秒后重试，并强制刷新时间偏差..."
                                 )
-                                time.sleep(2)
+                                UPSTREAM_RETRIES.labels('nanoai', '110023').inc()
+                                time.sleep(delay)
                                 self.sync_time_offset(force=True)
                                 continue
 
-                        raise Exception(f"上游API错误: {error_detail}")
+                        raise UpstreamError(f"上游API错误: {error_detail}", code=error_code)
 
                     except json.JSONDecodeError:
                         self.logger.warning(f"收到JSON格式响应但无法解析: {first_16_hex}")
                         # 继续处理，可能是非标准JSON格式
 
-                is_valid, msg, normalized_audio, debug = validate_and_normalize_mp3(audio_data)
+                with VALIDATION_SECONDS.labels('upstream').time():
+                    is_valid, msg, normalized_audio, debug = validate_and_normalize_mp3(audio_data)
                 if not is_valid:
                     preview = normalized_audio[:200]
                     preview_text = preview.decode('utf-8', errors='replace')
@@ -915,9 +1284,11 @@ class NanoAITTS:
                         raise Exception(f"上游返回HTML而非MP3，预览: {preview_text}")
 
                     # 如果不是最后一次尝试，且错误可能由于网络问题引起，则重试
-                    if attempt < retry_count and "未检测到MP3同步帧" in msg:
-                        self.logger.warning(f"音频格式验证失败，将重试: {msg}")
-                        time.sleep(2)
+                    delay = ctx.backoff(attempt) if "未检测到MP3同步帧" in msg else None
+                    if delay is not None:
+                        self.logger.warning(f"音频格式验证失败，将在{delay:.2f}秒后重试: {msg}")
+                        UPSTREAM_RETRIES.labels('nanoai', 'invalid_audio').inc()
+                        time.sleep(delay)
                         continue
 
                     raise Exception(
@@ -946,14 +1317,20 @@ class NanoAITTS:
             except Exception as e:
                 self.logger.error(f"获取音频失败 (尝试 {attempt + 1}): {str(e)}", exc_info=True)
 
-                # 如果是最后一次尝试，或者错误不太可能通过重试解决，则抛出异常
-                if attempt == retry_count or "不支持的声音模型" in str(e) or "文本不能为空" in str(e):
+                # 错误不太可能通过重试解决，或重试次数/预算/截止时间已用尽，则抛出异常
+                if isinstance(e, (DeadlineExceeded, InvalidRequestError)):
+                    raise
+                delay = ctx.backoff(attempt)
+                if delay is None:
+                    # 因客户端截止时间用尽而失败时不计为上游故障
+                    if ctx.deadline.expired():
+                        raise DeadlineExceeded(f"request deadline exceeded: {e}") from e
                     raise
 
-                # 网络错误或其他可能的问题，等待后重试
-                wait_time = 2 * (attempt + 1)  # 指数退避
-                self.logger.info(f"将在{wait_time}秒后重试...")
-                time.sleep(wait_time)
+                # 网络错误或其他可能的问题，按带抖动的指数退避等待后重试
+                UPSTREAM_RETRIES.labels('nanoai', 'error').inc()
+                self.logger.info(f"将在{delay:.2f}秒后重试...")
+                time.sleep(delay)
 
         # 理论上不应该到达这里
         raise Exception("所有重试尝试均失败")
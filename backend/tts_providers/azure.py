@@ -3,12 +3,12 @@ from __future__ import annotations
 from typing import Any, Dict, Optional
 from xml.sax.saxutils import escape
 
-import requests
-
 from backend.tts_providers.base import ProviderHealth, TTSProvider
 
 
 class AzureTTSProvider(TTSProvider):
+    """Azure Speech REST API; ``requests`` is imported on first use."""
+
     name = "azure"
 
     def __init__(
@@ -38,6 +38,8 @@ class AzureTTSProvider(TTSProvider):
         if not (self.region or self.endpoint):
             return {}
 
+        import requests
+
         base = self._tts_endpoint()
         url = f"{base}/cognitiveservices/voices/list"
         resp = requests.get(url, headers={"Ocp-Apim-Subscription-Key": self.api_key}, timeout=10)
@@ -78,7 +80,11 @@ class AzureTTSProvider(TTSProvider):
             "User-Agent": "nami-tts",
         }
 
-        resp = requests.post(url, data=ssml.encode("utf-8"), headers=headers, timeout=30)
+        import requests
+
+        deadline = options.get("deadline")
+        timeout = deadline.timeout(30) if deadline is not None else 30
+        resp = requests.post(url, data=ssml.encode("utf-8"), headers=headers, timeout=timeout)
         resp.raise_for_status()
         return resp.content
 
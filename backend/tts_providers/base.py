@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
+
+from backend.utils.audio import validate_and_normalize_mp3
 
 
 @dataclass
@@ -30,7 +32,34 @@ class TTSProvider:
 
         raise NotImplementedError
 
+    def stream_audio(self, text: str, model: str, **options: Any) -> Iterator[bytes]:
+        """Generate validated MP3 audio as an iterator of byte chunks.
+
+        Providers without native streaming yield the whole clip at once.
+        """
+
+        is_valid, msg, normalized, _ = validate_and_normalize_mp3(self.generate_audio(text, model, **options))
+        if not is_valid:
+            raise ValueError(msg)
+        yield normalized
+
     def health_check(self) -> ProviderHealth:
         """Return provider health information."""
 
         raise NotImplementedError
+
+    def warm_up(self) -> None:
+        """Do slow one-time initialization (network lookups, catalogs) ahead of the first request."""
+
+    def readiness(self) -> Dict[str, Any]:
+        """Return warm-up state: ``{"state": "pending" | "running" | "ready" | "failed", ...}``."""
+
+        return {"state": "ready"}
+
+    def export_warm_state(self) -> Optional[Dict[str, Any]]:
+        """Return JSON-serializable learned state worth restoring in a new process, if any."""
+
+        return None
+
+    def restore_warm_state(self, state: Dict[str, Any]) -> None:
+        """Adopt state produced by :meth:`export_warm_state`, skipping anything stale."""
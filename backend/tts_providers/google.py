@@ -3,25 +3,27 @@ from __future__ import annotations
 from io import BytesIO
 from typing import Any, Dict, Optional
 
-from gtts import gTTS
-from gtts.lang import tts_langs
-
 from backend.tts_providers.base import ProviderHealth, TTSProvider
+from backend.utils.retry import InvalidRequestError
 
 
 class GoogleTTSProvider(TTSProvider):
+    """Google Translate TTS via gTTS; the gtts package is imported on first use."""
+
     name = "google"
 
     def __init__(self, api_key: Optional[str] = None, **kwargs: Any):
         super().__init__(api_key=api_key, **kwargs)
 
     def get_models(self) -> Dict[str, str]:
+        from gtts.lang import tts_langs
+
         langs = tts_langs()
         return {code: name for code, name in langs.items()}
 
     def generate_audio(self, text: str, model: str, **options: Any) -> bytes:
         if not text or not text.strip():
-            raise ValueError("text is empty")
+            raise InvalidRequestError("text is empty")
 
         language = (options.get("language") or model or "en").strip()
         if language.startswith("gtts:"):
@@ -35,6 +37,8 @@ class GoogleTTSProvider(TTSProvider):
             except Exception:
                 slow = False
 
+        from gtts import gTTS
+
         fp = BytesIO()
         tts = gTTS(text=text, lang=language, slow=slow)
         tts.write_to_fp(fp)
@@ -42,6 +46,8 @@ class GoogleTTSProvider(TTSProvider):
 
     def health_check(self) -> ProviderHealth:
         try:
+            from gtts.lang import tts_langs
+
             count = len(tts_langs())
             return ProviderHealth(ok=count > 0, message="ok", details={"languages": count})
         except Exception as e:
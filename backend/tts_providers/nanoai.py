@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
 
 from backend.nano_tts import NanoAITTS
 from backend.tts_providers.base import ProviderHealth, TTSProvider
+from backend.utils.concurrency import INTERACTIVE
+from backend.utils.retry import Deadline
 
 
 class NanoAIProvider(TTSProvider):
@@ -21,30 +23,50 @@ class NanoAIProvider(TTSProvider):
         self._engine.load_voices()
         return {tag: info.get("name", tag) for tag, info in (self._engine.voices or {}).items()}
 
+    def _engine_kwargs(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        # "timeout" is the whole request's budget; each upstream HTTP attempt
+        # uses the engine's own timeout, capped by what is left of it.
+        deadline = options.get("deadline")
+        if not isinstance(deadline, Deadline):
+            deadline = Deadline.after(options.get("timeout"))
+        return {
+            "speed": float(options.get("speed") or 1.0),
+            "pitch": float(options.get("pitch") or 1.0),
+            "volume": float(options.get("volume") or 1.0),
+            "language": options.get("language"),
+            "gender": options.get("gender"),
+            "timeout": self._engine.http_timeout or 60,
+            "retry_count": int(options.get("retry_count") if options.get("retry_count") is not None else self._engine.retry_count),
+            "deadline": deadline,
+            "priority": options.get("priority") or INTERACTIVE,
+        }
+
     def generate_audio(self, text: str, model: str, **options: Any) -> bytes:
-        timeout = int(options.get("timeout") or self._engine.http_timeout or 60)
-        retry_count = int(options.get("retry_count") or self._engine.retry_count or 2)
-        speed = float(options.get("speed") or 1.0)
-        pitch = float(options.get("pitch") or 1.0)
-        volume = float(options.get("volume") or 1.0)
-        language = options.get("language")
-        gender = options.get("gender")
-        return self._engine.get_audio(
-            text,
-            voice=model,
-            speed=speed,
-            pitch=pitch,
-            volume=volume,
-            language=language,
-            gender=gender,
-            timeout=timeout,
-            retry_count=retry_count
-        )
+        return self._engine.get_audio(text, voice=model, **self._engine_kwargs(options))
+
+    def stream_audio(self, text: str, model: str, **options: Any) -> Iterator[bytes]:
+        return self._engine.stream_audio(text, voice=model, **self._engine_kwargs(options))
+
+    def warm_up(self) -> None:
+        self._engine.warm_up()
+
+    def readiness(self) -> Dict[str, Any]:
+        return self._engine.get_warm_up_status()
+
+    def export_warm_state(self) -> Optional[Dict[str, Any]]:
+        return self._engine.export_warm_state()
+
+    def restore_warm_state(self, state: Dict[str, Any]) -> None:
+        self._engine.restore_warm_state(state)
 
     def health_check(self) -> ProviderHealth:
         try:
             models = self.get_models()
             ok = bool(models)
-            return ProviderHealth(ok=ok, message="ok" if ok else "no voices loaded")
+            return ProviderHealth(
+                ok=ok,
+                message="ok" if ok else "no voices loaded",
+                details={"voices": self._engine.get_voice_catalog_status()},
+            )
         except Exception as e:
             return ProviderHealth(ok=False, message=str(e))
@@ -0,0 +1,151 @@
+"""Admission control: cap requests in flight and shed the excess early.
+
+Up to ``max_in_flight`` requests run at once; up to ``max_queue`` more wait
+at most ``queue_timeout`` seconds for a slot. Anything beyond that is
+rejected immediately with a ``retry_after`` hint derived from how fast the
+queue has been draining, so an overloaded node answers 429 in microseconds
+instead of tying up a worker thread for a whole upstream timeout.
+
+Bulk requests may hold at most ``max_in_flight - reserved_interactive``
+slots, keeping room for interactive ones.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from backend.utils.concurrency import BULK, INTERACTIVE, PRIORITIES
+from backend.utils.metrics import ADMISSION_REJECTED
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"server overloaded ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        *,
+        max_in_flight: int = 32,
+        max_queue: int = 16,
+        queue_timeout: float = 2.0,
+        reserved_interactive: int = 0,
+        drain_window_seconds: float = 10.0,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.reserved_interactive = min(max(0, reserved_interactive), self.max_in_flight - 1)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = max(0.0, queue_timeout)
+        self.drain_window_seconds = drain_window_seconds
+
+        self.in_flight = 0
+        self.waiting = 0
+        self._in_flight_by: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self._waiting_by: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self.admitted = 0
+        self.rejected = 0
+        self._released: Deque[float] = deque()
+        self._cond = threading.Condition()
+
+    def _has_room(self, priority: str) -> bool:
+        if self.in_flight >= self.max_in_flight:
+            return False
+        return priority != BULK or self._in_flight_by[BULK] < self.max_in_flight - self.reserved_interactive
+
+    def acquire(self, priority: str = INTERACTIVE) -> None:
+        """Take a slot, waiting in the bounded queue if needed; raise :class:`AdmissionRejected` otherwise."""
+
+        priority = priority if priority in PRIORITIES else INTERACTIVE
+        with self._cond:
+            if self._has_room(priority) and not self._waiting_by[priority]:
+                self._admit(priority)
+                return
+            if self.waiting >= self.max_queue:
+                raise self._reject("queue_full")
+
+            self.waiting += 1
+            self._waiting_by[priority] += 1
+            try:
+                deadline = time.monotonic() + self.queue_timeout
+                while not self._has_room(priority):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._reject("queue_timeout")
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+                self._waiting_by[priority] -= 1
+            self._admit(priority)
+
+    def release(self, priority: str = INTERACTIVE) -> None:
+        priority = priority if priority in PRIORITIES else INTERACTIVE
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._in_flight_by[priority] = max(0, self._in_flight_by[priority] - 1)
+            self._released.append(time.monotonic())
+            self._cond.notify_all()
+
+    def _admit(self, priority: str) -> None:
+        self.in_flight += 1
+        self._in_flight_by[priority] += 1
+        self.admitted += 1
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected += 1
+        ADMISSION_REJECTED.labels(reason).inc()
+        return AdmissionRejected(reason, self._retry_after())
+
+    def _drain_rate(self) -> float:
+        """Completed requests per second over the recent window (lock held)."""
+
+        now = time.monotonic()
+        while self._released and self._released[0] < now - self.drain_window_seconds:
+            self._released.popleft()
+        if not self._released:
+            return 0.0
+        # measured over the span actually observed, so a burst after an idle period is not underrated
+        return len(self._released) / max(1.0, now - self._released[0])
+
+    def _retry_after(self) -> int:
+        """Seconds until the current queue (plus this request) would have drained, at least 1."""
+
+        rate = self._drain_rate()
+        if rate <= 0:
+            return max(1, math.ceil(self.queue_timeout * 2))
+        return min(60, max(1, math.ceil((self.waiting + 1) / rate)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "queue_timeout_seconds": self.queue_timeout,
+                "reserved_interactive": self.reserved_interactive,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "in_flight_by_priority": dict(self._in_flight_by),
+                "waiting_by_priority": dict(self._waiting_by),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "drain_rate_per_second": round(self._drain_rate(), 3),
+            }
+
+
+def build_admission_controller() -> Optional[AdmissionController]:
+    max_in_flight = int(os.getenv("ADMISSION_MAX_IN_FLIGHT") or 32)
+    if max_in_flight <= 0:
+        return None
+    return AdmissionController(
+        max_in_flight=max_in_flight,
+        max_queue=int(os.getenv("ADMISSION_QUEUE_SIZE") or 16),
+        queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS") or 2),
+        reserved_interactive=int(os.getenv("ADMISSION_INTERACTIVE_RESERVED") or max_in_flight // 4),
+    )
@@ -2,18 +2,23 @@ from __future__ import annotations
 
 import gzip
 import hashlib
+import zlib
+from dataclasses import dataclass, replace
 from typing import Any, Dict, Optional, Tuple
 
+from backend.utils.mp3 import find_frame_sync
+
+
+# Consecutive frame headers required to accept a sync position.
+SYNC_CONFIRM_FRAMES = 3
 
-def _find_mp3_sync_offset(data: bytes, max_scan: int = 4096) -> Optional[int]:
-    if not data or len(data) < 2:
-        return None
 
-    scan_len = min(len(data), max_scan)
-    for i in range(scan_len - 1):
-        if data[i] == 0xFF and (data[i + 1] & 0xE0) == 0xE0:
-            return i
-    return None
+def _find_mp3_sync_offset(data: bytes, max_scan: int = 4096, start: int = 0) -> Optional[int]:
+    """First frame sync in ``data[start:start + max_scan]`` confirmed by following frame headers."""
+
+    if not data or len(data) < 4:
+        return None
+    return find_frame_sync(data, start, confirm=SYNC_CONFIRM_FRAMES, search_end=start + max_scan)
 
 
 def _parse_id3v2_tag_end(data: bytes) -> Optional[int]:
@@ -28,59 +33,226 @@ def _parse_id3v2_tag_end(data: bytes) -> Optional[int]:
     return 10 + size
 
 
-def validate_and_normalize_mp3(audio_data: bytes) -> Tuple[bool, str, bytes, Dict[str, Any]]:
-    debug: Dict[str, Any] = {
-        "original_len": 0 if not audio_data else len(audio_data),
-        "decompressed": False,
-        "id3_present": False,
-        "id3_declared_end": None,
-        "first_sync_offset": None,
-        "trimmed_offset": None,
-        "normalized_len": 0,
-        "first16_hex": "" if not audio_data else audio_data[:16].hex(),
-        "sha256": "",
-    }
+class MP3Debug(dict):
+    """Validation details; ``sha256`` and ``first16_hex`` are computed on first access."""
+
+    _LAZY_KEYS = ("sha256", "first16_hex")
+
+    def __init__(self, data: memoryview, **fields: Any):
+        super().__init__(**fields)
+        self._data = data
+
+    def _compute(self, key: str) -> str:
+        if key == "sha256":
+            value = hashlib.sha256(self._data).hexdigest()
+        else:
+            value = bytes(self._data[:16]).hex()
+        self[key] = value
+        return value
+
+    def __missing__(self, key: str) -> Any:
+        if key in self._LAZY_KEYS:
+            return self._compute(key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        if key in self._LAZY_KEYS:
+            return self._compute(key)
+        return default
+
+
+@dataclass(frozen=True)
+class MP3Validation:
+    """Result of one validation pass; ``audio`` is a view, not a copy."""
+
+    valid: bool
+    message: str
+    data: bytes  # input after gzip decompression
+    offset: int = 0  # normalized audio starts here
+    original_len: int = 0
+    decompressed: bool = False
+    id3_present: bool = False
+    id3_declared_end: Optional[int] = None
+    first_sync_offset: Optional[int] = None
+    trimmed_offset: Optional[int] = None
+
+    @property
+    def audio(self) -> memoryview:
+        return memoryview(self.data)[self.offset:]
+
+    @property
+    def debug(self) -> MP3Debug:
+        return MP3Debug(
+            self.audio,
+            original_len=self.original_len,
+            decompressed=self.decompressed,
+            id3_present=self.id3_present,
+            id3_declared_end=self.id3_declared_end,
+            first_sync_offset=self.first_sync_offset,
+            trimmed_offset=self.trimmed_offset,
+            normalized_len=len(self.data) - self.offset,
+        )
+
+
+class ValidatedMP3(bytes):
+    """Normalized MP3 bytes that already passed :func:`inspect_mp3`.
+
+    Validating it again returns the stored result without rescanning, so
+    audio validated by a provider is not re-checked by the HTTP layer.
+    """
+
+    _meta: MP3Validation
+
+    @classmethod
+    def from_validation(cls, validation: MP3Validation) -> "ValidatedMP3":
+        out = cls(validation.audio)
+        # Stored without the buffer to avoid a reference cycle through ``data``.
+        out._meta = replace(validation, data=b"", offset=0)
+        return out
+
+    @property
+    def validation(self) -> MP3Validation:
+        return replace(self._meta, data=self)
 
+
+def inspect_mp3(audio_data: bytes, max_scan: int = 4096) -> MP3Validation:
+    """Locate the first MP3 frame in one pass without copying the audio."""
+
+    if isinstance(audio_data, ValidatedMP3):
+        return audio_data.validation
+
+    original_len = len(audio_data) if audio_data else 0
     if not audio_data:
-        return False, "音频数据为空", b"", debug
+        return MP3Validation(False, "音频数据为空", b"")
 
-    if len(audio_data) >= 2 and audio_data[0] == 0x1F and audio_data[1] == 0x8B:
+    data = audio_data if isinstance(audio_data, bytes) else bytes(audio_data)
+    decompressed = False
+    if data[:2] == b"\x1f\x8b":
         try:
-            audio_data = gzip.decompress(audio_data)
-            debug["decompressed"] = True
-            debug["first16_hex"] = audio_data[:16].hex()
+            data = gzip.decompress(data)
+            decompressed = True
         except Exception:
             pass
 
-    if audio_data.startswith(b"ID3"):
-        debug["id3_present"] = True
-        id3_end = _parse_id3v2_tag_end(audio_data)
-        debug["id3_declared_end"] = id3_end
-        if id3_end is not None and id3_end + 1 < len(audio_data):
-            if audio_data[id3_end] == 0xFF and (audio_data[id3_end + 1] & 0xE0) == 0xE0:
-                debug["first_sync_offset"] = id3_end
-                debug["normalized_len"] = len(audio_data)
-                debug["sha256"] = hashlib.sha256(audio_data).hexdigest()
-                return True, "有效的MP3文件(ID3标签)", audio_data, debug
+    fields: Dict[str, Any] = {"original_len": original_len, "decompressed": decompressed}
 
-    sync_offset = _find_mp3_sync_offset(audio_data)
-    debug["first_sync_offset"] = sync_offset
+    search_from = 0
+    if data.startswith(b"ID3"):
+        id3_end = _parse_id3v2_tag_end(data)
+        fields.update(id3_present=True, id3_declared_end=id3_end)
+        if id3_end is not None and id3_end < len(data):
+            if find_frame_sync(data, id3_end, confirm=SYNC_CONFIRM_FRAMES, search_end=id3_end + 1) == id3_end:
+                return MP3Validation(True, "有效的MP3文件(ID3标签)", data, 0, first_sync_offset=id3_end, **fields)
+            search_from = id3_end
 
+    sync_offset = _find_mp3_sync_offset(data, max_scan, search_from)
+    if sync_offset is None and search_from:
+        # Declared tag size may be wrong; fall back to scanning from the start.
+        sync_offset = _find_mp3_sync_offset(data, max_scan)
     if sync_offset is None:
-        debug["normalized_len"] = len(audio_data)
-        debug["sha256"] = hashlib.sha256(audio_data).hexdigest()
-        return False, "未检测到MP3同步帧", audio_data, debug
+        return MP3Validation(False, "未检测到MP3同步帧", data, 0, **fields)
 
-    if sync_offset > 0:
-        audio_data = audio_data[sync_offset:]
-        debug["trimmed_offset"] = sync_offset
-        debug["first16_hex"] = audio_data[:16].hex()
+    return MP3Validation(
+        True,
+        "有效的MP3文件(包含同步帧)",
+        data,
+        sync_offset,
+        first_sync_offset=sync_offset,
+        trimmed_offset=sync_offset or None,
+        **fields,
+    )
+
+
+def validate_and_normalize_mp3(audio_data: bytes) -> Tuple[bool, str, bytes, Dict[str, Any]]:
+    """Validate MP3 data; valid audio comes back as :class:`ValidatedMP3`.
 
-    debug["normalized_len"] = len(audio_data)
-    debug["sha256"] = hashlib.sha256(audio_data).hexdigest()
-    return True, "有效的MP3文件(包含同步帧)", audio_data, debug
+    ``debug['sha256']`` and ``debug['first16_hex']`` are computed only when
+    read. Input that is already a :class:`ValidatedMP3` is returned as is.
+    """
+
+    if isinstance(audio_data, ValidatedMP3):
+        v = audio_data.validation
+        return True, v.message, audio_data, v.debug
+
+    v = inspect_mp3(audio_data)
+    if not v.valid:
+        return False, v.message, v.data, v.debug
+    return True, v.message, ValidatedMP3.from_validation(v), v.debug
 
 
 def validate_audio_data(audio_data: bytes) -> Tuple[bool, str]:
-    is_valid, msg, _, _ = validate_and_normalize_mp3(audio_data)
-    return is_valid, msg
+    v = inspect_mp3(audio_data)
+    return v.valid, v.message
+
+
+class MP3StreamNormalizer:
+    """Incremental counterpart of :func:`validate_and_normalize_mp3`.
+
+    Only the head of the stream is buffered and validated (gzip detection,
+    ID3 handling and leading-junk trimming); once the first frame is located
+    all further bytes pass straight through.
+    """
+
+    def __init__(self, max_scan: int = 4096):
+        self.max_scan = max_scan
+        self.validated = False
+        self.message = ""
+        self.debug: Dict[str, Any] = {}
+        self._head = bytearray()
+        self._gzip: Optional[Any] = None
+        self._gzip_checked = False
+
+    def _decode(self, chunk: bytes) -> bytes:
+        if not self._gzip_checked:
+            self._gzip_checked = True
+            if len(chunk) >= 2 and chunk[0] == 0x1F and chunk[1] == 0x8B:
+                self._gzip = zlib.decompressobj(wbits=31)
+        if self._gzip is not None:
+            return self._gzip.decompress(chunk)
+        return chunk
+
+    def _head_threshold(self) -> int:
+        id3_end = _parse_id3v2_tag_end(bytes(self._head[:10])) if self._head.startswith(b"ID3") else None
+        return max(self.max_scan, (id3_end or 0) + 2)
+
+    def _try_validate(self, final: bool) -> bytes:
+        head = bytes(self._head)
+        if not final and len(head) < self._head_threshold():
+            # Wait for the whole ID3 tag so a false sync inside it is never picked.
+            id3_pending = b"ID3".startswith(head[:3])
+            if id3_pending or _find_mp3_sync_offset(head, self.max_scan) is None:
+                return b""
+
+        is_valid, msg, normalized, debug = validate_and_normalize_mp3(head)
+        if not is_valid:
+            if not final and len(head) < self._head_threshold():
+                return b""
+            raise ValueError(f"{msg}; first16={debug.get('first16_hex')}")
+
+        self.validated = True
+        self.message = msg
+        self.debug = debug
+        self._head = bytearray()
+        return normalized
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Consume upstream bytes; return bytes that are safe to emit."""
+
+        if not chunk:
+            return b""
+        data = self._decode(chunk)
+        if self.validated:
+            return data
+        self._head.extend(data)
+        return self._try_validate(final=False)
+
+    def finish(self) -> bytes:
+        """Flush remaining bytes at end of stream; raises if never validated."""
+
+        tail = self._gzip.flush() if self._gzip is not None else b""
+        if self.validated:
+            return tail
+        self._head.extend(tail)
+        return self._try_validate(final=True)
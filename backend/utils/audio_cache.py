@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+logger = logging.getLogger("nami-tts.audio-cache")
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return (os.getenv(name) or default).lower() in ("true", "1", "yes", "on")
+
+
+def _norm_float(value: Any, default: float = 1.0) -> str:
+    try:
+        return f"{float(value if value is not None else default):.3f}"
+    except (TypeError, ValueError):
+        return f"{default:.3f}"
+
+
+def make_cache_key(
+    provider: Optional[str],
+    model: str,
+    text: str,
+    **options: Any,
+) -> str:
+    """Return a stable content hash for a synthesis request.
+
+    Only parameters that change the produced audio are part of the key;
+    transport settings such as ``timeout`` and ``retry_count`` are ignored.
+    """
+
+    payload = {
+        "provider": (provider or "").lower().strip(),
+        "model": model or "",
+        "text": text or "",
+        "speed": _norm_float(options.get("speed")),
+        "pitch": _norm_float(options.get("pitch")),
+        "volume": _norm_float(options.get("volume")),
+        "language": options.get("language") or "",
+        "gender": options.get("gender") or "",
+        "format": (options.get("format") or "mp3").lower(),
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Two-tier (memory LRU + disk) cache of normalized MP3 bytes.
+
+    Entries are ``(provider, audio)`` pairs addressed by :func:`make_cache_key`.
+    The memory tier is bounded by item count and total bytes; the disk tier
+    lives under ``<cache_dir>/<subdir>`` (``audio`` by default) and is bounded
+    by total bytes and TTL.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        *,
+        memory_max_items: int = 256,
+        memory_max_bytes: int = 64 * 1024 * 1024,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+        ttl_seconds: int = 24 * 60 * 60,
+        disk_enabled: bool = True,
+        subdir: str = "audio",
+    ):
+        self.cache_dir = os.path.join(cache_dir, subdir)
+        self.memory_max_items = max(0, memory_max_items)
+        self.memory_max_bytes = max(0, memory_max_bytes)
+        self.disk_max_bytes = max(0, disk_max_bytes)
+        self.ttl_seconds = max(0, ttl_seconds)
+        self.disk_enabled = disk_enabled and self.disk_max_bytes > 0
+
+        self._memory: "OrderedDict[str, Tuple[float, str, bytes]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self._disk_lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        if self.disk_enabled:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except OSError as e:
+                logger.warning("音频缓存目录不可用，仅启用内存缓存: %s", str(e))
+                self.disk_enabled = False
+
+    def _expired(self, stored_at: float, now: Optional[float] = None) -> bool:
+        if not self.ttl_seconds:
+            return False
+        return (now or time.time()) - stored_at >= self.ttl_seconds
+
+    def _disk_paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + ".mp3", base + ".json"
+
+    # -- memory tier -------------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            stored_at, provider, audio = entry
+            if self._expired(stored_at):
+                del self._memory[key]
+                self._memory_bytes -= len(audio)
+                return None
+            self._memory.move_to_end(key)
+            return provider, audio
+
+    def _memory_put(self, key: str, provider: str, audio: bytes, stored_at: float) -> None:
+        if not self.memory_max_items or len(audio) > self.memory_max_bytes:
+            return
+
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old[2])
+            self._memory[key] = (stored_at, provider, audio)
+            self._memory_bytes += len(audio)
+
+            while self._memory and (
+                len(self._memory) > self.memory_max_items or self._memory_bytes > self.memory_max_bytes
+            ):
+                _, (_, _, evicted) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self.evictions += 1
+
+    # -- disk tier ---------------------------------------------------------
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, str, bytes]]:
+        if not self.disk_enabled:
+            return None
+
+        audio_path, meta_path = self._disk_paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            stored_at = float(meta.get("stored_at") or 0)
+            if self._expired(stored_at):
+                with self._disk_lock:
+                    freed = self._disk_remove(key)
+                    if freed:
+                        self.evictions += 1
+                        if self._disk_bytes is not None:
+                            self._disk_bytes = max(0, self._disk_bytes - freed)
+                return None
+            with open(audio_path, "rb") as f:
+                audio = f.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("读取音频缓存失败 key=%s: %s", key, str(e))
+            return None
+
+        if not audio:
+            return None
+        # Eviction is oldest-mtime first, so a hit refreshes the entry (LRU, not FIFO).
+        for path in (audio_path, meta_path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return stored_at, str(meta.get("provider") or ""), audio
+
+    def _disk_remove(self, key: str) -> int:
+        freed = 0
+        for path in self._disk_paths(key):
+            try:
+                freed += os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                pass
+        return freed
+
+    def _disk_scan(self) -> Dict[str, Tuple[float, int]]:
+        """Return ``key -> (mtime, size)`` for every stored disk entry."""
+
+        entries: Dict[str, Tuple[float, int]] = {}
+        try:
+            shards = os.listdir(self.cache_dir)
+        except OSError:
+            return entries
+
+        for shard in shards:
+            shard_dir = os.path.join(self.cache_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                path = os.path.join(shard_dir, name)
+                key = name.split(".", 1)[0]
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                mtime, size = entries.get(key, (st.st_mtime, 0))
+                entries[key] = (min(mtime, st.st_mtime), size + st.st_size)
+        return entries
+
+    def _disk_evict(self) -> None:
+        entries = self._disk_scan()
+        now = time.time()
+        total = sum(size for _, size in entries.values())
+
+        for key, (mtime, size) in sorted(entries.items(), key=lambda kv: kv[1][0]):
+            if total <= self.disk_max_bytes and not self._expired(mtime, now):
+                continue
+            total -= size
+            self._disk_remove(key)
+            self.evictions += 1
+
+        self._disk_bytes = total
+
+    def _disk_put(self, key: str, provider: str, audio: bytes, stored_at: float) -> None:
+        if not self.disk_enabled or len(audio) > self.disk_max_bytes:
+            return
+
+        audio_path, meta_path = self._disk_paths(key)
+        meta = json.dumps({"provider": provider, "stored_at": stored_at, "size": len(audio)})
+        try:
+            os.makedirs(os.path.dirname(audio_path), exist_ok=True)
+            tmp_audio = f"{audio_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_audio, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_audio, audio_path)
+
+            tmp_meta = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_meta, "w", encoding="utf-8") as f:
+                f.write(meta)
+            os.replace(tmp_meta, meta_path)
+        except OSError as e:
+            logger.warning("写入音频缓存失败 key=%s: %s", key, str(e))
+            return
+
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_evict()
+            else:
+                self._disk_bytes += len(audio) + len(meta)
+                if self._disk_bytes > self.disk_max_bytes:
+                    self._disk_evict()
+
+    # -- public API --------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        hit = self._memory_get(key)
+        if hit is not None:
+            self.memory_hits += 1
+            return hit
+
+        disk_hit = self._disk_get(key)
+        if disk_hit is not None:
+            stored_at, provider, audio = disk_hit
+            self._memory_put(key, provider, audio, stored_at)
+            self.disk_hits += 1
+            return provider, audio
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, provider: str, audio: bytes) -> None:
+        if not audio:
+            return
+        stored_at = time.time()
+        self._memory_put(key, provider, audio, stored_at)
+        self._disk_put(key, provider, audio, stored_at)
+        self.stores += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.disk_enabled:
+            with self._disk_lock:
+                for key in self._disk_scan():
+                    self._disk_remove(key)
+                self._disk_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        with self._lock:
+            memory_items = len(self._memory)
+            memory_bytes = self._memory_bytes
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_items": memory_items,
+            "memory_bytes": memory_bytes,
+            "disk_enabled": self.disk_enabled,
+            "disk_bytes": self._disk_bytes,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+def build_audio_cache() -> Optional[AudioCache]:
+    if not _env_bool("AUDIO_CACHE_ENABLED", "true"):
+        return None
+
+    return AudioCache(
+        os.getenv("CACHE_DIR", "/tmp/cache"),
+        memory_max_items=int(os.getenv("AUDIO_CACHE_MEMORY_ITEMS") or 256),
+        memory_max_bytes=int(os.getenv("AUDIO_CACHE_MEMORY_MAX_BYTES") or 64 * 1024 * 1024),
+        disk_max_bytes=int(os.getenv("AUDIO_CACHE_DISK_MAX_BYTES") or 512 * 1024 * 1024),
+        ttl_seconds=int(os.getenv("AUDIO_CACHE_TTL_SECONDS") or 24 * 60 * 60),
+        disk_enabled=_env_bool("AUDIO_CACHE_DISK_ENABLED", "true"),
+    )
+
+
+def build_chunk_cache() -> Optional[AudioCache]:
+    """Cache of per-chunk MP3 segments used when re-synthesizing edited long texts."""
+
+    if not _env_bool("CHUNK_CACHE_ENABLED", os.getenv("AUDIO_CACHE_ENABLED") or "true"):
+        return None
+
+    return AudioCache(
+        os.getenv("CACHE_DIR", "/tmp/cache"),
+        memory_max_items=int(os.getenv("CHUNK_CACHE_MEMORY_ITEMS") or 512),
+        memory_max_bytes=int(os.getenv("CHUNK_CACHE_MEMORY_MAX_BYTES") or 64 * 1024 * 1024),
+        disk_max_bytes=int(os.getenv("CHUNK_CACHE_DISK_MAX_BYTES") or 1024 * 1024 * 1024),
+        ttl_seconds=int(os.getenv("CHUNK_CACHE_TTL_SECONDS") or 7 * 24 * 60 * 60),
+        disk_enabled=_env_bool("CHUNK_CACHE_DISK_ENABLED", "true"),
+        subdir="audio-chunks",
+    )
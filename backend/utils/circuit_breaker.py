@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+logger = logging.getLogger("nami-tts.circuit")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a rolling time window.
+
+    The breaker opens when at least ``min_requests`` calls in the last
+    ``window_seconds`` failed at ``error_threshold`` or more (timeouts count
+    as failures). After ``open_seconds`` it lets one probe call through at a
+    time; ``half_open_successes`` successful probes close it again, and any
+    failed probe re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        error_threshold: float = 0.5,
+        min_requests: int = 5,
+        window_seconds: float = 30.0,
+        open_seconds: float = 15.0,
+        half_open_successes: int = 3,
+    ):
+        self.name = name
+        self.error_threshold = error_threshold
+        self.min_requests = max(1, min_requests)
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_successes = max(1, half_open_successes)
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_successes = 0
+        # (monotonic time, ok, latency seconds)
+        self._calls: Deque[Tuple[float, bool, float]] = deque()
+        self._lock = threading.Lock()
+
+        self.times_opened = 0
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+            self._probe_successes = 0
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Whether a call may go out now; in half-open this takes the probe slot."""
+
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record(self, ok: bool, latency: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            self._calls.append((now, ok, latency))
+            self._prune(now)
+
+            if state == HALF_OPEN:
+                self._probe_in_flight = False
+                if not ok:
+                    self._trip(now)
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_successes:
+                    self._state = CLOSED
+                    self._calls.clear()
+                    logger.info("circuit %s closed", self.name)
+                return
+
+            if state == CLOSED and not ok:
+                failures = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+                if len(self._calls) >= self.min_requests and failures / len(self._calls) >= self.error_threshold:
+                    self._trip(now)
+
+    def release(self) -> None:
+        """End a call without recording it (e.g. an invalid request), freeing a half-open probe slot."""
+
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _trip(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+        self.times_opened += 1
+        logger.warning("circuit %s opened for %gs", self.name, self.open_seconds)
+
+    def recent_latency(self) -> Optional[float]:
+        """Median latency of successful calls in the window, if any."""
+
+        with self._lock:
+            self._prune(time.monotonic())
+            latencies = sorted(latency for _, ok, latency in self._calls if ok)
+        if not latencies:
+            return None
+        return latencies[len(latencies) // 2]
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            self._prune(now)
+            total = len(self._calls)
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            retry_in = max(0.0, self.open_seconds - (now - self._opened_at)) if state == OPEN else None
+        return {
+            "state": state,
+            "window_requests": total,
+            "window_error_rate": round(failures / total, 3) if total else 0.0,
+            "recent_latency_seconds": self.recent_latency(),
+            "times_opened": self.times_opened,
+            "retry_in_seconds": round(retry_in, 1) if retry_in is not None else None,
+        }
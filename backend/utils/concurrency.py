@@ -0,0 +1,401 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import socket
+import threading
+import time
+import urllib.error
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from backend.utils.metrics import SCHEDULER_WAIT_SECONDS
+from backend.utils.retry import DeadlineExceeded, UpstreamError
+
+logger = logging.getLogger("nami-tts.concurrency")
+
+# NanoAI API codes that signal a struggling upstream (signature-time rejects
+# under load, internal errors).
+_OVERLOAD_API_CODES = frozenset({"110023", "50001", "50002"})
+
+
+# Priority classes: interactive work (short, user-facing requests) is always
+# served first and has reserved upstream slots; bulk work (long documents,
+# batches, jobs) fills the rest.
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, BULK)
+
+
+def classify_priority(
+    requested: Optional[str] = None,
+    *,
+    api_key: Optional[str] = None,
+    chars: int = 0,
+    bulk_keys: Sequence[str] = (),
+    bulk_min_chars: int = 0,
+) -> str:
+    """Priority class of a request: explicit field, else API key, else input length."""
+
+    requested = (requested or "").lower().strip()
+    if requested in PRIORITIES:
+        return requested
+    if api_key and api_key in bulk_keys:
+        return BULK
+    if bulk_min_chars > 0 and chars >= bulk_min_chars:
+        return BULK
+    return INTERACTIVE
+
+
+def _is_overload_status(status: int) -> bool:
+    return status == 429 or 500 <= status < 600
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Whether an upstream failure suggests we should send less traffic.
+
+    Decided from the HTTP status, API error code or timeout carried by the
+    exception or the errors it was raised from, never from message text.
+    Our own request deadline running out is not an upstream signal.
+    """
+
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, DeadlineExceeded):
+            return False
+        if isinstance(current, UpstreamError):
+            if current.status is not None:
+                return _is_overload_status(current.status)
+            if current.code is not None:
+                return current.code in _OVERLOAD_API_CODES
+        if isinstance(current, urllib.error.HTTPError):
+            return _is_overload_status(current.code)
+        if isinstance(current, (TimeoutError, socket.timeout)):
+            return True
+        if isinstance(current, urllib.error.URLError) and isinstance(current.reason, (TimeoutError, socket.timeout)):
+            return True
+        current = current.__cause__ or current.__context__
+    return False
+
+
+class AIMDLimit:
+    """Additive-increase / multiplicative-decrease concurrency limit.
+
+    The limit grows by roughly one slot per round of steady-latency
+    successes and is cut by ``backoff`` on overload errors (at most once per
+    observed latency window, so a burst of failures counts as one signal).
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: float = 3,
+        minimum: int = 1,
+        maximum: int = 8,
+        backoff: float = 0.7,
+        latency_tolerance: float = 2.0,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+
+        self.latency_ewma: Optional[float] = None
+        self.decreases = 0
+        self._last_decrease = 0.0
+
+    def record(self, latency: float, ok: bool, overloaded: bool) -> None:
+        now = time.monotonic()
+        if overloaded:
+            window = self.latency_ewma or 1.0
+            if now - self._last_decrease >= window:
+                self.limit = max(float(self.minimum), self.limit * self.backoff)
+                self._last_decrease = now
+                self.decreases += 1
+                logger.info("upstream overload, concurrency limit -> %.2f", self.limit)
+            return
+
+        if not ok:
+            return
+
+        baseline = self.latency_ewma
+        self.latency_ewma = latency if baseline is None else baseline * 0.9 + latency * 0.1
+        if baseline is None or latency <= baseline * self.latency_tolerance:
+            self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+
+    @property
+    def slots(self) -> int:
+        return max(self.minimum, int(self.limit))
+
+
+@dataclass
+class _Task:
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    priority: str = INTERACTIVE
+    enqueued_at: float = field(default_factory=time.monotonic)
+    future: Future = field(default_factory=Future)
+
+
+class ChunkScheduler:
+    """Process-wide executor for upstream synthesis calls of one provider.
+
+    Work is submitted in groups (one group per request) with a priority
+    class. Interactive groups are always served before bulk ones, and bulk
+    work may only occupy ``slots - reserved_interactive`` of the slots (at
+    least one), so a short request finds a free slot even while long
+    documents are being synthesized. Within a class, groups are served
+    round-robin. The number of calls in flight is capped by an
+    :class:`AIMDLimit` driven by upstream latency and errors.
+    """
+
+    def __init__(self, name: str, limit: AIMDLimit, *, reserved_interactive: int = 1):
+        self.name = name
+        self.limit = limit
+        self.reserved_interactive = max(0, reserved_interactive)
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+
+        self._lanes: Dict[str, "OrderedDict[int, Deque[_Task]]"] = {p: OrderedDict() for p in PRIORITIES}
+        self._in_flight_by: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self._group_ids = itertools.count()
+        self._cond = threading.Condition()
+        self._workers: List[threading.Thread] = []
+
+    def _ensure_workers(self) -> None:
+        while len(self._workers) < self.limit.maximum:
+            worker = threading.Thread(
+                target=self._work,
+                name=f"{self.name}-chunk-{len(self._workers)}",
+                daemon=True,
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def submit_group(
+        self,
+        calls: Sequence[Tuple[Callable[..., Any], Tuple[Any, ...]]],
+        priority: str = INTERACTIVE,
+    ) -> List[Future]:
+        """Queue ``(fn, args)`` calls as one fairness group of ``priority``; return their futures."""
+
+        priority = priority if priority in PRIORITIES else INTERACTIVE
+        tasks = [_Task(fn=fn, args=args, priority=priority) for fn, args in calls]
+        if not tasks:
+            return []
+
+        with self._cond:
+            self._lanes[priority][next(self._group_ids)] = deque(tasks)
+            self._ensure_workers()
+            self._cond.notify_all()
+        return [t.future for t in tasks]
+
+    def run(self, fn: Callable[..., Any], *args: Any, priority: str = INTERACTIVE) -> Any:
+        """Run a single call through the scheduler and wait for its result."""
+
+        return self.submit_group([(fn, args)], priority)[0].result()
+
+    def _next_lane(self) -> Optional["OrderedDict[int, Deque[_Task]]"]:
+        """Lane to serve next, or ``None`` if nothing may start now (lock held)."""
+
+        slots = self.limit.slots
+        if self.in_flight >= slots:
+            return None
+        if self._lanes[INTERACTIVE]:
+            return self._lanes[INTERACTIVE]
+        if self._lanes[BULK] and self._in_flight_by[BULK] < max(1, slots - self.reserved_interactive):
+            return self._lanes[BULK]
+        return None
+
+    def _take(self) -> _Task:
+        with self._cond:
+            lane = self._next_lane()
+            while lane is None:
+                self._cond.wait()
+                lane = self._next_lane()
+            group_id, queue = next(iter(lane.items()))
+            task = queue.popleft()
+            if queue:
+                lane.move_to_end(group_id)
+            else:
+                del lane[group_id]
+            self.in_flight += 1
+            self._in_flight_by[task.priority] += 1
+        SCHEDULER_WAIT_SECONDS.labels(self.name, task.priority).observe(time.monotonic() - task.enqueued_at)
+        return task
+
+    def _work(self) -> None:
+        while True:
+            task = self._take()
+            ok = False
+            overloaded = False
+            start = time.monotonic()
+            try:
+                if not task.future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    task.future.set_result(task.fn(*task.args))
+                    ok = True
+                except BaseException as e:
+                    overloaded = is_overload_error(e)
+                    task.future.set_exception(e)
+            finally:
+                with self._cond:
+                    self.in_flight -= 1
+                    self._in_flight_by[task.priority] -= 1
+                    if task.future.done() and not task.future.cancelled():
+                        self.limit.record(time.monotonic() - start, ok, overloaded)
+                        if ok:
+                            self.completed += 1
+                        else:
+                            self.failed += 1
+                    self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            lanes = {
+                priority: {
+                    "in_flight": self._in_flight_by[priority],
+                    "queued": sum(len(q) for q in groups.values()),
+                    "active_groups": len(groups),
+                }
+                for priority, groups in self._lanes.items()
+            }
+            return {
+                "limit": round(self.limit.limit, 2),
+                "min": self.limit.minimum,
+                "max": self.limit.maximum,
+                "reserved_interactive": self.reserved_interactive,
+                "in_flight": self.in_flight,
+                "queued": sum(lane["queued"] for lane in lanes.values()),
+                "active_groups": sum(lane["active_groups"] for lane in lanes.values()),
+                "lanes": lanes,
+                "latency_ewma_seconds": self.limit.latency_ewma,
+                "decreases": self.limit.decreases,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+
+_schedulers: Dict[str, ChunkScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_chunk_scheduler(provider: str) -> ChunkScheduler:
+    """Return the process-wide scheduler for ``provider``, creating it on first use."""
+
+    with _schedulers_lock:
+        scheduler = _schedulers.get(provider)
+        if scheduler is None:
+            limit = AIMDLimit(
+                initial=float(os.getenv("CHUNK_CONCURRENCY_INITIAL") or 3),
+                minimum=int(os.getenv("CHUNK_CONCURRENCY_MIN") or 1),
+                maximum=int(os.getenv("CHUNK_CONCURRENCY_MAX") or 8),
+            )
+            scheduler = ChunkScheduler(
+                provider,
+                limit,
+                reserved_interactive=int(os.getenv("CHUNK_INTERACTIVE_RESERVED") or 1),
+            )
+            _schedulers[provider] = scheduler
+        return scheduler
+
+
+def chunk_schedulers() -> Dict[str, ChunkScheduler]:
+    """Schedulers created so far, by provider."""
+
+    with _schedulers_lock:
+        return dict(_schedulers)
+
+
+class RollingLatency:
+    """Latency samples of the last ``window`` calls, for percentile estimates."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=max(1, window))
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def count(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        idx = min(len(samples) - 1, max(0, int(round(q * (len(samples) - 1)))))
+        return samples[idx]
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller runs the function; callers arriving while it is in
+    flight wait and receive the same result, or the same exception.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.collapsed = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self.collapsed += 1
+                leader = False
+            else:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._flights)
+        return {
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+            "in_flight": in_flight,
+        }
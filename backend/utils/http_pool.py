@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import http.client
+import io
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+# Errors that indicate a reused keep-alive socket was closed by the peer.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+
+@dataclass
+class PooledResponse:
+    status: int
+    reason: str
+    headers: http.client.HTTPMessage
+    data: bytes
+
+    def getcode(self) -> int:
+        return self.status
+
+
+class HTTPConnectionPool:
+    """Thread-safe keep-alive connection pool built on :mod:`http.client`.
+
+    Idle connections are kept per ``(scheme, host, port)`` up to ``maxsize``
+    and discarded once they have been idle for ``idle_timeout`` seconds.
+    HTTP errors are raised as :class:`urllib.error.HTTPError` and transport
+    errors as :class:`urllib.error.URLError`, matching ``urllib.request``.
+    """
+
+    def __init__(
+        self,
+        *,
+        proxy_url: Optional[str] = None,
+        ssl_verify: bool = True,
+        maxsize: int = 10,
+        idle_timeout: float = 60.0,
+    ):
+        self.proxy_url = proxy_url
+        self.ssl_verify = ssl_verify
+        self.maxsize = max(1, maxsize)
+        self.idle_timeout = idle_timeout
+
+        self._proxy: Optional[Tuple[str, int]] = None
+        if proxy_url:
+            parsed = urlsplit(proxy_url)
+            self._proxy = (parsed.hostname or "", parsed.port or (443 if parsed.scheme == "https" else 80))
+
+        self._ssl_context = ssl.create_default_context()
+        if not ssl_verify:
+            self._ssl_context.check_hostname = False
+            self._ssl_context.verify_mode = ssl.CERT_NONE
+
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._lock = threading.Lock()
+
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    def _new_connection(self, scheme: str, host: str, port: int, timeout: float) -> http.client.HTTPConnection:
+        self.connections_created += 1
+
+        if self._proxy:
+            proxy_host, proxy_port = self._proxy
+            if scheme == "https":
+                # TLS to the origin runs inside a CONNECT tunnel, like urllib's ProxyHandler.
+                conn = http.client.HTTPSConnection(proxy_host, proxy_port, timeout=timeout, context=self._ssl_context)
+                conn.set_tunnel(host, port)
+                return conn
+            return http.client.HTTPConnection(proxy_host, proxy_port, timeout=timeout)
+
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _acquire(self, key: Tuple[str, str, int], timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key) or []
+            while idle:
+                conn, last_used = idle.pop()
+                if now - last_used > self.idle_timeout:
+                    conn.close()
+                    continue
+                self.connections_reused += 1
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+
+        scheme, host, port = key
+        return self._new_connection(scheme, host, port, timeout), False
+
+    def _release(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) >= self.maxsize:
+                conn.close()
+                return
+            idle.append((conn, time.monotonic()))
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        headers: Optional[Dict[str, str]],
+        timeout: float,
+    ) -> Tuple[Tuple[str, str, int], http.client.HTTPConnection, http.client.HTTPResponse]:
+        parsed = urlsplit(url)
+        scheme = parsed.scheme or "http"
+        host = parsed.hostname or ""
+        port = parsed.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+
+        path = parsed.path or "/"
+        if parsed.query:
+            path = f"{path}?{parsed.query}"
+        if self._proxy and scheme == "http":
+            # Plain-HTTP requests through a proxy use the absolute URL.
+            path = url
+
+        headers = dict(headers or {})
+        if body is not None and "Content-Length" not in headers:
+            headers["Content-Length"] = str(len(body))
+
+        # A reused socket may have been closed by the server; retry once on a fresh one.
+        for _ in range(2):
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                return key, conn, conn.getresponse()
+            except _STALE_CONNECTION_ERRORS as e:
+                conn.close()
+                if reused:
+                    continue
+                raise urllib.error.URLError(e)
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                if isinstance(e, socket.timeout):
+                    raise urllib.error.URLError(f"timed out after {timeout}s")
+                raise urllib.error.URLError(e)
+
+        raise urllib.error.URLError("connection closed by remote host")
+
+    def open(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30,
+    ) -> "PooledStream":
+        """Send a request and return the response body as a stream.
+
+        The connection goes back to the pool once the body has been fully
+        read and the stream is closed.
+        """
+
+        key, conn, response = self._send(method, url, body, headers, timeout)
+        stream = PooledStream(self, key, conn, response)
+
+        if response.status >= 400:
+            data = stream.read()
+            stream.close()
+            raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(data))
+
+        return stream
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30,
+    ) -> PooledResponse:
+        with self.open(method, url, body=body, headers=headers, timeout=timeout) as stream:
+            data = stream.read()
+        return PooledResponse(status=stream.status, reason=stream.reason, headers=stream.headers, data=data)
+
+    def close(self) -> None:
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            idle = sum(len(v) for v in self._idle.values())
+        return {
+            "maxsize": self.maxsize,
+            "idle_connections": idle,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+        }
+
+
+class PooledStream:
+    """Incrementally readable response bound to a pooled connection."""
+
+    def __init__(
+        self,
+        pool: HTTPConnectionPool,
+        key: Tuple[str, str, int],
+        conn: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+    ):
+        self._pool = pool
+        self._key = key
+        self._conn: Optional[http.client.HTTPConnection] = conn
+        self._response = response
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+
+    def getcode(self) -> int:
+        return self.status
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        try:
+            if amt is None:
+                return self._response.read()
+            # read1 returns as soon as some bytes are available instead of filling amt
+            return self._response.read1(amt)
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            raise urllib.error.URLError(e)
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        if self._response.isclosed() and not self._response.will_close:
+            self._pool._release(self._key, conn)
+        else:
+            # Unread body left on the socket; it cannot be reused.
+            self._response.close()
+            conn.close()
+
+    def __enter__(self) -> "PooledStream":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
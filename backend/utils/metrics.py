@@ -0,0 +1,321 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Counters and histograms are sharded per thread: the hot path only touches
+the calling thread's own value list (no lock, no contention), and a scrape
+sums the shards. Shards of finished threads are folded into a base total
+whenever a new thread registers a shard (and on every scrape), so
+thread-per-request servers do not grow them without bound, scraped or not.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+Labels = Dict[str, str]
+Sample = Tuple[Labels, float]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Shards:
+    """Per-thread value arrays; each list is only written by its owner thread."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, List[float]]] = []
+        self._base = [0.0] * size
+        self._lock = threading.Lock()
+
+    def local(self) -> List[float]:
+        values = getattr(self._local, "values", None)
+        if values is None:
+            values = [0.0] * self.size
+            self._local.values = values
+            with self._lock:
+                self._fold_finished()
+                self._shards.append((threading.current_thread(), values))
+        return values
+
+    def _fold_finished(self) -> None:
+        """Move the values of finished threads into ``_base`` (lock held)."""
+
+        alive = []
+        for thread, values in self._shards:
+            if thread.is_alive():
+                alive.append((thread, values))
+                continue
+            for i, v in enumerate(values):
+                self._base[i] += v
+        self._shards = alive
+
+    def snapshot(self) -> List[float]:
+        with self._lock:
+            self._fold_finished()
+            total = list(self._base)
+            for _, values in self._shards:
+                for i, v in enumerate(values):
+                    total[i] += v
+        return total
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def labels(self, *values: object):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _items(self) -> List[Tuple[Labels, object]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+
+    def collect(self) -> Iterable[Tuple[str, Labels, float]]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("_shards",)
+
+    def __init__(self) -> None:
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shards.local()[0] += amount
+
+    def value(self) -> float:
+        return self._shards.snapshot()[0]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def collect(self) -> Iterable[Tuple[str, Labels, float]]:
+        for labels, child in self._items():
+            yield self.name, labels, child.value()
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "_shards")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # one slot per bucket, one for +Inf, then the running sum
+        self._shards = _Shards(len(buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        values = self._shards.local()
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        values = self._shards.snapshot()
+        cumulative: List[float] = []
+        running = 0.0
+        for count in values[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, values[-1]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def collect(self) -> Iterable[Tuple[str, Labels, float]]:
+        for labels, child in self._items():
+            cumulative, count, total = child.snapshot()
+            for bound, value in zip(list(self.buckets) + [math.inf], cumulative):
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, value
+            yield f"{self.name}_count", labels, count
+            yield f"{self.name}_sum", labels, total
+
+
+class CallbackMetric(_Metric):
+    """A gauge or counter whose samples are read from existing state at scrape time."""
+
+    def __init__(self, name: str, documentation: str, type_name: str, fn: Callable[[], Iterable[Sample]]):
+        self.type_name = type_name
+        self.fn = fn
+        super().__init__(name, documentation)
+
+    def collect(self) -> Iterable[Tuple[str, Labels, float]]:
+        for labels, value in self.fn():
+            if value is not None:
+                yield self.name, labels, float(value)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines: List[str] = []
+        for metric in metrics:
+            try:
+                samples = list(metric.collect())
+            except Exception:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ---------------------------------------------------------------------------
+# Service metrics
+# ---------------------------------------------------------------------------
+
+PROVIDER_REQUESTS = Counter(
+    "tts_provider_requests_total",
+    "Synthesis calls per provider by outcome (ok, error, client_error, circuit_open).",
+    ("provider", "outcome"),
+)
+PROVIDER_FALLBACKS = Counter(
+    "tts_provider_fallbacks_total",
+    "Requests served by a provider after earlier candidates failed.",
+    ("provider",),
+)
+REQUEST_SECONDS = Histogram(
+    "tts_http_request_seconds",
+    "End-to-end HTTP request time, including streamed bodies.",
+    ("endpoint", "status"),
+)
+UPSTREAM_TTFB_SECONDS = Histogram(
+    "tts_upstream_ttfb_seconds",
+    "Time from sending an upstream synthesis request to its first response byte.",
+    ("provider",),
+)
+UPSTREAM_SECONDS = Histogram(
+    "tts_upstream_seconds",
+    "Total time of one upstream synthesis HTTP exchange.",
+    ("provider",),
+)
+VALIDATION_SECONDS = Histogram(
+    "tts_mp3_validation_seconds",
+    "Time spent validating and normalizing MP3 data.",
+    ("site",),
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+)
+MERGE_SECONDS = Histogram(
+    "tts_mp3_merge_seconds",
+    "Time spent concatenating MP3 segments.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+LONG_TEXT_CHUNKS = Histogram(
+    "tts_long_text_chunks",
+    "Number of chunks a long-text request was split into.",
+    ("provider",),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144),
+)
+UPSTREAM_RETRIES = Counter(
+    "tts_upstream_retries_total",
+    "Upstream synthesis retries by reason.",
+    ("provider", "reason"),
+)
+UPSTREAM_ERRORS = Counter(
+    "tts_upstream_errors_total",
+    "Upstream error responses by error code (HTTP status or API code such as 110023).",
+    ("provider", "code"),
+)
+ADMISSION_REJECTED = Counter(
+    "tts_admission_rejected_total",
+    "Requests rejected with 429 by admission control, by reason (queue_full, queue_timeout).",
+    ("reason",),
+)
+RATE_LIMITED = Counter(
+    "tts_rate_limited_total",
+    "Requests rejected with 429 because the API key's character budget was used up.",
+)
+SCHEDULER_WAIT_SECONDS = Histogram(
+    "tts_scheduler_wait_seconds",
+    "Time an upstream call waited in the chunk scheduler before starting, by priority class.",
+    ("provider", "priority"),
+)
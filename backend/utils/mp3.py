@@ -0,0 +1,348 @@
+"""Decode-free MPEG audio frame utilities.
+
+Used to concatenate MP3 segments without transcoding: each segment is
+stripped of ID3v2/ID3v1 tags and Xing/Info/VBRI headers, the frame-aligned
+payloads are joined, and optionally a single Xing/Info header describing the
+merged stream is prepended.
+"""
+
+from __future__ import annotations
+
+import logging
+import struct
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+logger = logging.getLogger("nami-tts.mp3")
+
+# Indexed by [version_bits][layer_bits][bitrate_index]; values in kbps.
+_V1_BITRATES = {
+    3: (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),  # Layer I
+    2: (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),  # Layer II
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),  # Layer III
+}
+_V2_BITRATES = {
+    3: (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    1: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),  # MPEG-2.5
+}
+
+
+@dataclass(frozen=True)
+class FrameHeader:
+    version_bits: int
+    layer_bits: int
+    protected: bool
+    bitrate_index: int
+    bitrate_kbps: int
+    sample_rate: int
+    padding: int
+    channel_mode: int
+    raw: int
+
+    @property
+    def is_mpeg1(self) -> bool:
+        return self.version_bits == 3
+
+    @property
+    def samples_per_frame(self) -> int:
+        if self.layer_bits == 3:
+            return 384
+        if self.layer_bits == 1 and not self.is_mpeg1:
+            return 576
+        return 1152
+
+    @property
+    def frame_length(self) -> int:
+        if self.layer_bits == 3:
+            return (12 * self.bitrate_kbps * 1000 // self.sample_rate + self.padding) * 4
+        return self.samples_per_frame // 8 * self.bitrate_kbps * 1000 // self.sample_rate + self.padding
+
+    @property
+    def side_info_length(self) -> int:
+        mono = self.channel_mode == 3
+        if self.is_mpeg1:
+            return 17 if mono else 32
+        return 9 if mono else 17
+
+    def same_stream(self, other: "FrameHeader") -> bool:
+        return (
+            self.version_bits == other.version_bits
+            and self.layer_bits == other.layer_bits
+            and self.sample_rate == other.sample_rate
+        )
+
+
+def parse_frame_header(data: BytesLike, offset: int = 0) -> Optional[FrameHeader]:
+    """Parse the 4-byte frame header at ``offset``; ``None`` if invalid."""
+
+    if offset < 0 or offset + 4 > len(data):
+        return None
+
+    raw = struct.unpack_from(">I", data, offset)[0]
+    if raw & 0xFFE00000 != 0xFFE00000:
+        return None
+
+    version_bits = (raw >> 19) & 0x3
+    layer_bits = (raw >> 17) & 0x3
+    bitrate_index = (raw >> 12) & 0xF
+    rate_index = (raw >> 10) & 0x3
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        # Reserved values; free-format (index 0) cannot be walked without decoding.
+        return None
+
+    table = _V1_BITRATES if version_bits == 3 else _V2_BITRATES
+    return FrameHeader(
+        version_bits=version_bits,
+        layer_bits=layer_bits,
+        protected=not (raw >> 16) & 0x1,
+        bitrate_index=bitrate_index,
+        bitrate_kbps=table[layer_bits][bitrate_index],
+        sample_rate=_SAMPLE_RATES[version_bits][rate_index],
+        padding=(raw >> 9) & 0x1,
+        channel_mode=(raw >> 6) & 0x3,
+        raw=raw,
+    )
+
+
+def id3v2_end(data: BytesLike) -> int:
+    """Return the offset just past a leading ID3v2 tag (0 when absent)."""
+
+    if len(data) < 10 or bytes(data[:3]) != b"ID3":
+        return 0
+    size_bytes = bytes(data[6:10])
+    if any(b & 0x80 for b in size_bytes):
+        return 0
+    size = (size_bytes[0] << 21) | (size_bytes[1] << 14) | (size_bytes[2] << 7) | size_bytes[3]
+    footer = 10 if data[5] & 0x10 else 0
+    return min(len(data), 10 + size + footer)
+
+
+def id3v1_start(data: BytesLike) -> int:
+    """Return the offset of a trailing 128-byte ID3v1 tag (``len(data)`` when absent)."""
+
+    if len(data) >= 128 and bytes(data[-128:-125]) == b"TAG":
+        return len(data) - 128
+    return len(data)
+
+
+def find_frame_sync(
+    data: BytesLike,
+    start: int = 0,
+    end: Optional[int] = None,
+    confirm: int = 2,
+    search_end: Optional[int] = None,
+) -> Optional[int]:
+    """Find the first offset where ``confirm`` consecutive valid frames start.
+
+    Requiring a chain of consistent headers avoids false syncs in tag data
+    or junk prefixes. Candidates are looked for before ``search_end``
+    (default ``end``); the confirming frames may extend up to ``end``.
+    """
+
+    buf = data if isinstance(data, (bytes, bytearray)) else bytes(data)
+    end = len(buf) if end is None else end
+    search_end = end if search_end is None else min(end, search_end)
+    pos = buf.find(b"\xff", start, search_end)
+    while pos != -1 and pos + 4 <= end:
+        header = parse_frame_header(buf, pos)
+        if header is not None:
+            ok = True
+            nxt = pos + header.frame_length
+            for _ in range(confirm - 1):
+                if nxt >= end:
+                    break  # frame runs to the end of the data; accept it
+                following = parse_frame_header(buf, nxt)
+                if following is None or not following.same_stream(header):
+                    ok = False
+                    break
+                nxt += following.frame_length
+            if ok:
+                return pos
+        pos = buf.find(b"\xff", pos + 1, search_end)
+    return None
+
+
+def iter_frames(data: BytesLike, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, FrameHeader]]:
+    """Yield ``(offset, header)`` for each complete frame, resyncing past junk."""
+
+    end = len(data) if end is None else end
+    pos = find_frame_sync(data, start, end)
+    first: Optional[FrameHeader] = None
+    while pos is not None and pos + 4 <= end:
+        header = parse_frame_header(data, pos)
+        if header is None or (first is not None and not header.same_stream(first)):
+            pos = find_frame_sync(data, pos + 1, end)
+            continue
+        if pos + header.frame_length > end:
+            break
+        first = first or header
+        yield pos, header
+        pos += header.frame_length
+
+
+def is_truncated(data: BytesLike) -> bool:
+    """True if the last frame of ``data`` is cut short (the stream ended mid-frame)."""
+
+    end = id3v1_start(data)
+    last_end: Optional[int] = None
+    for offset, header in iter_frames(data, id3v2_end(data), end):
+        last_end = offset + header.frame_length
+    if last_end is None or last_end >= end:
+        return False
+    # Trailing junk is tolerated; a frame header that does not fit is not.
+    return parse_frame_header(data, last_end) is not None
+
+
+def is_vbr_info_frame(data: BytesLike, offset: int, header: FrameHeader) -> bool:
+    """True if the frame at ``offset`` carries a Xing/Info/LAME or VBRI header."""
+
+    tag_at = offset + 4 + (2 if header.protected else 0) + header.side_info_length
+    if bytes(data[tag_at:tag_at + 4]) in (b"Xing", b"Info"):
+        return True
+    return bytes(data[offset + 36:offset + 40]) == b"VBRI"
+
+
+@dataclass
+class FrameSpan:
+    """Audio frames of one segment plus frame metadata.
+
+    ``payload`` is a zero-copy view unless junk had to be cut out between
+    frames, in which case it views a joined copy.
+    """
+
+    payload: memoryview
+    first_header: Optional[FrameHeader]
+    frame_count: int
+    frame_sizes: List[int]
+
+
+def extract_frames(data: BytesLike) -> FrameSpan:
+    """Locate the contiguous audio frames of ``data`` without copying.
+
+    ID3v2/ID3v1 tags are excluded, and a leading Xing/Info/VBRI frame is
+    dropped since it describes only this segment. Junk between frames
+    (garbage bytes, a mid-stream tag) is skipped and logged.
+    """
+
+    buf = data if isinstance(data, (bytes, bytearray)) else bytes(data)
+    view = memoryview(buf)
+    start = id3v2_end(buf)
+    end = id3v1_start(buf)
+
+    first_header: Optional[FrameHeader] = None
+    runs: List[List[int]] = []  # [start, end) of each contiguous run of frames
+    sizes: List[int] = []
+    for offset, header in iter_frames(buf, start, end):
+        if first_header is None:
+            if is_vbr_info_frame(buf, offset, header):
+                continue
+            first_header = header
+        if runs and runs[-1][1] == offset:
+            runs[-1][1] = offset + header.frame_length
+        else:
+            runs.append([offset, offset + header.frame_length])
+        sizes.append(header.frame_length)
+
+    if not runs:
+        return FrameSpan(payload=view[start:start], first_header=None, frame_count=0, frame_sizes=[])
+    if len(runs) == 1:
+        return FrameSpan(payload=view[runs[0][0]:runs[0][1]], first_header=first_header, frame_count=len(sizes), frame_sizes=sizes)
+
+    skipped = sum(nxt[0] - prev[1] for prev, nxt in zip(runs, runs[1:]))
+    logger.warning("MP3 segment has %d junk bytes between frames in %d places; skipped them", skipped, len(runs) - 1)
+    payload = memoryview(b"".join(view[a:b] for a, b in runs))
+    return FrameSpan(payload=payload, first_header=first_header, frame_count=len(sizes), frame_sizes=sizes)
+
+
+def build_xing_frame(template: FrameHeader, frame_sizes: List[int], vbr: bool) -> bytes:
+    """Build a Xing (VBR) or Info (CBR) frame describing ``frame_sizes``."""
+
+    total_bytes = sum(frame_sizes)
+    toc = bytearray(100)
+    if frame_sizes and total_bytes:
+        offsets = [0]
+        for size in frame_sizes[:-1]:
+            offsets.append(offsets[-1] + size)
+        for i in range(100):
+            idx = min(len(frame_sizes) - 1, i * len(frame_sizes) // 100)
+            toc[i] = min(255, offsets[idx] * 256 // total_bytes)
+
+    body = (b"Xing" if vbr else b"Info") + struct.pack(">I", 0x1 | 0x2 | 0x4)
+    needed = 4 + template.side_info_length + len(body) + 8 + len(toc)
+
+    table = _V1_BITRATES if template.is_mpeg1 else _V2_BITRATES
+    for bitrate_index in range(template.bitrate_index, 15):
+        raw = template.raw & ~0x0000F200  # clear bitrate index and padding
+        raw |= 0x00010000  # no CRC
+        raw |= bitrate_index << 12
+        header = FrameHeader(
+            version_bits=template.version_bits,
+            layer_bits=template.layer_bits,
+            protected=False,
+            bitrate_index=bitrate_index,
+            bitrate_kbps=table[template.layer_bits][bitrate_index],
+            sample_rate=template.sample_rate,
+            padding=0,
+            channel_mode=template.channel_mode,
+            raw=raw,
+        )
+        if header.frame_length >= needed:
+            break
+    else:
+        raise ValueError("no bitrate large enough for a Xing header")
+
+    frame = bytearray(header.frame_length)
+    struct.pack_into(">I", frame, 0, header.raw)
+    at = 4 + header.side_info_length
+    frame[at:at + len(body)] = body
+    at += len(body)
+    struct.pack_into(">II", frame, at, len(frame_sizes), total_bytes + header.frame_length)
+    at += 8
+    frame[at:at + len(toc)] = toc
+    return bytes(frame)
+
+
+def concat_mp3(segments: Iterable[BytesLike], *, write_xing_header: bool = False) -> bytes:
+    """Concatenate MP3 segments frame-by-frame with zero re-encoding.
+
+    Segments without any parseable frame are appended as-is (and logged)
+    rather than dropped, so no audio is silently lost. When
+    ``write_xing_header`` is set, one Xing/Info frame covering the merged
+    stream is prepended so players report the right duration and can seek.
+    """
+
+    parts: List[BytesLike] = []
+    spans: List[FrameSpan] = []
+    for index, seg in enumerate(segments):
+        if not seg:
+            continue
+        span = extract_frames(seg)
+        if span.frame_count:
+            spans.append(span)
+            parts.append(span.payload)
+        else:
+            logger.warning("MP3 segment %d (%d bytes) has no parseable frame; appending it unchanged", index, len(seg))
+            parts.append(seg)
+
+    payload = b"".join(parts)
+    if not write_xing_header or not spans or len(spans) != len(parts):
+        # A Xing header would misdescribe a stream with raw segments in it.
+        return payload
+
+    template = spans[0].first_header
+    assert template is not None
+    sizes = [size for s in spans for size in s.frame_sizes]
+    # CBR frame sizes differ only by the padding byte.
+    vbr = max(sizes) - min(sizes) > 1
+    try:
+        return build_xing_frame(template, sizes, vbr) + payload
+    except ValueError:
+        return payload
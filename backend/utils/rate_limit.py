@@ -0,0 +1,197 @@
+"""Per-API-key token buckets where a request costs its input length in characters.
+
+Long text fans out into many upstream calls, so a character budget tracks
+upstream load far better than a request count. A request is allowed once
+the bucket holds ``min(cost, burst)`` tokens and then pays its full cost,
+so oversized inputs are never locked out but push the bucket into debt
+that later requests wait out.
+
+Buckets live in process memory by default; :class:`SQLiteBucketStore`
+shares them between the worker processes of one host.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    chars_per_second: float
+    burst: float
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # seconds until the request would be allowed (0 when allowed)
+    reset_after: int  # seconds until the bucket is full again
+
+
+def api_key_id(api_key: str) -> str:
+    """Stable digest identifying ``api_key`` wherever the key itself must not be stored."""
+
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:32]
+
+
+def _refill_and_take(tokens: float, updated_at: float, now: float, cost: float, limit: RateLimit) -> Tuple[bool, float]:
+    tokens = min(limit.burst, tokens + max(0.0, now - updated_at) * limit.chars_per_second)
+    if tokens >= min(cost, limit.burst):
+        return True, tokens - cost
+    return False, tokens
+
+
+class MemoryBucketStore:
+    def __init__(self) -> None:
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, bucket: str, cost: float, limit: RateLimit) -> Tuple[bool, float]:
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(bucket, (limit.burst, now))
+            allowed, tokens = _refill_and_take(tokens, updated_at, now, cost, limit)
+            self._buckets[bucket] = (tokens, now)
+        return allowed, tokens
+
+
+class SQLiteBucketStore:
+    """Buckets in a SQLite file, updated in one IMMEDIATE transaction per request."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (id TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def take(self, bucket: str, cost: float, limit: RateLimit) -> Tuple[bool, float]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE id = ?", (bucket,)).fetchone()
+                tokens, updated_at = row if row else (limit.burst, now)
+                allowed, tokens = _refill_and_take(tokens, updated_at, now, cost, limit)
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (id, tokens, updated_at) VALUES (?, ?, ?)",
+                    (bucket, tokens, now),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return allowed, tokens
+
+
+class RateLimiter:
+    def __init__(self, store, default_limit: RateLimit, key_limits: Optional[Dict[str, RateLimit]] = None):
+        self.store = store
+        self.default_limit = default_limit
+        self.key_limits = dict(key_limits or {})
+        self.allowed = 0
+        self.rejected = 0
+
+    def limit_for(self, api_key: str) -> RateLimit:
+        return self.key_limits.get(api_key, self.default_limit)
+
+    def check(self, api_key: str, cost: int) -> Optional[RateLimitDecision]:
+        """Charge ``cost`` characters to ``api_key``; ``None`` when the key is not limited."""
+
+        limit = self.limit_for(api_key)
+        if limit.chars_per_second <= 0:
+            return None
+
+        # Buckets are keyed by a digest so the shared file never holds API keys.
+        allowed, tokens = self.store.take(api_key_id(api_key), max(1, cost), limit)
+        if allowed:
+            self.allowed += 1
+            retry_after = 0
+        else:
+            self.rejected += 1
+            retry_after = max(1, math.ceil((min(cost, limit.burst) - tokens) / limit.chars_per_second))
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=int(limit.burst),
+            remaining=max(0, int(tokens)),
+            retry_after=retry_after,
+            reset_after=max(0, math.ceil((limit.burst - tokens) / limit.chars_per_second)),
+        )
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": type(self.store).__name__,
+            "chars_per_second": self.default_limit.chars_per_second,
+            "burst_chars": self.default_limit.burst,
+            "keys_with_own_limit": len(self.key_limits),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+def parse_api_keys(value: str, default_limit: RateLimit) -> Dict[str, RateLimit]:
+    """Parse ``key[:chars_per_second[:burst]]`` entries separated by commas."""
+
+    keys: Dict[str, RateLimit] = {}
+    for entry in value.split(","):
+        parts = [p.strip() for p in entry.strip().split(":")]
+        if not parts[0]:
+            continue
+        rate = float(parts[1]) if len(parts) > 1 and parts[1] else default_limit.chars_per_second
+        if len(parts) > 2 and parts[2]:
+            burst = float(parts[2])
+        else:
+            burst = default_limit.burst if rate == default_limit.chars_per_second else max(rate * 60, 1)
+        keys[parts[0]] = RateLimit(chars_per_second=rate, burst=burst)
+    return keys
+
+
+def build_rate_limiter(
+    api_keys: Dict[str, RateLimit],
+    default_limit: RateLimit,
+    previous: Optional[RateLimiter] = None,
+) -> Optional[RateLimiter]:
+    """A limiter when any key has a rate configured, else ``None``.
+
+    With ``previous`` (a config reload), its bucket store and counters are
+    kept, so changing limits does not hand every key a fresh burst.
+    """
+
+    if default_limit.chars_per_second <= 0 and not any(l.chars_per_second > 0 for l in api_keys.values()):
+        return None
+    store_type = SQLiteBucketStore if (os.getenv("RATE_LIMIT_BACKEND") or "memory").lower() == "sqlite" else MemoryBucketStore
+    if previous is not None and type(previous.store) is store_type:
+        store = previous.store
+    elif store_type is SQLiteBucketStore:
+        store = SQLiteBucketStore(os.path.join(os.getenv("CACHE_DIR", "/tmp/cache"), "rate_limit.sqlite3"))
+    else:
+        store = MemoryBucketStore()
+    limiter = RateLimiter(store, default_limit, api_keys)
+    if previous is not None:
+        limiter.allowed, limiter.rejected = previous.allowed, previous.rejected
+    return limiter
+
+
+def default_rate_limit() -> RateLimit:
+    rate = float(os.getenv("RATE_LIMIT_CHARS_PER_SECOND") or 0)
+    return RateLimit(chars_per_second=rate, burst=float(os.getenv("RATE_LIMIT_BURST_CHARS") or max(rate * 60, 1)))
@@ -0,0 +1,166 @@
+"""Retry policy, per-request retry budget and deadline shared by all layers of a request.
+
+A request gets one :class:`Deadline` at the top (TTSManager) that is passed
+down to the provider and engine. Every layer caps its socket timeouts by the
+time left and stops retrying once the next backoff would overrun it. The
+:class:`RetryBudget` bounds the total number of retries of a request across
+all of its upstream calls (e.g. every chunk of a long text), so failures do
+not multiply through nested loops.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline passed before the work could be (re)tried."""
+
+
+class InvalidRequestError(ValueError):
+    """The request itself is invalid (empty text, unknown voice).
+
+    Retrying or failing over cannot fix it, and it says nothing about the
+    provider's health, so it is neither retried nor counted by breakers.
+    """
+
+
+class UpstreamError(Exception):
+    """A failure reported by the upstream service, with its HTTP ``status`` and/or API error ``code``."""
+
+    def __init__(self, message: str, *, status: Optional[int] = None, code: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+def is_client_error(error: BaseException) -> bool:
+    """Whether ``error`` is caused by the request rather than by the provider."""
+
+    return isinstance(error, (InvalidRequestError, DeadlineExceeded))
+
+
+class Deadline:
+    """An absolute point in time (``time.monotonic()``) a request must finish by; ``None`` is unbounded."""
+
+    __slots__ = ("at",)
+
+    def __init__(self, at: Optional[float] = None):
+        self.at = at
+
+    @classmethod
+    def after(cls, seconds: Any) -> "Deadline":
+        try:
+            seconds = float(seconds) if seconds is not None else 0.0
+        except (TypeError, ValueError):
+            seconds = 0.0
+        return cls(time.monotonic() + seconds if seconds > 0 else None)
+
+    def remaining(self) -> Optional[float]:
+        return None if self.at is None else self.at - time.monotonic()
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def timeout(self, default: float) -> float:
+        """Timeout for the next attempt: ``default`` capped by the time left."""
+
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if remaining <= 0:
+            raise DeadlineExceeded("request deadline exceeded")
+        return min(default, remaining)
+
+    def __repr__(self) -> str:
+        remaining = self.remaining()
+        return "Deadline(unbounded)" if remaining is None else f"Deadline(remaining={remaining:.3f}s)"
+
+
+class RetryBudget:
+    """Retries left for one request, shared by all of its upstream calls."""
+
+    def __init__(self, limit: int):
+        self.limit = max(0, limit)
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Full-jitter exponential backoff plus the size of per-request retry budgets.
+
+    A request making ``calls`` upstream calls with ``retry_count`` retries
+    each may retry ``max(retry_count, ceil(budget_ratio * calls * retry_count))``
+    times in total.
+    """
+
+    base_delay: float = 0.25
+    max_delay: float = 4.0
+    multiplier: float = 2.0
+    budget_ratio: float = 0.2
+
+    def delay(self, retry: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * self.multiplier ** retry))
+
+    def context(self, retry_count: int, deadline: Optional[Deadline] = None, calls: int = 1) -> "RetryContext":
+        retry_count = max(0, retry_count)
+        budget = RetryBudget(max(retry_count, math.ceil(self.budget_ratio * calls * retry_count)))
+        return RetryContext(self, deadline or Deadline(), budget, retry_count)
+
+
+class RetryContext:
+    """Retry state of one request: policy, deadline, shared budget and per-call retry limit."""
+
+    def __init__(self, policy: RetryPolicy, deadline: Deadline, budget: RetryBudget, max_retries: int):
+        self.policy = policy
+        self.deadline = deadline
+        self.budget = budget
+        self.max_retries = max_retries
+
+    def for_calls(self, calls: int) -> "RetryContext":
+        """Same deadline and per-call limit, with a budget sized for ``calls`` upstream calls."""
+
+        return self.policy.context(self.max_retries, self.deadline, calls)
+
+    def attempt_timeout(self, default: float) -> float:
+        return self.deadline.timeout(default)
+
+    def backoff(self, attempt: int) -> Optional[float]:
+        """Delay before retrying after failed ``attempt`` (0-based), or ``None`` to give up.
+
+        Gives up when the per-call limit or the request budget is used up, or
+        when waiting would run past the deadline.
+        """
+
+        if attempt >= self.max_retries:
+            return None
+        delay = self.policy.delay(attempt)
+        remaining = self.deadline.remaining()
+        if remaining is not None and remaining <= delay:
+            return None
+        if not self.budget.acquire():
+            return None
+        return delay
+
+
+def build_retry_policy() -> RetryPolicy:
+    return RetryPolicy(
+        base_delay=float(os.getenv("RETRY_BASE_DELAY_SECONDS") or 0.25),
+        max_delay=float(os.getenv("RETRY_MAX_DELAY_SECONDS") or 4),
+        budget_ratio=float(os.getenv("RETRY_BUDGET_RATIO") or 0.2),
+    )
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import math
+import os
+import zlib
+from typing import List, Optional
+
+# Sentence terminators; Latin ones only count when followed by whitespace,
+# a closing quote/bracket, CJK text or the end of the text.
+_CJK_TERMINATORS = frozenset("。！？；…\n")
+_LATIN_TERMINATORS = frozenset(".!?;")
+_CLOSERS = frozenset("\"'”’）)】]」』》〉")
+# Weaker break points used when a single sentence exceeds the limit.
+_CLAUSE_BREAKS = frozenset("，、,：:—")
+
+_ABBREVIATIONS = frozenset(
+    """mr mrs ms dr prof sr jr st vs etc e.g i.e no fig jan feb mar apr jun jul aug sep sept oct nov dec
+    inc ltd co corp dept approx est vol p pp""".split()
+)
+
+
+def _is_cjk(ch: str) -> bool:
+    return "　" <= ch <= "鿿" or "豈" <= ch <= "﫿" or "＀" <= ch <= "￯"
+
+
+def _is_latin_sentence_end(text: str, i: int) -> bool:
+    """Whether the Latin terminator at ``text[i]`` ends a sentence."""
+
+    nxt = text[i + 1] if i + 1 < len(text) else ""
+    if nxt and not (nxt.isspace() or nxt in _CLOSERS or _is_cjk(nxt) or nxt in _LATIN_TERMINATORS):
+        return False  # 3.14, example.com, a.b
+    if text[i] != ".":
+        return True
+
+    # Word before the period: abbreviations and single-letter initials do not end sentences.
+    start = i
+    while start > 0 and (text[start - 1].isalpha() or text[start - 1] == "."):
+        start -= 1
+    word = text[start:i].lower()
+    if word in _ABBREVIATIONS:
+        return False
+    if len(word) == 1 and text[start].isupper():
+        return False
+    return True
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split ``text`` after sentence ends in a single linear pass.
+
+    Trailing closing quotes/brackets and whitespace stay with the sentence,
+    so ``"".join(split_sentences(text)) == text``.
+    """
+
+    pieces: List[str] = []
+    n = len(text)
+    start = 0
+    i = 0
+    while i < n:
+        ch = text[i]
+        if ch in _CJK_TERMINATORS or (ch in _LATIN_TERMINATORS and _is_latin_sentence_end(text, i)):
+            end = i + 1
+            while end < n and (text[end] in _CJK_TERMINATORS or text[end] in _LATIN_TERMINATORS or text[end] in _CLOSERS):
+                end += 1
+            while end < n and text[end].isspace():
+                end += 1
+            pieces.append(text[start:end])
+            start = i = end
+            continue
+        i += 1
+    if start < n:
+        pieces.append(text[start:])
+    return pieces
+
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    """Break one over-long sentence at clause marks or spaces, hard-cutting as a last resort."""
+
+    parts: List[str] = []
+    start = 0
+    n = len(sentence)
+    while n - start > max_chars:
+        # Balance the pieces of this sentence as well.
+        count = math.ceil((n - start) / max_chars)
+        target = start + math.ceil((n - start) / count)
+        limit = start + max_chars
+
+        cut = -1
+        for breaks in (_CLAUSE_BREAKS, None):
+            best = -1
+            for j in range(start + max_chars // 2, limit):
+                ch = sentence[j]
+                if (ch in breaks) if breaks is not None else ch.isspace():
+                    if best == -1 or abs(j + 1 - target) < abs(best - target):
+                        best = j + 1
+            if best != -1:
+                cut = best
+                break
+        if cut == -1:
+            cut = target
+
+        parts.append(sentence[start:cut])
+        start = cut
+    parts.append(sentence[start:])
+    return parts
+
+
+def split_text(text: str, max_chars: int = 500) -> List[str]:
+    """Split ``text`` at sentence ends into near-equal chunks of at most ``max_chars``.
+
+    Sentences are packed greedily towards an even share of the remaining
+    text, so a 1100-character input becomes three ~370-character chunks
+    rather than 500/500/100. Concatenating the chunks gives back ``text``.
+    """
+
+    if len(text) <= max_chars:
+        return [text]
+
+    pieces = _pieces(text, max_chars)
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+    remaining = len(text)
+    target = remaining / math.ceil(remaining / max_chars)
+
+    for piece in pieces:
+        size = len(piece)
+        if current and (
+            current_len + size > max_chars
+            or (current_len >= target * 0.5 and abs(current_len + size - target) > abs(current_len - target))
+        ):
+            chunks.append("".join(current))
+            remaining -= current_len
+            target = remaining / math.ceil(remaining / max_chars)
+            current, current_len = [], 0
+        current.append(piece)
+        current_len += size
+
+    _flush_tail(chunks, current, max_chars)
+    return chunks
+
+
+def split_text_stable(text: str, max_chars: int = 500) -> List[str]:
+    """Split ``text`` at content-defined boundaries, so an edit only moves nearby ones.
+
+    A sentence closes a chunk when a hash of its own text says so, with a
+    probability proportional to its length (about one boundary per
+    ``0.6 * max_chars`` characters). Boundaries therefore depend only on
+    nearby content and survive edits elsewhere in the document, which lets
+    per-chunk caches be reused. Chunks are less even than :func:`split_text`
+    but never exceed ``max_chars``; this is the ``CHUNK_SPLIT_MODE=stable``
+    trade-off.
+    """
+
+    if len(text) <= max_chars:
+        return [text]
+
+    target = max_chars * 0.6
+    min_chars = max_chars // 4
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+
+    for piece in _pieces(text, max_chars):
+        if current and current_len + len(piece) > max_chars:
+            chunks.append("".join(current))
+            current, current_len = [], 0
+        current.append(piece)
+        current_len += len(piece)
+        if current_len >= min_chars and zlib.crc32(piece.encode("utf-8")) < len(piece) / target * 0x100000000:
+            chunks.append("".join(current))
+            current, current_len = [], 0
+
+    _flush_tail(chunks, current, max_chars)
+    return chunks
+
+
+def _is_speakable(text: str) -> bool:
+    return any(ch.isalnum() for ch in text)
+
+
+def _merge_unspeakable(sentences: List[str]) -> List[str]:
+    """Attach sentences without letters or digits (blank lines, "...") to the next one, or the last.
+
+    A chunk of only whitespace or punctuation is rejected upstream as empty
+    text and would fail the whole request.
+    """
+
+    merged: List[str] = []
+    pending = ""
+    for sentence in sentences:
+        if not _is_speakable(sentence):
+            pending += sentence
+            continue
+        merged.append(pending + sentence)
+        pending = ""
+    if pending:
+        if merged:
+            merged[-1] += pending
+        else:
+            merged.append(pending)
+    return merged
+
+
+def _pieces(text: str, max_chars: int) -> List[str]:
+    pieces: List[str] = []
+    for sentence in _merge_unspeakable(split_sentences(text)):
+        if len(sentence) > max_chars:
+            pieces.extend(_split_long(sentence, max_chars))
+        else:
+            pieces.append(sentence)
+    return pieces
+
+
+def _flush_tail(chunks: List[str], current: List[str], max_chars: int) -> None:
+    if not current:
+        return
+    tail = "".join(current)
+    if chunks and not tail.strip() and len(chunks[-1]) + len(tail) <= max_chars:
+        chunks[-1] += tail
+    else:
+        chunks.append(tail)
+
+
+def chunk_split_mode() -> str:
+    """``CHUNK_SPLIT_MODE``: ``balanced`` (default, :func:`split_text`) or ``stable`` (:func:`split_text_stable`)."""
+
+    mode = (os.getenv("CHUNK_SPLIT_MODE") or "balanced").lower().strip()
+    return mode if mode in ("balanced", "stable") else "balanced"
+
+
+def chunk_max_chars(provider: Optional[str] = None, default: int = 500) -> int:
+    """Chunk size for ``provider``: ``<PROVIDER>_CHUNK_MAX_CHARS``, else ``CHUNK_MAX_CHARS``, else ``default``."""
+
+    value = os.getenv(f"{provider.upper()}_CHUNK_MAX_CHARS") if provider else None
+    value = value or os.getenv("CHUNK_MAX_CHARS")
+    try:
+        return max(1, int(value)) if value else default
+    except ValueError:
+        return default
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from backend.health import ProviderHealthMonitor
+
+
+logger = logging.getLogger("nami-tts.warm-state")
+
+SNAPSHOT_VERSION = 1
+
+
+class WarmStateStore:
+    """Periodically snapshots learned state to a JSON file and restores it at startup.
+
+    The snapshot holds the TTSManager warm state (models caches, per-provider
+    state such as the NanoAI clock offset and voice catalog) and the last
+    provider health results. Writes go to a temporary file that is atomically
+    renamed, and are skipped when nothing changed. Snapshots older than
+    ``max_age_seconds`` are ignored; each part is also checked against its own
+    TTL when restored.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        get_manager: Callable[[], Any],
+        health_monitor: ProviderHealthMonitor,
+        *,
+        interval_seconds: float = 60.0,
+        max_age_seconds: float = 3600.0,
+    ):
+        self.path = path
+        self.get_manager = get_manager
+        self.health_monitor = health_monitor
+        self.interval_seconds = max(1.0, interval_seconds)
+        self.max_age_seconds = max_age_seconds
+
+        self.restored_saved_at: Optional[float] = None
+        self.last_saved_at: Optional[float] = None
+        self.saves = 0
+        self.errors = 0
+        self._last_body: Optional[str] = None
+        self._lock = threading.Lock()
+        self._thread_pid: Optional[int] = None
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("read warm state %s failed: %s", self.path, str(e))
+            return None
+
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            return None
+        age = time.time() - float(data.get("saved_at") or 0)
+        if age > self.max_age_seconds:
+            logger.info("warm state snapshot ignored: %.0fs old", age)
+            return None
+        return data
+
+    def restore(self) -> bool:
+        data = self.load()
+        if data is None:
+            return False
+        try:
+            self.get_manager().restore_warm_state(data.get("manager") or {})
+            self.health_monitor.restore(data.get("health") or {})
+        except Exception as e:
+            logger.warning("restore warm state failed: %s", str(e))
+            return False
+        self.restored_saved_at = float(data["saved_at"])
+        logger.info("warm state restored from %s (%.0fs old)", self.path, time.time() - self.restored_saved_at)
+        return True
+
+    def save(self) -> bool:
+        """Write a snapshot if the state changed since the last write; return whether one was written."""
+
+        with self._lock:
+            try:
+                state = {"manager": self.get_manager().export_warm_state(), "health": self.health_monitor.export()}
+                body = json.dumps(state, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+            except Exception as e:
+                self.errors += 1
+                logger.warning("collect warm state failed: %s", str(e))
+                return False
+            # unchanged state is rewritten only to keep the snapshot within max_age_seconds
+            if body == self._last_body and time.time() - (self.last_saved_at or 0) < self.max_age_seconds / 2:
+                return False
+
+            saved_at = time.time()
+            snapshot = {"version": SNAPSHOT_VERSION, "saved_at": saved_at, "pid": os.getpid(), **state}
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"), default=str)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                self.errors += 1
+                logger.warning("write warm state %s failed: %s", self.path, str(e))
+                return False
+
+            self._last_body = body
+            self.last_saved_at = saved_at
+            self.saves += 1
+            return True
+
+    def ensure_started(self) -> None:
+        """Start the periodic snapshot thread (again in a forked child)."""
+
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            threading.Thread(target=self._loop, name="warm-state", daemon=True).start()
+
+    def _loop(self) -> None:
+        while True:
+            time.sleep(self.interval_seconds)
+            self.save()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "path": self.path,
+            "interval_seconds": self.interval_seconds,
+            "max_age_seconds": self.max_age_seconds,
+            "restored": self.restored_saved_at is not None,
+            "restored_snapshot_age_seconds": round(now - self.restored_saved_at, 3) if self.restored_saved_at else None,
+            "last_saved_at": self.last_saved_at,
+            "saves": self.saves,
+            "errors": self.errors,
+        }
+
+
+def build_warm_state(get_manager: Callable[[], Any], health_monitor: ProviderHealthMonitor) -> Optional[WarmStateStore]:
+    if (os.getenv("WARM_STATE_ENABLED") or "true").lower() not in ("true", "1", "yes", "on"):
+        return None
+    return WarmStateStore(
+        os.path.join(os.getenv("CACHE_DIR", "/tmp/cache"), "warm_state.json"),
+        get_manager,
+        health_monitor,
+        interval_seconds=float(os.getenv("WARM_STATE_INTERVAL_SECONDS") or 60),
+        max_age_seconds=float(os.getenv("WARM_STATE_MAX_AGE_SECONDS") or 3600),
+    )
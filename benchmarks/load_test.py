@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""End-to-end load driver for ``POST /v1/audio/speech``.
+
+Runs a fixed number of requests at each concurrency level and reports
+requests/s plus p50/p95/p99 latency and time-to-first-byte as JSON.
+
+Without ``--url`` the service is self-hosted in this process against
+:mod:`benchmarks.stub_upstream`, so no network access is needed:
+
+    python -m benchmarks.load_test --concurrency 1,8,32 --requests 200 --output bench.json
+    python -m benchmarks.load_test --stream --stub-chunk-delay 0.05 --baseline bench.json
+
+With ``--baseline``, the run is compared against an earlier result file and
+the exit status is 1 when p95 latency or throughput regressed by more than
+``--max-regression``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.stub_upstream import add_stub_arguments, start_stub, stub_config_from_args
+
+DEFAULT_TEXT = "纳米AI语音合成压测文本，用于测量吞吐量与延迟。This is a load test sentence."
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` (0 < q <= 100)."""
+
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), int(round(q / 100.0 * len(ordered) + 0.5))))
+    return ordered[rank - 1]
+
+
+def _summary_ms(values: List[float]) -> Dict[str, Optional[float]]:
+    def ms(v: Optional[float]) -> Optional[float]:
+        return round(v * 1000, 2) if v is not None else None
+
+    return {
+        "p50": ms(percentile(values, 50)),
+        "p95": ms(percentile(values, 95)),
+        "p99": ms(percentile(values, 99)),
+        "max": ms(max(values) if values else None),
+        "mean": ms(sum(values) / len(values) if values else None),
+    }
+
+
+class Target:
+    def __init__(self, base_url: str, api_key: Optional[str]):
+        parsed = urlsplit(base_url)
+        self.scheme = parsed.scheme or "http"
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or (443 if self.scheme == "https" else 80)
+        self.path = (parsed.path.rstrip("/") or "") + "/v1/audio/speech"
+        self.api_key = api_key
+
+    def connect(self, timeout: float) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+
+def _one_request(
+    conn: http.client.HTTPConnection,
+    target: Target,
+    body: bytes,
+) -> Tuple[int, float, Optional[float], int]:
+    """Send one request on ``conn``; return (status, latency, ttfb, bytes)."""
+
+    headers = {"Content-Type": "application/json"}
+    if target.api_key:
+        headers["Authorization"] = f"Bearer {target.api_key}"
+
+    start = time.perf_counter()
+    conn.request("POST", target.path, body=body, headers=headers)
+    response = conn.getresponse()
+    ttfb = None
+    size = 0
+    while True:
+        chunk = response.read1(65536)
+        if not chunk:
+            break
+        if ttfb is None:
+            ttfb = time.perf_counter() - start
+        size += len(chunk)
+    return response.status, time.perf_counter() - start, ttfb, size
+
+
+def run_level(
+    target: Target,
+    *,
+    concurrency: int,
+    requests: int,
+    model: str,
+    text: str,
+    stream: bool,
+    unique: bool,
+    timeout: float,
+    run_id: str,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    ttfbs: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors: List[str] = []
+    total_bytes = 0
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker() -> None:
+        nonlocal total_bytes
+        conn: Optional[http.client.HTTPConnection] = None
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+
+            payload = {"model": model, "input": f"{text} [{run_id}-{concurrency}-{i}]" if unique else text}
+            if stream:
+                payload["stream"] = True
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+            try:
+                conn = conn or target.connect(timeout)
+                status, latency, ttfb, size = _one_request(conn, target, body)
+            except (OSError, http.client.HTTPException) as e:
+                if conn is not None:
+                    conn.close()
+                    conn = None
+                with lock:
+                    statuses["transport_error"] = statuses.get("transport_error", 0) + 1
+                    errors.append(str(e))
+                continue
+
+            with lock:
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+                if status == 200:
+                    latencies.append(latency)
+                    if ttfb is not None:
+                        ttfbs.append(ttfb)
+                    total_bytes += size
+
+        if conn is not None:
+            conn.close()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duration = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "ok": len(latencies),
+        "errors": requests - len(latencies),
+        "status_counts": statuses,
+        "sample_errors": errors[:5],
+        "duration_seconds": round(duration, 3),
+        "rps": round(len(latencies) / duration, 2) if duration else None,
+        "latency_ms": _summary_ms(latencies),
+        "ttfb_ms": _summary_ms(ttfbs),
+        "bytes": total_bytes,
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Return human-readable regressions of ``result`` against ``baseline``."""
+
+    problems: List[str] = []
+    previous = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    for level in result["levels"]:
+        old = previous.get(level["concurrency"])
+        if not old:
+            continue
+        c = level["concurrency"]
+        new_p95, old_p95 = level["latency_ms"]["p95"], old["latency_ms"]["p95"]
+        if new_p95 and old_p95 and new_p95 > old_p95 * (1 + max_regression):
+            problems.append(f"c={c}: p95 latency {old_p95}ms -> {new_p95}ms")
+        new_rps, old_rps = level["rps"], old["rps"]
+        if new_rps is not None and old_rps and new_rps < old_rps * (1 - max_regression):
+            problems.append(f"c={c}: throughput {old_rps} -> {new_rps} req/s")
+        if level["errors"] > old["errors"]:
+            problems.append(f"c={c}: errors {old['errors']} -> {level['errors']}")
+    return problems
+
+
+def self_host(args: argparse.Namespace) -> Tuple[str, str, Dict[str, Any]]:
+    """Start the stub upstream and the Flask app in-process; return (base_url, api_key, stub_config)."""
+
+    stub_config = stub_config_from_args(args, "stub-")
+    stub = start_stub(stub_config)
+    stub_url = f"http://127.0.0.1:{stub.server_port}"
+
+    api_key = args.api_key or "bench-key"
+    os.environ["NANOAI_BASE_URL"] = stub_url
+    os.environ["TIME_SYNC_URL"] = stub_url
+    os.environ["SERVICE_API_KEY"] = api_key
+    os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="nami-tts-bench-"))
+    os.environ.setdefault("TIME_SYNC_ENABLED", "false")
+    if not args.cache:
+        os.environ["AUDIO_CACHE_ENABLED"] = "false"
+
+    from werkzeug.serving import make_server
+
+    from backend.app import app
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="bench-app", daemon=True).start()
+
+    config = asdict(stub_config)
+    config["url"] = stub_url
+    return f"http://127.0.0.1:{server.server_port}", api_key, config
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test /v1/audio/speech")
+    parser.add_argument("--url", help="base URL of a running service (default: self-host against the stub)")
+    parser.add_argument("--api-key", default=os.getenv("SERVICE_API_KEY") or os.getenv("TTS_API_KEY"))
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=50, help="requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed requests before the first level")
+    parser.add_argument("--model", default="DeepSeek")
+    parser.add_argument("--text", default=DEFAULT_TEXT)
+    parser.add_argument("--stream", action="store_true", help="request chunked streaming responses")
+    parser.add_argument("--repeat-text", action="store_true", help="send identical text (exercises cache/coalescing)")
+    parser.add_argument("--cache", action="store_true", help="keep the audio cache enabled when self-hosting")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="write the JSON result here instead of stdout")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed relative regression (default: 0.2)")
+    add_stub_arguments(parser, "stub-")
+    args = parser.parse_args()
+
+    stub_config = None
+    if args.url:
+        base_url, api_key = args.url, args.api_key
+    else:
+        base_url, api_key, stub_config = self_host(args)
+
+    target = Target(base_url, api_key)
+    levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+    run_id = f"{int(time.time())}"
+    common = dict(
+        model=args.model,
+        text=args.text,
+        stream=args.stream,
+        unique=not args.repeat_text,
+        timeout=args.timeout,
+        run_id=run_id,
+    )
+
+    if args.warmup:
+        run_level(target, concurrency=1, requests=args.warmup, **{**common, "run_id": f"{run_id}-warmup"})
+
+    result: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.time(),
+            "target": args.url or "self-hosted",
+            "stub": stub_config,
+            "stream": args.stream,
+            "unique_text": not args.repeat_text,
+            "text_length": len(args.text),
+            "requests_per_level": args.requests,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "levels": [],
+    }
+    for concurrency in levels:
+        level = run_level(target, concurrency=concurrency, requests=args.requests, **common)
+        result["levels"].append(level)
+        print(
+            f"c={concurrency:<4} rps={level['rps']} p50={level['latency_ms']['p50']}ms "
+            f"p95={level['latency_ms']['p95']}ms p99={level['latency_ms']['p99']}ms "
+            f"ttfb_p50={level['ttfb_ms']['p50']}ms errors={level['errors']}",
+            file=sys.stderr,
+        )
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            problems = compare(result, json.load(f), args.max_regression)
+        result["regressions"] = problems
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        exit_code = 1 if problems else 0
+
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark: import time of ``backend.app`` and time to readiness.
+
+Each run starts a fresh interpreter that imports the app, then polls
+``/health`` through the Flask test client until the default provider is
+ready, and finally sends one speech request. The upstream is
+:mod:`benchmarks.stub_upstream` with ``--stub-latency`` per call, so work
+done at import time shows up directly in the numbers:
+
+    python -m benchmarks.startup --runs 10 --stub-latency 0.5 --output startup.json
+    python -m benchmarks.startup --baseline startup.json
+
+With ``--baseline`` the exit status is 1 when the median import time
+regressed by more than ``--max-regression``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+from benchmarks.load_test import _summary_ms
+from benchmarks.stub_upstream import add_stub_arguments, start_stub, stub_config_from_args
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON line.
+_CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+import backend.app as service
+imported = time.perf_counter() - start
+
+client = service.app.test_client()
+ready = None
+deadline = time.perf_counter() + TIMEOUT
+while time.perf_counter() < deadline:
+    body = client.get("/health").get_json() or {}
+    if body.get("ready"):
+        ready = time.perf_counter() - start
+        break
+    time.sleep(0.005)
+
+first = None
+if REQUEST:
+    t = time.perf_counter()
+    resp = client.post(
+        "/v1/audio/speech",
+        json={"model": "DeepSeek", "input": "startup benchmark"},
+        headers={"Authorization": "Bearer " + API_KEY},
+    )
+    if resp.status_code == 200:
+        first = time.perf_counter() - t
+
+modules = [m for m in ("gtts", "requests") if m in sys.modules]
+print(json.dumps({"import": imported, "ready": ready, "first_request": first, "heavy_modules": modules}))
+"""
+
+
+def run_once(env: Dict[str, str], timeout: float, request: bool) -> Dict[str, Any]:
+    code = (
+        _CHILD.replace("TIMEOUT", repr(timeout))
+        .replace("REQUEST", repr(request))
+        .replace("API_KEY", repr(env["SERVICE_API_KEY"]))
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=timeout + 60,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"child failed ({proc.returncode}): {proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure cold-start cost of the service")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for readiness per run")
+    parser.add_argument("--no-request", action="store_true", help="skip the first speech request")
+    parser.add_argument("--warm-cache", action="store_true", help="reuse CACHE_DIR across runs (voice catalog on disk)")
+    parser.add_argument("--output", help="write the JSON result here instead of stdout")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed relative regression (default: 0.2)")
+    add_stub_arguments(parser, "stub-")
+    args = parser.parse_args()
+
+    stub_config = stub_config_from_args(args, "stub-")
+    stub = start_stub(stub_config)
+    stub_url = f"http://127.0.0.1:{stub.server_port}"
+
+    base_env = dict(os.environ)
+    base_env.update(
+        NANOAI_BASE_URL=stub_url,
+        TIME_SYNC_URL=stub_url,
+        SERVICE_API_KEY=base_env.get("SERVICE_API_KEY") or "bench-key",
+        PYTHONPATH=PROJECT_ROOT + os.pathsep + base_env.get("PYTHONPATH", ""),
+        LOG_LEVEL=base_env.get("LOG_LEVEL") or "WARNING",
+    )
+    shared_cache = tempfile.mkdtemp(prefix="nami-tts-startup-")
+
+    runs: List[Dict[str, Any]] = []
+    for i in range(args.runs):
+        env = dict(base_env, CACHE_DIR=shared_cache if args.warm_cache else tempfile.mkdtemp(prefix="nami-tts-startup-"))
+        result = run_once(env, args.timeout, not args.no_request)
+        runs.append(result)
+        print(
+            f"run {i + 1}: import={result['import'] * 1000:.1f}ms ready={_ms(result['ready'])} "
+            f"first_request={_ms(result['first_request'])} heavy_modules={result['heavy_modules']}",
+            file=sys.stderr,
+        )
+
+    def values(key: str) -> List[float]:
+        return [r[key] for r in runs if r[key] is not None]
+
+    config = asdict(stub_config)
+    config["url"] = stub_url
+    result: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.time(),
+            "runs": args.runs,
+            "warm_cache": args.warm_cache,
+            "stub": config,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "import_ms": _summary_ms(values("import")),
+        "ready_ms": _summary_ms(values("ready")),
+        "first_request_ms": _summary_ms(values("first_request")),
+        "not_ready": sum(1 for r in runs if r["ready"] is None),
+        "heavy_modules": sorted({m for r in runs for m in r["heavy_modules"]}),
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            old = json.load(f)["import_ms"]["p50"]
+        new = result["import_ms"]["p50"]
+        if old and new and new > old * (1 + args.max_regression):
+            result["regressions"] = [f"import p50 {old}ms -> {new}ms"]
+            print(f"REGRESSION import p50 {old}ms -> {new}ms", file=sys.stderr)
+            exit_code = 1
+
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return exit_code
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value * 1000:.1f}ms" if value is not None else "-"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""Local stand-in for the NanoAI upstream (bot.n.cn), for load testing.
+
+Serves:
+- ``POST /api/tts/v1``: a synthetic MP3 (MPEG-1 Layer III, 128 kbps), sent
+  with chunked encoding so time-to-first-byte is observable
+- ``GET /api/robot/platform``: a small voice catalog
+- any other ``GET``/``HEAD``: an empty 200 (its ``Date`` header serves time sync)
+- ``GET /__stats``: request and injected-error counters
+
+Latency, gzip bodies, ID3/junk prefixes, 5xx errors and 110023 JSON errors
+are configurable. Point the service at it with ``NANOAI_BASE_URL``:
+
+    python -m benchmarks.stub_upstream --port 9100 --latency 0.3 --prefix id3
+    NANOAI_BASE_URL=http://127.0.0.1:9100 TIME_SYNC_ENABLED=false make dev-backend
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import random
+import struct
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import urlsplit
+
+# MPEG-1 Layer III, no CRC, 128 kbps, 44.1 kHz, no padding, joint stereo -> 417-byte frames
+_FRAME_HEADER = 0xFFFB9064
+_FRAME_LENGTH = 417
+
+VOICES = {
+    "data": {
+        "list": [
+            {"tag": "DeepSeek", "title": "DeepSeek (stub)", "icon": ""},
+            {"tag": "Kimi", "title": "Kimi (stub)", "icon": ""},
+        ]
+    }
+}
+
+
+@dataclass
+class StubConfig:
+    latency: float = 0.2  # seconds before response headers
+    jitter: float = 0.0  # +/- uniform jitter added to latency
+    chunk_delay: float = 0.0  # seconds between body chunks
+    frames: int = 150  # ~3.9 s of audio, ~62 KB
+    frames_per_chunk: int = 8
+    prefix: str = "none"  # none | id3 | junk
+    gzip: bool = False  # gzip the MP3 body without Content-Encoding, like the real upstream sometimes does
+    error_5xx_rate: float = 0.0
+    error_110023_rate: float = 0.0
+
+
+def build_mp3(frames: int, prefix: str = "none") -> bytes:
+    frame = struct.pack(">I", _FRAME_HEADER) + bytes(_FRAME_LENGTH - 4)
+    audio = frame * max(1, frames)
+
+    if prefix == "id3":
+        # Tag data deliberately contains frame-sync-like bytes.
+        payload = b"TIT2" + struct.pack(">I", 20) + b"\x00\x00" + b"\xff\xfb\x90\x64" * 5
+        size = len(payload)
+        syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+        return b"ID3\x04\x00\x00" + syncsafe + payload + audio
+    if prefix == "junk":
+        return b"\x00\x01junk\xff\xfb\x00" + audio
+    return audio
+
+
+class StubState:
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self.refresh_body()
+
+    def refresh_body(self) -> None:
+        body = build_mp3(self.config.frames, self.config.prefix)
+        self.body = gzip.compress(body) if self.config.gzip else body
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def delay(self) -> float:
+        c = self.config
+        if not c.jitter:
+            return c.latency
+        with self._lock:
+            return max(0.0, c.latency + self._random.uniform(-c.jitter, c.jitter))
+
+
+def _handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+        def _send_bytes(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def _send_json(self, status: int, data: object) -> None:
+            self._send_bytes(status, json.dumps(data).encode("utf-8"), "application/json")
+
+        def do_HEAD(self) -> None:
+            state.count("head")
+            self._send_bytes(200, b"", "text/plain")
+
+        def do_GET(self) -> None:
+            path = urlsplit(self.path).path
+            if path == "/__stats":
+                self._send_json(200, {"config": asdict(state.config), "counters": dict(state.counters)})
+            elif path == "/api/robot/platform":
+                state.count("voices")
+                self._send_json(200, VOICES)
+            else:
+                state.count("get")
+                self._send_bytes(200, b"", "text/plain")
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            self.rfile.read(length)
+
+            if urlsplit(self.path).path != "/api/tts/v1":
+                self._send_json(404, {"code": 404, "msg": "not found"})
+                return
+
+            state.count("tts")
+            time.sleep(state.delay())
+
+            if state.roll(state.config.error_5xx_rate):
+                state.count("injected_5xx")
+                self._send_json(503, {"code": 503, "msg": "stub overloaded"})
+                return
+            if state.roll(state.config.error_110023_rate):
+                state.count("injected_110023")
+                self._send_json(200, {"code": 110023, "msg": "stub signature expired"})
+                return
+
+            body = state.body
+            step = _FRAME_LENGTH * max(1, state.config.frames_per_chunk)
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(body), step):
+                if i and state.config.chunk_delay:
+                    time.sleep(state.config.chunk_delay)
+                chunk = body[i:i + step]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+
+    return Handler
+
+
+def start_stub(config: StubConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the stub in a daemon thread; ``server.server_port`` is the bound port."""
+
+    server = ThreadingHTTPServer((host, port), _handler(StubState(config)))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-upstream", daemon=True).start()
+    return server
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser, prefix: str = "") -> None:
+    defaults = StubConfig()
+    parser.add_argument(f"--{prefix}latency", type=float, default=defaults.latency, help="seconds before response headers")
+    parser.add_argument(f"--{prefix}jitter", type=float, default=defaults.jitter, help="+/- uniform latency jitter")
+    parser.add_argument(f"--{prefix}chunk-delay", type=float, default=defaults.chunk_delay, help="seconds between body chunks")
+    parser.add_argument(f"--{prefix}frames", type=int, default=defaults.frames, help="MP3 frames per response")
+    parser.add_argument(f"--{prefix}prefix", choices=("none", "id3", "junk"), default=defaults.prefix)
+    parser.add_argument(f"--{prefix}gzip", action="store_true", help="gzip MP3 bodies")
+    parser.add_argument(f"--{prefix}5xx-rate", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument(f"--{prefix}110023-rate", type=float, default=0.0, help="fraction of 110023 JSON errors")
+
+
+def stub_config_from_args(args: argparse.Namespace, prefix: str = "") -> StubConfig:
+    p = prefix.replace("-", "_")
+    return StubConfig(
+        latency=getattr(args, f"{p}latency"),
+        jitter=getattr(args, f"{p}jitter"),
+        chunk_delay=getattr(args, f"{p}chunk_delay"),
+        frames=getattr(args, f"{p}frames"),
+        prefix=getattr(args, f"{p}prefix"),
+        gzip=getattr(args, f"{p}gzip"),
+        error_5xx_rate=getattr(args, f"{p}5xx_rate"),
+        error_110023_rate=getattr(args, f"{p}110023_rate"),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local NanoAI upstream stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_stub(stub_config_from_args(args), args.host, args.port)
+    print(f"stub upstream listening on http://{args.host}:{server.server_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
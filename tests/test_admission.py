@@ -0,0 +1,64 @@
+import threading
+import time
+import unittest
+
+from backend.utils.admission import AdmissionController, AdmissionRejected
+from backend.utils.concurrency import BULK, INTERACTIVE
+
+
+class AdmissionControllerTest(unittest.TestCase):
+    def test_admits_up_to_capacity_then_rejects(self):
+        controller = AdmissionController(max_in_flight=2, max_queue=0)
+        controller.acquire()
+        controller.acquire()
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.acquire()
+        self.assertEqual(ctx.exception.reason, "queue_full")
+        self.assertGreaterEqual(ctx.exception.retry_after, 1)
+        self.assertEqual((controller.in_flight, controller.rejected), (2, 1))
+
+    def test_queued_request_gets_released_slot(self):
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=2)
+        controller.acquire()
+        threading.Timer(0.05, controller.release).start()
+        start = time.monotonic()
+        controller.acquire()
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertEqual(controller.in_flight, 1)
+        self.assertEqual(controller.waiting, 0)
+
+    def test_queue_timeout(self):
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=0.05)
+        controller.acquire()
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.acquire()
+        self.assertEqual(ctx.exception.reason, "queue_timeout")
+        self.assertEqual(controller.waiting, 0)
+
+    def test_reserved_interactive_slots(self):
+        controller = AdmissionController(max_in_flight=3, max_queue=0, reserved_interactive=1)
+        controller.acquire(BULK)
+        controller.acquire(BULK)
+        with self.assertRaises(AdmissionRejected):
+            controller.acquire(BULK)
+        controller.acquire(INTERACTIVE)
+        stats = controller.stats()
+        self.assertEqual(stats["in_flight_by_priority"], {INTERACTIVE: 1, BULK: 2})
+
+    def test_retry_after_follows_drain_rate(self):
+        controller = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=5)
+        controller.acquire()
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.acquire()
+        self.assertEqual(ctx.exception.retry_after, 10)  # nothing drained yet: 2 x queue timeout
+
+        for _ in range(20):
+            controller.release()
+            controller.acquire()
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.acquire()
+        self.assertEqual(ctx.exception.retry_after, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import gzip
+import struct
+import unittest
+
+from backend.utils.audio import MP3StreamNormalizer, ValidatedMP3, inspect_mp3, validate_and_normalize_mp3
+
+FRAME = struct.pack(">I", 0xFFFB9000) + bytes(413)  # MPEG-1 Layer III, 128 kbps, 44.1 kHz
+MP3 = FRAME * 4
+ID3 = b"ID3\x04\x00\x00\x00\x00\x00\x0a" + bytes(10)
+
+
+class InspectMp3Test(unittest.TestCase):
+    def test_plain_frames(self):
+        v = inspect_mp3(MP3)
+        self.assertTrue(v.valid)
+        self.assertEqual(v.offset, 0)
+        self.assertEqual(bytes(v.audio), MP3)
+
+    def test_id3_tag_is_kept(self):
+        v = inspect_mp3(ID3 + MP3)
+        self.assertTrue(v.valid)
+        self.assertTrue(v.id3_present)
+        self.assertEqual(v.first_sync_offset, len(ID3))
+        self.assertEqual(bytes(v.audio), ID3 + MP3)
+
+    def test_leading_junk_is_trimmed(self):
+        v = inspect_mp3(b"<html>oops</html>" + MP3)
+        self.assertTrue(v.valid)
+        self.assertEqual(v.trimmed_offset, 17)
+        self.assertEqual(bytes(v.audio), MP3)
+
+    def test_gzip_is_decompressed(self):
+        v = inspect_mp3(gzip.compress(MP3))
+        self.assertTrue(v.valid)
+        self.assertTrue(v.decompressed)
+        self.assertEqual(bytes(v.audio), MP3)
+
+    def test_rejects_empty_and_non_audio(self):
+        self.assertFalse(inspect_mp3(b"").valid)
+        self.assertFalse(inspect_mp3(b'{"error": "quota exceeded"}').valid)
+
+    def test_rejects_lone_false_sync(self):
+        # A frame header not followed by further frames is not accepted as audio.
+        self.assertFalse(inspect_mp3(b"x" * 10 + FRAME[:4] + b"\x01" * 2000).valid)
+
+
+class ValidateAndNormalizeTest(unittest.TestCase):
+    def test_returns_validated_bytes(self):
+        ok, _, audio, debug = validate_and_normalize_mp3(b"junk" + MP3)
+        self.assertTrue(ok)
+        self.assertIsInstance(audio, ValidatedMP3)
+        self.assertEqual(audio, MP3)
+        self.assertEqual(debug["normalized_len"], len(MP3))
+        self.assertEqual(debug["first16_hex"], MP3[:16].hex())
+
+    def test_validated_input_is_not_rescanned(self):
+        _, _, audio, _ = validate_and_normalize_mp3(MP3)
+        ok, _, again, _ = validate_and_normalize_mp3(audio)
+        self.assertTrue(ok)
+        self.assertIs(again, audio)
+
+
+class MP3StreamNormalizerTest(unittest.TestCase):
+    def _stream(self, data, step):
+        normalizer = MP3StreamNormalizer()
+        out = b"".join(normalizer.feed(data[i:i + step]) for i in range(0, len(data), step))
+        return out + normalizer.finish(), normalizer
+
+    def test_odd_chunk_boundaries_match_batch_validation(self):
+        for data in (MP3, ID3 + MP3, b"<junk>" + MP3, gzip.compress(MP3)):
+            expected = bytes(validate_and_normalize_mp3(data)[2])
+            for step in (1, 3, 7, 413, 1000):
+                with self.subTest(prefix=data[:6], step=step):
+                    out, normalizer = self._stream(data, step)
+                    self.assertTrue(normalizer.validated)
+                    self.assertEqual(out, expected)
+
+    def test_non_audio_stream_raises(self):
+        normalizer = MP3StreamNormalizer()
+        self.assertEqual(normalizer.feed(b'{"error": "busy"}'), b"")
+        with self.assertRaises(ValueError):
+            normalizer.finish()
+
+
+if __name__ == "__main__":
+    unittest.main()
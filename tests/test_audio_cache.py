@@ -0,0 +1,63 @@
+import os
+import tempfile
+import time
+import unittest
+
+from backend.utils.audio_cache import AudioCache, make_cache_key
+
+
+class AudioCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def _cache(self, **kwargs):
+        kwargs.setdefault("memory_max_items", 0)
+        return AudioCache(self._tmp.name, **kwargs)
+
+    def test_key_ignores_transport_options(self):
+        a = make_cache_key("nanoai", "voice", "hello", speed=1, timeout=5)
+        b = make_cache_key("NanoAI", "voice", "hello", speed=1.0, retry_count=3)
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, make_cache_key("google", "voice", "hello", speed=1))
+
+    def test_disk_round_trip(self):
+        cache = self._cache()
+        cache.put("ab" * 16, "nanoai", b"audio")
+        self.assertEqual(cache.get("ab" * 16), ("nanoai", b"audio"))
+        self.assertEqual(cache.disk_hits, 1)
+
+    def test_disk_hit_refreshes_eviction_order(self):
+        cache = self._cache(disk_max_bytes=10_000)
+        old, new = "aa" * 16, "bb" * 16
+        cache.put(old, "nanoai", b"x" * 100)
+        cache.put(new, "nanoai", b"y" * 100)
+        past = time.time() - 100
+        for path in cache._disk_paths(old) + cache._disk_paths(new):
+            os.utime(path, (past, past))
+        os.utime(cache._disk_paths(new)[0], (past + 1, past + 1))
+
+        self.assertIsNotNone(cache.get(old))
+        cache.disk_max_bytes = cache._disk_bytes - 1
+        cache._disk_evict()
+
+        self.assertIsNotNone(cache.get(old))
+        self.assertIsNone(cache.get(new))
+
+    def test_expired_disk_entry_is_uncounted(self):
+        cache = self._cache(disk_max_bytes=10_000)
+        expired, kept = "aa" * 16, "bb" * 16
+        cache.put(expired, "nanoai", b"x" * 100)
+        cache.put(kept, "nanoai", b"y" * 100)
+        size = sum(os.path.getsize(path) for path in cache._disk_paths(expired))
+        before = cache._disk_bytes
+
+        cache.ttl_seconds = 1e-9
+        self.assertIsNone(cache.get(expired))
+        self.assertFalse(any(os.path.exists(path) for path in cache._disk_paths(expired)))
+        self.assertEqual(cache._disk_bytes, before - size)
+        self.assertEqual(cache._disk_bytes, sum(size for _, size in cache._disk_scan().values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+from backend.config import TTSManager
+from backend.tts_providers.base import TTSProvider
+from backend.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from backend.utils.retry import DeadlineExceeded, InvalidRequestError
+
+BREAKER = dict(error_threshold=0.5, min_requests=3, window_seconds=30, open_seconds=60, half_open_successes=1)
+
+
+class _Provider(TTSProvider):
+    name = "fake"
+
+    def __init__(self, error=None):
+        super().__init__()
+        self.error = error
+        self.calls = 0
+
+    def generate_audio(self, text, model, **options):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return b"audio"
+
+
+def _manager(provider):
+    manager = TTSManager(priority_order=["fake"], default_provider="fake", circuit_breaker_options=BREAKER)
+    manager.register_provider("fake", provider)
+    return manager
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_after_failures(self):
+        breaker = CircuitBreaker("x", **BREAKER)
+        for _ in range(3):
+            self.assertTrue(breaker.allow_request())
+            breaker.record(False, 0.1)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow_request())
+
+    def test_release_frees_half_open_probe(self):
+        breaker = CircuitBreaker("x", **dict(BREAKER, open_seconds=0))
+        for _ in range(3):
+            breaker.record(False, 0.1)
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.release()
+        self.assertTrue(breaker.allow_request())
+
+
+class ManagerBreakerTest(unittest.TestCase):
+    def test_provider_failures_open_the_circuit(self):
+        manager = _manager(_Provider(RuntimeError("HTTP POST请求失败: 503")))
+        for i in range(3):
+            with self.assertRaises(RuntimeError):
+                manager.generate_with_fallback(f"t{i}", "m")
+        self.assertEqual(manager.circuit_snapshot("fake")["state"], OPEN)
+        with self.assertRaises(CircuitOpenError):
+            manager._call_provider("fake", lambda: b"")
+
+    def test_client_errors_do_not_count(self):
+        for error in (InvalidRequestError("不支持的声音模型: x"), DeadlineExceeded("request deadline exceeded")):
+            manager = _manager(_Provider(error))
+            for i in range(10):
+                with self.assertRaises(RuntimeError):
+                    manager.generate_with_fallback(f"t{i}", "m")
+            snapshot = manager.circuit_snapshot("fake")
+            self.assertEqual(snapshot["state"], CLOSED)
+            self.assertEqual(snapshot["window_requests"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+import io
+import socket
+import threading
+import time
+import unittest
+import urllib.error
+from unittest import mock
+
+from backend.utils.concurrency import BULK, INTERACTIVE, AIMDLimit, ChunkScheduler, SingleFlight, is_overload_error
+from backend.utils.retry import DeadlineExceeded, UpstreamError
+
+
+def _http_error(status):
+    return urllib.error.HTTPError("http://upstream", status, "reason", {}, io.BytesIO(b""))
+
+
+def _raised_from(inner, outer):
+    try:
+        try:
+            raise inner
+        except Exception:
+            raise outer
+    except Exception as e:
+        return e
+
+
+class OverloadClassificationTest(unittest.TestCase):
+    def test_numbers_in_messages_are_not_overload(self):
+        self.assertFalse(is_overload_error(Exception("chunk of 512 characters, voice 550 not supported")))
+
+    def test_structured_status_and_code(self):
+        self.assertTrue(is_overload_error(UpstreamError("busy", status=503)))
+        self.assertTrue(is_overload_error(UpstreamError("slow down", status=429)))
+        self.assertFalse(is_overload_error(UpstreamError("bad request", status=400)))
+        self.assertTrue(is_overload_error(UpstreamError("time", code="110023")))
+        self.assertFalse(is_overload_error(UpstreamError("params", code="40001")))
+
+    def test_chained_errors(self):
+        self.assertTrue(is_overload_error(_raised_from(_http_error(502), Exception("HTTP POST failed"))))
+        self.assertFalse(is_overload_error(_raised_from(_http_error(404), Exception("HTTP POST failed"))))
+        self.assertTrue(is_overload_error(_raised_from(socket.timeout("timed out"), Exception("failed"))))
+        self.assertTrue(is_overload_error(urllib.error.URLError(TimeoutError())))
+
+    def test_own_deadline_is_not_overload(self):
+        self.assertFalse(is_overload_error(_raised_from(TimeoutError(), DeadlineExceeded("late"))))
+
+
+class AIMDLimitTest(unittest.TestCase):
+    def test_additive_increase(self):
+        limit = AIMDLimit(initial=2, minimum=1, maximum=4)
+        limit.record(0.1, ok=True, overloaded=False)
+        self.assertAlmostEqual(limit.limit, 2.5)
+        for _ in range(20):
+            limit.record(0.1, ok=True, overloaded=False)
+        self.assertEqual(limit.limit, 4)
+        self.assertEqual(limit.slots, 4)
+
+    def test_latency_spike_does_not_increase(self):
+        limit = AIMDLimit(initial=2, maximum=8, latency_tolerance=2.0)
+        limit.record(0.1, ok=True, overloaded=False)
+        before = limit.limit
+        limit.record(1.0, ok=True, overloaded=False)
+        self.assertEqual(limit.limit, before)
+
+    def test_multiplicative_decrease_once_per_window(self):
+        limit = AIMDLimit(initial=8, minimum=1, maximum=8, backoff=0.5)
+        limit.record(0.2, ok=True, overloaded=False)
+        limit.record(0.2, ok=False, overloaded=True)
+        self.assertEqual(limit.limit, 4)
+        limit.record(0.2, ok=False, overloaded=True)  # same burst: ignored
+        self.assertEqual((limit.limit, limit.decreases), (4, 1))
+
+        with mock.patch("backend.utils.concurrency.time.monotonic", return_value=time.monotonic() + 10):
+            limit.record(0.2, ok=False, overloaded=True)
+        self.assertEqual(limit.limit, 2)
+
+    def test_floor(self):
+        limit = AIMDLimit(initial=1, minimum=1, backoff=0.5)
+        limit.record(0, ok=False, overloaded=True)
+        self.assertEqual(limit.slots, 1)
+
+
+def _fixed_scheduler(slots, reserved_interactive=0):
+    return ChunkScheduler("test", AIMDLimit(initial=slots, minimum=slots, maximum=slots), reserved_interactive=reserved_interactive)
+
+
+class ChunkSchedulerCancelTest(unittest.TestCase):
+    def test_cancelled_queued_tasks_never_run(self):
+        scheduler = _fixed_scheduler(1)
+        release = threading.Event()
+        ran = []
+        blocker = scheduler.submit_group([(release.wait, (5,))])[0]
+        queued = scheduler.submit_group([(ran.append, (i,)) for i in range(3)])
+        time.sleep(0.05)
+
+        self.assertTrue(all(f.cancel() for f in queued))
+        release.set()
+        blocker.result(5)
+        self.assertEqual(scheduler.run(ran.append, "after"), None)
+        self.assertEqual(ran, ["after"])
+        self.assertEqual(scheduler.in_flight, 0)
+
+    def test_failure_reaches_future_and_counts(self):
+        scheduler = _fixed_scheduler(1)
+        future = scheduler.submit_group([(int, ("not a number",))])[0]
+        with self.assertRaises(ValueError):
+            future.result(5)
+        time.sleep(0.05)
+        self.assertEqual(scheduler.failed, 1)
+
+
+class ChunkSchedulerLanesTest(unittest.TestCase):
+    def test_interactive_slot_is_reserved_under_bulk_saturation(self):
+        scheduler = _fixed_scheduler(2, reserved_interactive=1)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        bulk = scheduler.submit_group([(release.wait, (5,)) for _ in range(3)], BULK)
+        time.sleep(0.05)
+        self.assertEqual(scheduler.stats()["lanes"][BULK]["in_flight"], 1)
+
+        start = time.monotonic()
+        self.assertEqual(scheduler.run(lambda: "fast", priority=INTERACTIVE), "fast")
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertFalse(any(f.done() for f in bulk))
+
+    def test_interactive_goes_first_and_groups_round_robin(self):
+        scheduler = _fixed_scheduler(1)
+        release = threading.Event()
+        order = []
+        blocker = scheduler.submit_group([(release.wait, (5,))], BULK)[0]
+        time.sleep(0.05)
+        first = scheduler.submit_group([(order.append, (f"a{i}",)) for i in range(2)], BULK)
+        second = scheduler.submit_group([(order.append, (f"b{i}",)) for i in range(2)], BULK)
+        urgent = scheduler.submit_group([(order.append, ("i",))], INTERACTIVE)
+
+        release.set()
+        for future in [blocker, *first, *second, *urgent]:
+            future.result(5)
+        self.assertEqual(order, ["i", "a0", "b0", "a1", "b1"])
+
+
+class SingleFlightTest(unittest.TestCase):
+    def _concurrent(self, flight, fn, count=5):
+        results = []
+
+        def call():
+            try:
+                results.append(flight.do("key", fn))
+            except Exception as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            release.wait(5)
+            return "audio"
+
+        threads, results = self._concurrent(flight, fn)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, ["audio"] * 5)
+        self.assertEqual(flight.stats(), {"executions": 1, "collapsed": 4, "in_flight": 0})
+
+    def test_exception_reaches_every_waiter(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        error = RuntimeError("upstream down")
+
+        def fn():
+            release.wait(5)
+            raise error
+
+        threads, results = self._concurrent(flight, fn)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, [error] * 5)
+
+    def test_key_is_released_afterwards(self):
+        flight = SingleFlight()
+        calls = []
+        self.assertEqual(flight.do("key", lambda: calls.append(1) or "first"), "first")
+        with self.assertRaises(ValueError):
+            flight.do("key", lambda: int("x"))
+        self.assertEqual(flight.do("key", lambda: calls.append(2) or "again"), "again")
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from backend.health import ProviderHealthMonitor
+from backend.tts_providers.base import ProviderHealth, TTSProvider
+
+
+class _Provider(TTSProvider):
+    def __init__(self, release=None):
+        super().__init__()
+        self.release = release
+        self.checks = 0
+
+    def generate_audio(self, text, model, **options):
+        return b""
+
+    def health_check(self):
+        self.checks += 1
+        if self.release is not None:
+            self.release.wait(5)
+        return ProviderHealth(ok=True, message="ok")
+
+
+class ProviderHealthMonitorTest(unittest.TestCase):
+    def setUp(self):
+        self.monitor = ProviderHealthMonitor(lambda: None, interval_seconds=3600)
+        patcher = mock.patch.object(ProviderHealthMonitor, "_ensure_started")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_hanging_provider_does_not_block_others(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        hanging = _Provider(release)
+        thread = threading.Thread(target=self.monitor.get, args=("hanging", hanging), daemon=True)
+        thread.start()
+        time.sleep(0.05)
+
+        start = time.monotonic()
+        snapshot = self.monitor.get("fast", _Provider())
+        self.assertTrue(snapshot.ok)
+        self.assertLess(time.monotonic() - start, 1)
+
+        release.set()
+        thread.join(5)
+        self.assertTrue(self.monitor.get("hanging", hanging).ok)
+
+    def test_concurrent_first_reads_share_one_check(self):
+        release = threading.Event()
+        provider = _Provider(release)
+        threads = [threading.Thread(target=self.monitor.get, args=("p", provider)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(provider.checks, 1)
+
+    def test_restored_result_is_served_without_a_check(self):
+        self.monitor.restore({"p": {"ok": False, "message": "down", "checked_at": 1.0}})
+        provider = _Provider()
+        snapshot = self.monitor.get("p", provider)
+        self.assertFalse(snapshot.ok)
+        self.assertEqual(provider.checks, 0)
+
+
+class RefresherForkTest(unittest.TestCase):
+    def test_refresher_restarts_in_forked_child(self):
+        monitor = ProviderHealthMonitor(lambda: None, interval_seconds=3600)
+        with mock.patch("backend.health.threading.Thread") as thread:
+            monitor._ensure_started()
+            monitor._ensure_started()
+            self.assertEqual(thread.call_count, 1)
+            with mock.patch("backend.health.os.getpid", return_value=-1):  # as seen from a child
+                monitor._ensure_started()
+            self.assertEqual(thread.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
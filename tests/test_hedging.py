@@ -0,0 +1,80 @@
+import struct
+import threading
+import time
+import unittest
+
+from backend.config import TTSManager
+from backend.tts_providers.base import TTSProvider
+from backend.utils.retry import Deadline
+
+# Three MPEG-1 Layer III frames (128 kbps, 44.1 kHz): enough to pass validation.
+MP3 = (struct.pack(">I", 0xFFFB9000) + bytes(413)) * 3
+
+
+class _SlowProvider(TTSProvider):
+    def __init__(self, delay, error=None):
+        super().__init__()
+        self.delay = delay
+        self.error = error
+
+    def generate_audio(self, text, model, **options):
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return MP3
+
+
+class _StuckDeadline(Deadline):
+    """Always a little time left: wait() keeps timing out without the deadline expiring."""
+
+    def remaining(self):
+        return 0.005
+
+    def expired(self):
+        return False
+
+
+def _manager(**providers):
+    manager = TTSManager(priority_order=list(providers), default_provider=next(iter(providers)), hedge_after_seconds=0.02)
+    for name, provider in providers.items():
+        manager.register_provider(name, provider)
+    return manager
+
+
+class HedgingTest(unittest.TestCase):
+    def test_hedge_wins_over_slow_primary(self):
+        manager = _manager(slow=_SlowProvider(0.5), fast=_SlowProvider(0.01))
+        name, audio, errors = manager.generate_with_fallback("hello", "voice")
+        self.assertEqual(name, "fast")
+        self.assertEqual(bytes(audio), MP3)
+        self.assertEqual(errors, [])
+        self.assertEqual(manager.hedges_launched, 1)
+        self.assertEqual(manager.hedge_wins, 1)
+
+    def test_primary_failure_falls_back(self):
+        manager = _manager(broken=_SlowProvider(0, RuntimeError("boom")), ok=_SlowProvider(0.01))
+        name, _, errors = manager.generate_with_fallback("hello", "voice")
+        self.assertEqual(name, "ok")
+        self.assertEqual([e.provider for e in errors], ["broken"])
+
+    def test_timeout_with_all_candidates_running(self):
+        manager = _manager(a=_SlowProvider(0.15), b=_SlowProvider(0.1))
+        name, _, _ = manager.generate_with_fallback("hello", "voice", deadline=_StuckDeadline())
+        self.assertEqual(name, "b")
+        self.assertEqual(manager.hedges_launched, 1)
+
+    def test_counters_are_exact_under_concurrency(self):
+        manager = _manager(slow=_SlowProvider(0.2), fast=_SlowProvider(0.01))
+        threads = [
+            threading.Thread(target=manager.generate_with_fallback, args=(f"text {i}", "voice")) for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(manager.hedges_launched, 8)
+        self.assertEqual(manager.hedge_wins, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from backend.jobs import JobRunner, JobStore
+from backend.utils.rate_limit import api_key_id
+
+
+class JobStoreOwnershipTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def test_job_is_visible_only_to_its_key(self):
+        store = JobStore(self._tmp.name)
+        owner, other = api_key_id("key-a"), api_key_id("key-b")
+        job = store.create({"input": "hi"}, api_key_id=owner)
+
+        self.assertEqual(store.get(job["id"], api_key_id=owner)["id"], job["id"])
+        self.assertIsNone(store.get(job["id"], api_key_id=other))
+        self.assertNotIn("api_key_id", job)
+
+    def test_key_is_stored_as_digest(self):
+        store = JobStore(self._tmp.name)
+        store.create({"input": "hi"}, api_key_id=api_key_id("secret-key"))
+        with open(store.db_path, "rb") as f:
+            self.assertNotIn(b"secret-key", f.read())
+
+    def test_existing_table_gains_owner_column(self):
+        root = os.path.join(self._tmp.name, "jobs")
+        os.makedirs(root)
+        conn = sqlite3.connect(os.path.join(root, "jobs.sqlite3"))
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL, request TEXT NOT NULL, chunks_total INTEGER NOT NULL DEFAULT 0,"
+            " chunks_done INTEGER NOT NULL DEFAULT 0, provider TEXT, error TEXT, result_size INTEGER, owner TEXT)"
+        )
+        conn.close()
+
+        store = JobStore(self._tmp.name)
+        job = store.create({"input": "hi"}, api_key_id=api_key_id("k"))
+        self.assertIsNotNone(store.get(job["id"], api_key_id=api_key_id("k")))
+
+
+class JobRunnerProcessTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.store = JobStore(self._tmp.name)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        self.calls = []
+
+    def _runner(self, synthesize, **kwargs):
+        kwargs.setdefault("max_chars", 20)
+        return JobRunner(self.store, synthesize, **kwargs)
+
+    def _claim(self, runner, text):
+        self.store.create({"input": text, "model": "voice"})
+        return self.store.claim(runner.owner, runner.lease_seconds)
+
+    def test_first_failure_cancels_pending_chunks(self):
+        def synthesize(text, model, provider, options):
+            self.calls.append(text)
+            if len(self.calls) == 1:
+                raise RuntimeError("upstream down")
+            self.release.wait(5)
+            return "fake", b"audio"
+
+        runner = self._runner(synthesize, chunk_concurrency=2)
+        job = self._claim(runner, "First sentence here. " * 6)
+        thread = threading.Thread(target=runner._process, args=(job,), daemon=True)
+        thread.start()
+        thread.join(2)
+
+        self.assertFalse(thread.is_alive())
+        job = self.store.get(job["id"])
+        self.assertEqual(job["status"], "failed")
+        # the failed chunk's worker may start one more before the rest are cancelled
+        self.assertGreater(job["chunks_total"], 3)
+        self.assertLessEqual(len(self.calls), 3)
+
+    def test_slow_chunk_keeps_the_lease(self):
+        def synthesize(text, model, provider, options):
+            self.release.wait(5)
+            return "fake", b"audio"
+
+        runner = self._runner(synthesize, lease_seconds=0.3)
+        job = self._claim(runner, "Hello.")
+        thread = threading.Thread(target=runner._process, args=(job,), daemon=True)
+        thread.start()
+        time.sleep(0.8)
+
+        self.assertIsNone(self.store.claim("other-worker", runner.lease_seconds))
+        self.release.set()
+        thread.join(2)
+        self.assertEqual(self.store.get(job["id"])["status"], "succeeded")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import threading
+import unittest
+
+from backend.utils.metrics import REGISTRY, Counter, Histogram
+
+
+def _run_threads(target, count=20):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class MetricsTest(unittest.TestCase):
+    def test_counter_from_short_lived_threads(self):
+        counter = Counter("test_metrics_events_total", "Events.", ("kind",))
+        child = counter.labels("a")
+        _run_threads(lambda: child.inc(2))
+        self.assertGreater(len(child._shards._shards), 0)
+
+        # finished threads are folded in when the next one registers, without a scrape
+        _run_threads(lambda: child.inc(2), count=1)
+        self.assertEqual(len(child._shards._shards), 1)
+        self.assertEqual(child.value(), 42)
+        self.assertEqual(child._shards._shards, [])
+        self.assertIn('test_metrics_events_total{kind="a"} 42', REGISTRY.render())
+
+    def test_histogram_exposition(self):
+        histogram = Histogram("test_metrics_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        _run_threads(lambda: histogram.observe(0.5), count=4)
+        histogram.observe(0.05)
+        histogram.observe(5)
+
+        text = REGISTRY.render()
+        self.assertIn("# TYPE test_metrics_latency_seconds histogram", text)
+        self.assertIn('test_metrics_latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_metrics_latency_seconds_bucket{le="1"} 5', text)
+        self.assertIn('test_metrics_latency_seconds_bucket{le="+Inf"} 6', text)
+        self.assertIn("test_metrics_latency_seconds_count 6", text)
+        self.assertIn("test_metrics_latency_seconds_sum 7.05", text)
+
+    def test_label_values_are_escaped(self):
+        Counter("test_metrics_escaped_total", "Escaping.", ("v",)).labels('a"b\nc').inc()
+        self.assertIn('test_metrics_escaped_total{v="a\\"b\\nc"} 1', REGISTRY.render())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import struct
+import unittest
+
+from backend.utils.mp3 import concat_mp3, extract_frames, is_truncated, iter_frames, parse_frame_header
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, no CRC, no padding: 417-byte frames.
+HEADER = 0xFFFB9000
+FRAME_LENGTH = 417
+
+
+def frames(count, fill=0):
+    frame = struct.pack(">I", HEADER) + bytes([fill]) * (FRAME_LENGTH - 4)
+    return frame * count
+
+
+def id3v2(size=20):
+    return b"ID3\x04\x00\x00" + bytes([0, 0, 0, size]) + b"\x00" * size
+
+
+class Mp3FramesTest(unittest.TestCase):
+    def test_parse_header(self):
+        header = parse_frame_header(frames(1))
+        self.assertIsNotNone(header)
+        self.assertEqual(header.frame_length, FRAME_LENGTH)
+        self.assertEqual(header.sample_rate, 44100)
+        self.assertIsNone(parse_frame_header(b"\x00\x00\x00\x00"))
+
+    def test_iter_frames_resyncs_past_junk(self):
+        data = frames(2) + b"junk" + frames(3)
+        offsets = [offset for offset, _ in iter_frames(data)]
+        self.assertEqual(len(offsets), 5)
+        self.assertEqual(offsets[2], 2 * FRAME_LENGTH + 4)
+
+    def test_extract_strips_tags(self):
+        span = extract_frames(id3v2() + frames(3) + b"TAG" + b"\x00" * 125)
+        self.assertEqual(span.frame_count, 3)
+        self.assertEqual(bytes(span.payload), frames(3))
+
+    def test_extract_keeps_frames_after_junk(self):
+        with self.assertLogs("nami-tts.mp3", "WARNING"):
+            span = extract_frames(frames(2) + b"junk" + frames(3))
+        self.assertEqual(span.frame_count, 5)
+        self.assertEqual(bytes(span.payload), frames(5))
+
+    def test_extract_keeps_frames_after_mid_stream_tag(self):
+        with self.assertLogs("nami-tts.mp3", "WARNING"):
+            span = extract_frames(frames(2) + id3v2() + frames(2))
+        self.assertEqual(bytes(span.payload), frames(4))
+
+    def test_is_truncated(self):
+        self.assertFalse(is_truncated(frames(3)))
+        self.assertFalse(is_truncated(frames(3) + b"TAG" + b"\x00" * 125))
+        self.assertFalse(is_truncated(frames(3) + b"trailing junk"))
+        self.assertTrue(is_truncated(frames(3)[:-100]))
+
+
+class ConcatMp3Test(unittest.TestCase):
+    def test_joins_frames_without_tags(self):
+        merged = concat_mp3([id3v2() + frames(2), frames(3), b""])
+        self.assertEqual(merged, frames(5))
+
+    def test_xing_header_counts_frames(self):
+        merged = concat_mp3([frames(2), frames(3)], write_xing_header=True)
+        self.assertTrue(merged.endswith(frames(5)))
+        xing = merged[:-5 * FRAME_LENGTH]
+        self.assertIn(b"Info", xing)
+        at = xing.index(b"Info") + 8
+        self.assertEqual(struct.unpack_from(">I", xing, at)[0], 5)
+        # A second pass drops the old header instead of stacking another one.
+        self.assertEqual(concat_mp3([merged]), frames(5))
+
+    def test_unparseable_segment_is_appended_raw(self):
+        with self.assertLogs("nami-tts.mp3", "WARNING"):
+            merged = concat_mp3([frames(2), b"not audio", frames(1)], write_xing_header=True)
+        self.assertEqual(merged, frames(2) + b"not audio" + frames(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from functools import partial
+
+from backend.config import ProviderRegistry, TTSManager, _same_factory
+from backend.tts_providers.base import TTSProvider
+
+
+class _Provider(TTSProvider):
+    name = "fake"
+
+    def generate_audio(self, text, model, **options):
+        return b"audio"
+
+
+class ProviderRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.built = []
+        self.registry = ProviderRegistry()
+        self.registry.register("lazy", self._factory)
+
+    def _factory(self):
+        self.built.append(1)
+        return _Provider()
+
+    def test_views_do_not_construct(self):
+        self.assertIn("lazy", self.registry)
+        self.assertEqual(list(self.registry), ["lazy"])
+        self.assertEqual(len(self.registry), 1)
+        self.assertIsNone(self.registry.get("lazy"))
+        self.assertEqual(list(self.registry.items()), [])
+        self.assertEqual(list(self.registry.values()), [])
+        self.assertEqual(self.built, [])
+
+    def test_indexing_constructs_once(self):
+        provider = self.registry["lazy"]
+        self.assertIs(self.registry["lazy"], provider)
+        self.assertIs(self.registry.get("lazy"), provider)
+        self.assertEqual(dict(self.registry.items()), {"lazy": provider})
+        self.assertEqual(self.built, [1])
+
+
+class _KeyedProvider(_Provider):
+    def __init__(self, api_key=None):
+        super().__init__(api_key=api_key)
+
+
+class CarryOverTest(unittest.TestCase):
+    def _manager(self, key_a, key_b):
+        manager = TTSManager(default_provider="a", priority_order=["a", "b"])
+        manager.register_provider("a", partial(_KeyedProvider, api_key=key_a))
+        manager.register_provider("b", partial(_KeyedProvider, api_key=key_b))
+        return manager
+
+    def test_same_factory(self):
+        self.assertTrue(_same_factory(partial(_KeyedProvider, api_key="k"), partial(_KeyedProvider, api_key="k")))
+        self.assertTrue(_same_factory(_KeyedProvider, _KeyedProvider))
+        self.assertFalse(_same_factory(partial(_KeyedProvider, api_key="k"), partial(_KeyedProvider, api_key="x")))
+        self.assertFalse(_same_factory(partial(_KeyedProvider, "k"), partial(_KeyedProvider, api_key="k")))
+        self.assertFalse(_same_factory(partial(_KeyedProvider), partial(_Provider)))
+        self.assertFalse(_same_factory(partial(_KeyedProvider), _KeyedProvider))
+        self.assertFalse(_same_factory(None, _KeyedProvider))
+
+    def test_unchanged_provider_is_reused_changed_one_is_rebuilt(self):
+        previous = self._manager("a1", "b1")
+        provider_a = previous.providers["a"]
+        provider_b = previous.providers["b"]
+        previous._models_cache["a"] = (0.0, {"m": "M"})
+        previous._models_cache["b"] = (0.0, {"m": "M"})
+
+        manager = self._manager("a1", "b2")
+        self.assertEqual(manager.carry_over(previous), ["b"])
+
+        self.assertTrue(manager.providers.is_loaded("a"))
+        self.assertIs(manager.providers["a"], provider_a)
+        self.assertFalse(manager.providers.is_loaded("b"))
+        self.assertIsNot(manager.providers["b"], provider_b)
+        self.assertEqual(manager.providers["b"].api_key, "b2")
+        self.assertIn("a", manager._models_cache)
+        self.assertNotIn("b", manager._models_cache)
+        # the previous manager keeps serving its in-flight requests on its own instances
+        self.assertIs(previous.providers["b"], provider_b)
+
+    def test_unbuilt_provider_stays_lazy(self):
+        previous = self._manager("a1", "b1")
+        manager = self._manager("a1", "b1")
+        self.assertEqual(manager.carry_over(previous), [])
+        self.assertFalse(manager.providers.is_loaded("a"))
+        self.assertFalse(previous.providers.is_loaded("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from backend.utils.rate_limit import (
+    MemoryBucketStore,
+    RateLimit,
+    RateLimiter,
+    SQLiteBucketStore,
+    build_rate_limiter,
+    parse_api_keys,
+)
+
+LIMIT = RateLimit(chars_per_second=10, burst=100)
+
+
+class TokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("backend.utils.rate_limit.time.time", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _limiter(self, store=None):
+        return RateLimiter(store or MemoryBucketStore(), LIMIT)
+
+    def test_cost_is_charged_in_characters(self):
+        limiter = self._limiter()
+        decision = limiter.check("k", 60)
+        self.assertTrue(decision.allowed)
+        self.assertEqual(decision.remaining, 40)
+        decision = limiter.check("k", 60)
+        self.assertFalse(decision.allowed)
+        self.assertEqual(decision.retry_after, 2)  # 20 characters short at 10/s
+
+    def test_bucket_refills_over_time(self):
+        limiter = self._limiter()
+        limiter.check("k", 100)
+        self.now += 3
+        self.assertEqual(limiter.check("k", 30).remaining, 0)
+        self.assertFalse(limiter.check("k", 1).allowed)
+
+    def test_oversized_request_runs_into_debt(self):
+        limiter = self._limiter()
+        self.assertTrue(limiter.check("k", 250).allowed)
+        decision = limiter.check("k", 10)
+        self.assertFalse(decision.allowed)
+        self.assertEqual(decision.retry_after, 16)  # -150 + 10 needed
+
+    def test_keys_have_separate_buckets(self):
+        limiter = self._limiter()
+        limiter.check("a", 100)
+        self.assertTrue(limiter.check("b", 100).allowed)
+
+    def test_unlimited_key(self):
+        limiter = RateLimiter(MemoryBucketStore(), RateLimit(0, 1))
+        self.assertIsNone(limiter.check("k", 10_000))
+
+    def test_sqlite_store_is_shared(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rl.sqlite3")
+            self._limiter(SQLiteBucketStore(path)).check("k", 100)
+            self.assertFalse(self._limiter(SQLiteBucketStore(path)).check("k", 10).allowed)
+
+
+class ConfigTest(unittest.TestCase):
+    def test_parse_api_keys(self):
+        keys = parse_api_keys(" a , b:20 , c:5:50,", LIMIT)
+        self.assertEqual(keys, {"a": LIMIT, "b": RateLimit(20, 1200), "c": RateLimit(5, 50)})
+
+    def test_disabled_without_any_rate(self):
+        self.assertIsNone(build_rate_limiter({"a": RateLimit(0, 1)}, RateLimit(0, 1)))
+
+    def test_rebuild_keeps_buckets(self):
+        with mock.patch.dict(os.environ, {"RATE_LIMIT_BACKEND": "memory"}):
+            first = build_rate_limiter({}, LIMIT)
+            first.check("k", 100)
+            second = build_rate_limiter({"k": RateLimit(10, 200)}, LIMIT, previous=first)
+        self.assertIs(second.store, first.store)
+        self.assertEqual(second.allowed, 1)
+        self.assertLessEqual(second.check("k", 150).remaining, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import time
+import unittest
+from unittest import mock
+
+from backend.utils.retry import (
+    Deadline,
+    DeadlineExceeded,
+    InvalidRequestError,
+    RetryBudget,
+    RetryPolicy,
+    is_client_error,
+)
+
+
+class DeadlineTest(unittest.TestCase):
+    def test_unbounded(self):
+        for deadline in (Deadline(), Deadline.after(0), Deadline.after(None), Deadline.after("bogus")):
+            self.assertIsNone(deadline.remaining())
+            self.assertFalse(deadline.expired())
+            self.assertEqual(deadline.timeout(30), 30)
+
+    def test_timeout_is_capped_by_remaining_time(self):
+        deadline = Deadline.after(5)
+        self.assertLessEqual(deadline.timeout(30), 5)
+        self.assertEqual(deadline.timeout(1), 1)
+
+    def test_expired_deadline_raises(self):
+        deadline = Deadline(time.monotonic() - 1)
+        self.assertTrue(deadline.expired())
+        with self.assertRaises(DeadlineExceeded):
+            deadline.timeout(30)
+
+
+class RetryBudgetTest(unittest.TestCase):
+    def test_budget_is_shared(self):
+        budget = RetryBudget(2)
+        self.assertEqual([budget.acquire() for _ in range(3)], [True, True, False])
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_delay_is_full_jitter_and_capped(self):
+        policy = RetryPolicy(base_delay=1, max_delay=3, multiplier=2)
+        with mock.patch("backend.utils.retry.random.uniform", side_effect=lambda a, b: b):
+            self.assertEqual([policy.delay(n) for n in range(4)], [1, 2, 3, 3])
+
+    def test_budget_scales_with_calls(self):
+        policy = RetryPolicy(budget_ratio=0.2)
+        self.assertEqual(policy.context(2).budget.limit, 2)
+        self.assertEqual(policy.context(2, calls=20).budget.limit, 8)
+        self.assertEqual(policy.context(2).for_calls(20).budget.limit, 8)
+
+
+class RetryContextTest(unittest.TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy(base_delay=0.01, max_delay=0.01, budget_ratio=0.5)
+
+    def test_per_call_limit(self):
+        ctx = self.policy.context(2)
+        self.assertIsNotNone(ctx.backoff(0))
+        self.assertIsNotNone(ctx.backoff(1))
+        self.assertIsNone(ctx.backoff(2))
+
+    def test_budget_stops_retry_storm(self):
+        ctx = self.policy.context(2, calls=4)  # 4 retries shared by 4 calls
+        granted = [ctx.backoff(0) is not None for _ in range(6)]
+        self.assertEqual(granted, [True] * 4 + [False] * 2)
+
+    def test_gives_up_rather_than_sleep_past_deadline(self):
+        ctx = RetryPolicy(base_delay=10, max_delay=10).context(3, Deadline.after(0.5))
+        with mock.patch("backend.utils.retry.random.uniform", return_value=5):
+            self.assertIsNone(ctx.backoff(0))
+        self.assertEqual(ctx.budget.used, 0)
+
+
+class ClientErrorTest(unittest.TestCase):
+    def test_classification(self):
+        self.assertTrue(is_client_error(InvalidRequestError("empty text")))
+        self.assertTrue(is_client_error(DeadlineExceeded("late")))
+        self.assertFalse(is_client_error(RuntimeError("HTTP 502")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import unittest
+from unittest import mock
+
+from backend.utils.text import chunk_split_mode, split_sentences, split_text, split_text_stable
+
+SENTENCE = "This is a sentence of moderate length for testing. "  # 51 characters
+
+
+class SplitSentencesTest(unittest.TestCase):
+    def test_round_trips(self):
+        text = "Dr. Smith paid $3.14 at example.com. 你好。再见！\"Quoted?\" End"
+        self.assertEqual("".join(split_sentences(text)), text)
+
+    def test_abbreviations_and_decimals_do_not_split(self):
+        self.assertEqual(
+            split_sentences("Dr. Smith paid 3.14 today. Then he left."),
+            ["Dr. Smith paid 3.14 today. ", "Then he left."],
+        )
+
+    def test_cjk_terminators(self):
+        self.assertEqual(split_sentences("你好。再见！好"), ["你好。", "再见！", "好"])
+
+
+class SplitTextTest(unittest.TestCase):
+    def test_short_text_is_one_chunk(self):
+        self.assertEqual(split_text("hello", max_chars=10), ["hello"])
+
+    def test_chunks_are_balanced(self):
+        text = SENTENCE * 22  # 1122 characters
+        chunks = split_text(text, max_chars=500)
+        self.assertEqual("".join(chunks), text)
+        self.assertEqual(len(chunks), 3)
+        self.assertLessEqual(max(map(len, chunks)) - min(map(len, chunks)), len(SENTENCE))
+
+    def test_chunks_end_at_sentence_boundaries(self):
+        chunks = split_text(SENTENCE * 10, max_chars=120)
+        self.assertTrue(all(chunk.endswith(". ") for chunk in chunks))
+        self.assertTrue(all(len(chunk) <= 120 for chunk in chunks))
+
+    def test_long_sentence_is_cut_at_clause_breaks(self):
+        text = "，".join(["一二三四五六七八九"] * 20) + "。"
+        chunks = split_text(text, max_chars=50)
+        self.assertEqual("".join(chunks), text)
+        self.assertTrue(all(len(chunk) <= 50 for chunk in chunks))
+        self.assertTrue(all(chunk.endswith(("，", "。")) for chunk in chunks))
+
+
+class SplitTextStableTest(unittest.TestCase):
+    def setUp(self):
+        self.sentences = [f"Sentence number {i} says something a little different. " for i in range(60)]
+        self.text = "".join(self.sentences)
+
+    def test_round_trips_within_limit(self):
+        chunks = split_text_stable(self.text, max_chars=300)
+        self.assertEqual("".join(chunks), self.text)
+        self.assertTrue(all(len(chunk) <= 300 for chunk in chunks))
+        self.assertGreater(len(chunks), 1)
+
+    def test_edit_keeps_distant_chunks(self):
+        before = split_text_stable(self.text, max_chars=300)
+        edited = self.sentences[:]
+        edited[45] = "This sentence was rewritten. "
+        after = split_text_stable("".join(edited), max_chars=300)
+
+        untouched = [chunk for chunk in before if self.sentences[45] not in chunk]
+        reused = [chunk for chunk in untouched if chunk in after]
+        # only chunks next to the edit may move
+        self.assertGreaterEqual(len(reused), len(untouched) - 2)
+
+
+class UnspeakableChunkTest(unittest.TestCase):
+    CASES = {
+        "leading whitespace": "  \n" + "x" * 498 + ". " + "y" * 300,
+        "leading punctuation": "..." + "x" * 499 + "!",
+        "trailing punctuation": SENTENCE * 12 + "\n...",
+    }
+
+    def test_no_chunk_without_speakable_text(self):
+        for splitter in (split_text, split_text_stable):
+            for label, text in self.CASES.items():
+                with self.subTest(splitter=splitter.__name__, case=label):
+                    chunks = splitter(text, max_chars=500)
+                    self.assertEqual("".join(chunks), text)
+                    self.assertTrue(all(len(chunk) <= 500 for chunk in chunks))
+                    self.assertTrue(all(any(ch.isalnum() for ch in chunk) for chunk in chunks), chunks)
+
+
+class ChunkSplitModeTest(unittest.TestCase):
+    def test_defaults_to_balanced(self):
+        with mock.patch.dict(os.environ, {"CHUNK_SPLIT_MODE": ""}):
+            self.assertEqual(chunk_split_mode(), "balanced")
+        with mock.patch.dict(os.environ, {"CHUNK_SPLIT_MODE": "bogus"}):
+            self.assertEqual(chunk_split_mode(), "balanced")
+        with mock.patch.dict(os.environ, {"CHUNK_SPLIT_MODE": "Stable"}):
+            self.assertEqual(chunk_split_mode(), "stable")
+
+
+if __name__ == "__main__":
+    unittest.main()
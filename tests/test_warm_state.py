@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from backend.config import TTSManager
+from backend.health import ProviderHealthMonitor
+from backend.tts_providers.base import TTSProvider
+from backend.warm_state import SNAPSHOT_VERSION, WarmStateStore
+
+
+class _Provider(TTSProvider):
+    def __init__(self):
+        super().__init__()
+        self.offset = None
+
+    def generate_audio(self, text, model, **options):
+        return b""
+
+    def export_warm_state(self):
+        return {"offset": self.offset} if self.offset is not None else None
+
+    def restore_warm_state(self, state):
+        self.offset = state.get("offset")
+
+
+class WarmStateStoreTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "warm_state.json")
+        self.manager = self._manager()
+        self.monitor = ProviderHealthMonitor(lambda: self.manager, interval_seconds=3600)
+        self.store = WarmStateStore(self.path, lambda: self.manager, self.monitor)
+
+    def _manager(self):
+        manager = TTSManager(default_provider="fake", priority_order=["fake"])
+        manager.register_provider("fake", _Provider)
+        return manager
+
+    def test_round_trip_into_unbuilt_provider(self):
+        self.manager.providers["fake"].offset = 42
+        self.manager._models_cache["fake"] = (time.time(), {"voice": "Voice"})
+        self.assertTrue(self.store.save())
+
+        self.manager = self._manager()
+        self.assertTrue(self.store.restore())
+        self.assertFalse(self.manager.providers.is_loaded("fake"))
+        self.assertEqual(self.manager._models_cache["fake"][1], {"voice": "Voice"})
+        self.assertEqual(self.manager.providers["fake"].offset, 42)
+
+    def test_unchanged_state_is_not_rewritten(self):
+        self.assertTrue(self.store.save())
+        self.assertFalse(self.store.save())
+        self.assertEqual(self.store.saves, 1)
+
+    def test_missing_file(self):
+        self.assertIsNone(self.store.load())
+        self.assertFalse(self.store.restore())
+        self.assertIsNone(self.store.restored_saved_at)
+
+    def test_truncated_file(self):
+        self.manager.providers["fake"].offset = 42
+        self.assertTrue(self.store.save())
+        with open(self.path, "rb") as f:
+            body = f.read()
+        with open(self.path, "wb") as f:
+            f.write(body[: len(body) // 2])
+
+        self.manager = self._manager()
+        self.assertFalse(self.store.restore())
+        self.assertIsNone(self.manager.providers["fake"].offset)
+
+    def test_malformed_snapshots_are_ignored(self):
+        for content in (
+            b"\xff\xfe not json",
+            b"[]",
+            json.dumps({"version": SNAPSHOT_VERSION + 1, "saved_at": time.time()}).encode(),
+            json.dumps({"version": SNAPSHOT_VERSION, "saved_at": time.time() - 7200}).encode(),
+            json.dumps({"version": SNAPSHOT_VERSION, "saved_at": time.time(), "manager": {"models": {"fake": "bad"}}}).encode(),
+        ):
+            with self.subTest(content=content):
+                with open(self.path, "wb") as f:
+                    f.write(content)
+                self.assertFalse(self.store.restore())
+
+
+if __name__ == "__main__":
+    unittest.main()